@@ -0,0 +1,116 @@
+"""
+Django management command to compare the size and read latency of full vs delta encoded split structures.
+"""
+import copy
+import time
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand, CommandError, make_option
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+
+class Command(BaseCommand):
+    """
+    Copy the recent history of a split course's branch into scratch collections once as full structures
+    and once delta encoded and report the bytes stored and the time to read them back.
+    """
+    args = '<course_id>'
+    help = (
+        "Compare storing a split course's structure history as full documents vs deltas. "
+        "Writes only to scratch collections which it drops afterward."
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option('--branch',
+                    default=ModuleStoreEnum.BranchName.draft,
+                    help='Which branch of the course to read the history of'),
+        make_option('--versions',
+                    type='int',
+                    default=50,
+                    help='How many versions of history to copy'),
+        make_option('--interval',
+                    type='int',
+                    default=10,
+                    help='The structure_snapshot_interval to use for the delta encoding'),
+    )
+
+    def handle(self, *args, **options):
+        "Execute the command"
+        if len(args) != 1:
+            raise CommandError("benchmark_structure_storage requires one argument: <course_id>")
+        try:
+            course_key = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id: '{}'".format(args[0]))
+        if options['versions'] < 1 or options['interval'] < 1:
+            raise CommandError("--versions and --interval must be positive")
+
+        split_store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)  # pylint: disable=protected-access
+        if split_store is None:
+            raise CommandError("No split modulestore is configured")
+        db_connection = split_store.db_connection
+        index = db_connection.get_course_index(course_key)
+        if index is None or options['branch'] not in index['versions']:
+            raise CommandError("No {} branch for {}".format(options['branch'], course_key))
+
+        history = []
+        version_guid = index['versions'][options['branch']]
+        while version_guid is not None and len(history) < options['versions']:
+            structure = db_connection.get_structure(version_guid)
+            if structure is None:
+                break
+            history.append(structure)
+            version_guid = structure['previous_version']
+        # oldest first so each version's predecessor is already written
+        history.reverse()
+
+        results = OrderedDict()
+        for label, interval in (('full', None), ('delta', options['interval'])):
+            scratch = self._scratch_connection(db_connection, label, interval)
+            try:
+                results[label] = self._measure(scratch, history)
+            finally:
+                scratch.structures.drop()
+
+        self.stdout.write("{} versions of {} {}\n".format(len(history), course_key, options['branch']))
+        for label, (size, write_time, read_time) in results.iteritems():
+            self.stdout.write(
+                "{:>6}: {:>12} bytes, write {:8.1f} ms, read {:8.1f} ms ({:.2f} ms/version)\n".format(
+                    label, size, write_time * 1000, read_time * 1000, read_time * 1000 / max(len(history), 1)
+                )
+            )
+
+    @staticmethod
+    def _scratch_connection(db_connection, label, interval):
+        """
+        A copy of db_connection whose structures go to a scratch collection
+        """
+        scratch = copy.copy(db_connection)
+        scratch.structures = db_connection.database['{}.benchmark_{}'.format(db_connection.structures.name, label)]
+        scratch.structures.drop()
+        scratch.structure_snapshot_interval = interval
+        scratch._snapshot_cache = OrderedDict()  # pylint: disable=protected-access
+        return scratch
+
+    @staticmethod
+    def _measure(scratch, history):
+        """
+        Write then read back history using the scratch connection.
+        Returns (bytes stored, seconds to write, seconds to read).
+        """
+        start = time.time()
+        for structure in history:
+            scratch.insert_structure(structure)
+        write_time = time.time() - start
+
+        ids = [structure['_id'] for structure in history]
+        # read with a cold snapshot cache as a new process would
+        scratch._snapshot_cache.clear()  # pylint: disable=protected-access
+        start = time.time()
+        for version_guid in ids:
+            scratch.get_structure(version_guid)
+        read_time = time.time() - start
+        return scratch.structures_size(ids), write_time, read_time
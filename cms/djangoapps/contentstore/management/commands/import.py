@@ -21,15 +21,21 @@ class Command(BaseCommand):
         make_option('--nostatic',
                     action='store_true',
                     help='Skip import of static content'),
+        make_option('--incremental',
+                    action='store_true',
+                    help='Only write blocks and assets which changed since the last import'),
     )
 
     def handle(self, *args, **options):
         "Execute the command"
         if len(args) == 0:
-            raise CommandError("import requires at least one argument: <data directory> [--nostatic] [<course dir>...]")
+            raise CommandError(
+                "import requires at least one argument: <data directory> [--nostatic] [--incremental] [<course dir>...]"
+            )
 
         data_dir = args[0]
         do_import_static = not (options.get('nostatic', False))
+        incremental = options.get('incremental', False)
         if len(args) > 1:
             course_dirs = args[1:]
         else:
@@ -45,6 +51,7 @@ class Command(BaseCommand):
             static_content_store=contentstore(), verbose=True,
             do_import_static=do_import_static,
             create_new_course_if_not_present=True,
+            incremental=incremental,
         )
 
         for course in course_items:
@@ -0,0 +1,59 @@
+"""
+Django management command to garbage collect old split modulestore structures and definitions.
+"""
+from django.core.management.base import BaseCommand, CommandError, make_option
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo.history_pruner import SplitHistoryPruner
+
+
+class Command(BaseCommand):
+    """
+    Remove the split structures and definitions which no course index can reach within the retention window.
+    """
+    help = (
+        "Remove split modulestore structures which aren't the head of a course branch or one of its "
+        "recent predecessors, and the definitions which only those structures used."
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option('--dry-run',
+                    action='store_true',
+                    help='Only report how much could be reclaimed'),
+        make_option('--retain-versions',
+                    type='int',
+                    default=SplitHistoryPruner.DEFAULT_RETAIN_VERSIONS,
+                    help='How many previous versions of each course branch to keep'),
+        make_option('--retain-days',
+                    type='int',
+                    default=SplitHistoryPruner.DEFAULT_RETAIN_DAYS,
+                    help='Keep everything edited within this many days'),
+    )
+
+    def handle(self, *args, **options):
+        "Execute the command"
+        if options['retain_versions'] < 0 or options['retain_days'] < 0:
+            raise CommandError("--retain-versions and --retain-days must not be negative")
+
+        split_store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)  # pylint: disable=protected-access
+        if split_store is None:
+            raise CommandError("No split modulestore is configured")
+
+        pruner = SplitHistoryPruner(
+            split_store.db_connection,
+            retain_versions=options['retain_versions'],
+            retain_days=options['retain_days'],
+        )
+        unreachable = pruner.find_unreachable()
+        stats = pruner.stats(unreachable)
+        self.stdout.write(
+            "Structures: {0.structures_reclaimable} of {0.structures_total} reclaimable "
+            "({0.structure_bytes} bytes)\n"
+            "Definitions: {0.definitions_reclaimable} of {0.definitions_total} reclaimable "
+            "({0.definition_bytes} bytes)\n".format(stats)
+        )
+        if options['dry_run']:
+            return
+
+        pruner.prune(unreachable)
+        self.stdout.write("Pruned.\n")
@@ -4,15 +4,22 @@ This file contains celery tasks for contentstore views
 
 from celery.task import task
 from django.contrib.auth.models import User
+from django.core.cache import cache
 import json
 import logging
+from cache_toolbox.core import del_cached_content
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
 from xmodule.course_module import CourseFields
 
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
 from course_action_state.models import CourseRerunState
 from contentstore.utils import initialize_permissions
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import AssetKey, CourseKey
+
+# how long a queued processing of an asset's content keeps other requests for it from being queued
+ASSET_PROCESSING_LOCK_TIMEOUT = 10 * 60
 
 
 @task()
@@ -66,3 +73,37 @@ def deserialize_fields(json_fields):
     for field_name, value in fields.iteritems():
         fields[field_name] = getattr(CourseFields, field_name).from_json(value)
     return fields
+
+
+def _asset_processing_cache_key(asset_key, md5):
+    """
+    The cache key which marks the processing of asset_key's content with md5 as queued
+    """
+    return u"contentstore.asset_processing.{}.{}".format(asset_key, md5)
+
+
+def enqueue_asset_processing(asset_key, md5):
+    """
+    Mark the asset as processing and queue the processing of its content with md5 (see
+    ContentStore.process_asset) unless it's already queued.
+    """
+    contentstore().set_attr(asset_key, 'processing', True)
+    if cache.add(_asset_processing_cache_key(asset_key, md5), True, ASSET_PROCESSING_LOCK_TIMEOUT):
+        process_asset.delay(unicode(asset_key), md5)
+
+
+@task()
+def process_asset(asset_key_string, md5):
+    """
+    Generates an uploaded or imported asset's thumbnail and image metadata in a new celery task.
+    """
+    asset_key = AssetKey.from_string(asset_key_string)
+    try:
+        if contentstore().process_asset(asset_key, md5):
+            del_cached_content(StaticContent.compute_location(
+                asset_key.course_key, StaticContent.generate_thumbnail_name(asset_key.name), is_thumbnail=True
+            ))
+        else:
+            logging.info(u"Skipped processing %s: it was deleted, changed, or already processed", asset_key)
+    finally:
+        cache.delete(_asset_processing_cache_key(asset_key, md5))
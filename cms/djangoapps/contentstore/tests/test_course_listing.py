@@ -1,16 +1,15 @@
 """
-Unit tests for getting the list of courses for a user through iterating all courses and
-by reversing group name formats.
+Unit tests for getting the list of courses for a user from the course summaries and by
+reversing the user's roles.
 """
 import random
 
-from chrono import Timer
 from mock import patch, Mock
 import ddt
 
 from django.test import RequestFactory
 
-from contentstore.views.course import _accessible_courses_list, _accessible_courses_list_from_groups, AccessListFallback
+from contentstore.views.course import _accessible_courses_summary_list, _accessible_courses_summary_list_from_roles
 from contentstore.utils import delete_course_and_groups, reverse_course_url
 from contentstore.tests.utils import AjaxEnabledTestClient
 from student.tests.factories import UserFactory
@@ -76,15 +75,9 @@ class TestCourseListing(ModuleStoreTestCase):
         course_location = SlashSeparatedCourseKey('Org1', 'Course1', 'Run1')
         self._create_course_with_access_groups(course_location, self.user)
 
-        # get courses through iterating all courses
-        courses_list, __ = _accessible_courses_list(self.request)
-        self.assertEqual(len(courses_list), 1)
-
-        # get courses by reversing group name formats
-        courses_list_by_groups, __ = _accessible_courses_list_from_groups(self.request)
-        self.assertEqual(len(courses_list_by_groups), 1)
-        # check both course lists have same courses
-        self.assertEqual(courses_list, courses_list_by_groups)
+        # get courses by reversing the user's roles
+        courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
+        self.assertEqual([course.id for course in courses_list], [course_location])
 
     def test_errored_course_global_staff(self):
         """
@@ -98,13 +91,9 @@ class TestCourseListing(ModuleStoreTestCase):
         with patch('xmodule.modulestore.mongo.base.MongoKeyValueStore', Mock(side_effect=Exception)):
             self.assertIsInstance(modulestore().get_course(course_key), ErrorDescriptor)
 
-            # get courses through iterating all courses
-            courses_list, __ = _accessible_courses_list(self.request)
-            self.assertEqual(courses_list, [])
-
-            # get courses by reversing group name formats
-            courses_list_by_groups, __ = _accessible_courses_list_from_groups(self.request)
-            self.assertEqual(courses_list_by_groups, [])
+            # the summaries don't load the courses; so, the course is still listed
+            courses_list, __ = _accessible_courses_summary_list()
+            self.assertEqual([course.id for course in courses_list], [course_key])
 
     def test_errored_course_regular_access(self):
         """
@@ -119,14 +108,13 @@ class TestCourseListing(ModuleStoreTestCase):
         with patch('xmodule.modulestore.mongo.base.MongoKeyValueStore', Mock(side_effect=Exception)):
             self.assertIsInstance(modulestore().get_course(course_key), ErrorDescriptor)
 
-            # get courses through iterating all courses
-            courses_list, __ = _accessible_courses_list(self.request)
-            self.assertEqual(courses_list, [])
+            # the summaries don't load the courses; so, the course is still listed
+            courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
+            self.assertEqual([course.id for course in courses_list], [course_key])
 
-            # get courses by reversing group name formats
-            courses_list_by_groups, __ = _accessible_courses_list_from_groups(self.request)
-            self.assertEqual(courses_list_by_groups, [])
-            self.assertEqual(courses_list, courses_list_by_groups)
+            response = self.client.get_html('/course/')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(reverse_course_url('course_handler', course_key), response.content)
 
     def test_get_course_list_with_invalid_course_location(self):
         """
@@ -135,30 +123,22 @@ class TestCourseListing(ModuleStoreTestCase):
         course_key = SlashSeparatedCourseKey('Org', 'Course', 'Run')
         self._create_course_with_access_groups(course_key, self.user)
 
-        # get courses through iterating all courses
-        courses_list, __ = _accessible_courses_list(self.request)
+        courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
         self.assertEqual(len(courses_list), 1)
 
-        # get courses by reversing group name formats
-        courses_list_by_groups, __ = _accessible_courses_list_from_groups(self.request)
-        self.assertEqual(len(courses_list_by_groups), 1)
-        # check both course lists have same courses
-        self.assertEqual(courses_list, courses_list_by_groups)
-
         # now delete this course and re-add user to instructor group of this course
         delete_course_and_groups(course_key, self.user.id)
 
         CourseInstructorRole(course_key).add_users(self.user)
 
-        # test that get courses through iterating all courses now returns no course
-        courses_list, __ = _accessible_courses_list(self.request)
+        # test that get courses by the user's roles now returns no course
+        courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
         self.assertEqual(len(courses_list), 0)
 
     def test_course_listing_performance(self):
         """
         Create large number of courses and give access of some of these courses to the user and
-        compare the time to fetch accessible courses for the user through traversing all courses and
-        reversing django groups
+        check that the accessible courses are fetched by the user's roles in one query per modulestore
         """
         # create list of random course numbers which will be accessible to the user
         user_course_ids = random.sample(range(TOTAL_COURSES_COUNT), USER_COURSES_COUNT)
@@ -174,41 +154,20 @@ class TestCourseListing(ModuleStoreTestCase):
             else:
                 self._create_course_with_access_groups(course_location)
 
-        # time the get courses by iterating through all courses
-        with Timer() as iteration_over_courses_time_1:
-            courses_list, __ = _accessible_courses_list(self.request)
-        self.assertEqual(len(courses_list), USER_COURSES_COUNT)
-
-        # time again the get courses by iterating through all courses
-        with Timer() as iteration_over_courses_time_2:
-            courses_list, __ = _accessible_courses_list(self.request)
-        self.assertEqual(len(courses_list), USER_COURSES_COUNT)
-
-        # time the get courses by reversing django groups
-        with Timer() as iteration_over_groups_time_1:
-            courses_list, __ = _accessible_courses_list_from_groups(self.request)
-        self.assertEqual(len(courses_list), USER_COURSES_COUNT)
-
-        # time again the get courses by reversing django groups
-        with Timer() as iteration_over_groups_time_2:
-            courses_list, __ = _accessible_courses_list_from_groups(self.request)
+        # Calls:
+        #    1) query old mongo (the user's courses fit in its first batch)
+        #    2) query split (but no courses so no fetching of structures)
+        with check_mongo_calls(2):
+            courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
         self.assertEqual(len(courses_list), USER_COURSES_COUNT)
 
-        # test that the time taken by getting courses through reversing django groups is lower then the time
-        # taken by traversing through all courses (if accessible courses are relatively small)
-        self.assertGreaterEqual(iteration_over_courses_time_1.elapsed, iteration_over_groups_time_1.elapsed)
-        self.assertGreaterEqual(iteration_over_courses_time_2.elapsed, iteration_over_groups_time_2.elapsed)
-
-        # Now count the db queries
-        with check_mongo_calls(USER_COURSES_COUNT):
-            _accessible_courses_list_from_groups(self.request)
-
         # Calls:
         #    1) query old mongo
         #    2) get_more on old mongo
-        #    3) query split (but no courses so no fetching of data)
+        #    3) query split (but no courses so no fetching of structures)
         with check_mongo_calls(3):
-            _accessible_courses_list(self.request)
+            courses_list, __ = _accessible_courses_summary_list()
+        self.assertEqual(len(courses_list), TOTAL_COURSES_COUNT)
 
     def test_course_listing_errored_deleted_courses(self):
         """
@@ -235,8 +194,11 @@ class TestCourseListing(ModuleStoreTestCase):
             }},
         )
 
-        courses_list, __ = _accessible_courses_list_from_groups(self.request)
-        self.assertEqual(len(courses_list), 1, courses_list)
+        # the summaries don't load the courses; so, only the deleted course is left out
+        courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
+        self.assertItemsEqual(
+            [listed.location.course for listed in courses_list], ['testCourse', 'erroredCourse']
+        )
 
     @ddt.data(OrgStaffRole('AwesomeOrg'), OrgInstructorRole('AwesomeOrg'))
     def test_course_listing_org_permissions(self, role):
@@ -261,10 +223,36 @@ class TestCourseListing(ModuleStoreTestCase):
         # Two types of org-wide roles have edit permissions: staff and instructor.  We test both
         role.add_users(self.user)
 
-        with self.assertRaises(AccessListFallback):
-            _accessible_courses_list_from_groups(self.request)
-        courses_list, __ = _accessible_courses_list(self.request)
-        self.assertEqual(len(courses_list), 2)
+        courses_list, __ = _accessible_courses_summary_list_from_roles(self.request)
+        self.assertItemsEqual([course.id for course in courses_list], [org_course_one, org_course_two])
+
+    def test_course_summary_listing(self):
+        """
+        Test that the course summaries by role are of the courses the user has access to and that all
+        the courses' summaries agree with the courses
+        """
+        self._create_course_with_access_groups(SlashSeparatedCourseKey('Org1', 'Course1', 'Run1'), self.user)
+        self._create_course_with_access_groups(SlashSeparatedCourseKey('Org1', 'Course2', 'Run1'))
+        OrgStaffRole('Org2').add_users(self.user)
+        self._create_course_with_access_groups(SlashSeparatedCourseKey('Org2', 'Course1', 'Run1'))
+
+        summaries, __ = _accessible_courses_summary_list_from_roles(self.request)
+        self.assertItemsEqual(
+            [summary.id for summary in summaries],
+            [SlashSeparatedCourseKey('Org1', 'Course1', 'Run1'), SlashSeparatedCourseKey('Org2', 'Course1', 'Run1')]
+        )
+
+        summaries_by_id = {summary.id: summary for summary in _accessible_courses_summary_list()[0]}
+        for course in modulestore().get_courses():
+            summary = summaries_by_id[course.id]
+            self.assertEqual(summary.display_name, course.display_name)
+            self.assertEqual(summary.display_number_with_default, course.display_number_with_default)
+            self.assertEqual(summary.location.run, course.location.run)
+
+    def test_course_summary_listing_without_roles(self):
+        self._create_course_with_access_groups(SlashSeparatedCourseKey('Org1', 'Course1', 'Run1'))
+        with check_mongo_calls(0):
+            self.assertEqual(_accessible_courses_summary_list_from_roles(self.request), ([], []))
 
     def test_course_listing_with_actions_in_progress(self):
         sourse_course_key = CourseLocator('source-Org', 'source-Course', 'source-Run')
@@ -286,13 +274,12 @@ class TestCourseListing(ModuleStoreTestCase):
             )
 
         # verify return values
-        for method in (_accessible_courses_list_from_groups, _accessible_courses_list):
-            def set_of_course_keys(course_list, key_attribute_name='id'):
-                """Returns a python set of course keys by accessing the key with the given attribute name."""
-                return set(getattr(c, key_attribute_name) for c in course_list)
-
-            found_courses, unsucceeded_course_actions = method(self.request)
-            self.assertSetEqual(set_of_course_keys(courses + courses_in_progress), set_of_course_keys(found_courses))
-            self.assertSetEqual(
-                set_of_course_keys(courses_in_progress), set_of_course_keys(unsucceeded_course_actions, 'course_key')
-            )
+        def set_of_course_keys(course_list, key_attribute_name='id'):
+            """Returns a python set of course keys by accessing the key with the given attribute name."""
+            return set(getattr(c, key_attribute_name) for c in course_list)
+
+        found_courses, unsucceeded_course_actions = _accessible_courses_summary_list_from_roles(self.request)
+        self.assertSetEqual(set_of_course_keys(courses + courses_in_progress), set_of_course_keys(found_courses))
+        self.assertSetEqual(
+            set_of_course_keys(courses_in_progress), set_of_course_keys(unsucceeded_course_actions, 'course_key')
+        )
@@ -9,12 +9,17 @@ from django.test.client import Client
 from django.test.utils import override_settings
 from django.conf import settings
 import ddt
+from mock import Mock
 import copy
+import shutil
+from path import path
+from tempdir import mkdtemp_clean
 
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.contentstore.django import contentstore
+from xmodule.contentstore.content import StaticContent
 from xmodule.modulestore.tests.factories import check_exact_number_of_calls, check_number_of_calls
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
 from xmodule.modulestore.xml_importer import import_from_xml
@@ -140,6 +145,24 @@ class ContentStoreImportTest(ModuleStoreTestCase):
         self.assertEqual(len(all_assets), 0)
         self.assertEqual(count, 0)
 
+    def test_asset_import_asset_processor(self):
+        '''
+        Imported assets are handed to the asset_processor rather than post-processed during the import
+        '''
+        content_store = contentstore()
+        module_store = modulestore()
+        asset_processor = Mock()
+        import_from_xml(
+            module_store, self.user.id, 'common/test/data/', ['toy'],
+            static_content_store=content_store, verbose=True, asset_processor=asset_processor,
+        )
+
+        course = module_store.get_course(SlashSeparatedCourseKey('edX', 'toy', '2012_Fall'))
+        all_assets, count = content_store.get_all_content_for_course(course.id)
+        self.assertGreater(count, 0)
+        processed = set(call[0][0] for call in asset_processor.call_args_list)
+        self.assertEqual(processed, set(asset['asset_key'] for asset in all_assets))
+
     def test_no_static_link_rewrites_on_import(self):
         module_store = modulestore()
         courses = import_from_xml(module_store, self.user.id, 'common/test/data/', ['toy'], do_import_static=False, verbose=True)
@@ -177,6 +200,68 @@ class ContentStoreImportTest(ModuleStoreTestCase):
             __, __, course = self.load_test_import_course(create_new_course_if_not_present=True)
             self.load_test_import_course(target_course_id=course.id)
 
+    def test_incremental_reimport_deletes_stale_content(self):
+        course_dir = path(mkdtemp_clean()) / 'simple_with_draft'
+        shutil.copytree(path('common/test/data/simple_with_draft'), course_dir)
+        (course_dir / 'static').makedirs()
+        (course_dir / 'static' / 'kept.txt').write_text('kept')
+        (course_dir / 'static' / 'removed.txt').write_text('removed')
+        (course_dir / 'drafts' / 'vertical' / 'draft_only.xml').write_text(
+            "<vertical url_name='draft_only' index_in_children_list='1' "
+            "parent_sequential_url='i4x://edX/simple_with_draft/sequential/test_sequence'>"
+            "<html url_name='draft_only_html'>Draft</html></vertical>"
+        )
+        module_store = modulestore()
+        content_store = contentstore()
+
+        def incremental_import():
+            """
+            Reimport the course dir, only writing what changed
+            """
+            return import_from_xml(
+                module_store, self.user.id, course_dir.dirname(), [course_dir.basename()],
+                static_content_store=content_store, create_new_course_if_not_present=True, incremental=True,
+            )[0].id
+
+        course_key = incremental_import()
+        # content which Studio adds outside of the xml
+        content_store.save(StaticContent(
+            course_key.make_asset_key('asset', 'uploaded.txt'), 'uploaded.txt', 'text/plain', 'uploaded'
+        ))
+        detached = [
+            course_key.make_usage_key('about', 'effort'),
+            course_key.make_usage_key('static_tab', 'studio_tab'),
+            course_key.make_usage_key('course_info', 'studio_info'),
+        ]
+        for usage_key in detached:
+            module_store.create_item(self.user.id, course_key, usage_key.block_type, block_id=usage_key.block_id)
+
+        video = course_key.make_usage_key('video', 'Lost_Video')
+        draft_blocks = [course_key.make_usage_key('vertical', 'draft_only'),
+                        course_key.make_usage_key('html', 'draft_only_html')]
+        with module_store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+            for usage_key in [video] + draft_blocks:
+                self.assertTrue(module_store.has_item(usage_key))
+
+        course_xml = course_dir / 'course.xml'
+        course_xml.write_text(course_xml.text().replace(
+            '<video name="Lost Video" youtube_id_1_0="TBvX7HzxexQ"/>', ''
+        ))
+        (course_dir / 'drafts' / 'vertical' / 'draft_only.xml').remove()
+        (course_dir / 'static' / 'removed.txt').remove()
+        incremental_import()
+
+        with module_store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+            for usage_key in [video] + draft_blocks:
+                self.assertFalse(module_store.has_item(usage_key))
+            for usage_key in detached:
+                self.assertTrue(module_store.has_item(usage_key))
+            self.assertTrue(module_store.has_item(course_key.make_usage_key('vertical', 'test_vertical')))
+        all_assets, __ = content_store.get_all_content_for_course(course_key)
+        self.assertEqual(
+            sorted(asset['asset_key'].name for asset in all_assets), ['kept.txt', 'uploaded.txt']
+        )
+
     def test_rewrite_reference_list(self):
         module_store = modulestore()
         target_course_id = SlashSeparatedCourseKey('testX', 'conditional_copy', 'copy_run')
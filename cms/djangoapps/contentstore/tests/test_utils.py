@@ -262,6 +262,14 @@ class XBlockVisibilityTestCase(TestCase):
         return vertical
 
 
+def _outline_ancestors(test, item):
+    """
+    Returns the ancestors (from the parent up) of one of test's vertical, sequential, or chapter
+    """
+    outline = [test.vertical, test.sequential, test.chapter, test.course]
+    return outline[[block.location for block in outline].index(item.location) + 1:]
+
+
 class ReleaseDateSourceTest(CourseTestCase):
     """Tests for finding the source of an xblock's release date."""
 
@@ -295,6 +303,12 @@ class ReleaseDateSourceTest(CourseTestCase):
         self.assertEqual(source.location, expected_source.location)
         self.assertEqual(source.start, expected_source.start)
 
+        # given the item's ancestors, the source is found among them without looking up any parents
+        with mock.patch('contentstore.utils.modulestore') as mock_modulestore:
+            source = utils.find_release_date_source(item, _outline_ancestors(self, item))
+        self.assertFalse(mock_modulestore.called)
+        self.assertEqual(source.location, expected_source.location)
+
     def test_chapter_source_for_vertical(self):
         """Tests a vertical's release date being set by its chapter"""
         self._update_release_dates(self.date_one, self.date_one, self.date_one)
@@ -364,6 +378,12 @@ class StaffLockSourceTest(StaffLockTest):
         self.assertEqual(source.location, expected_source.location)
         self.assertTrue(source.visible_to_staff_only)
 
+        # given the item's ancestors, the source is found among them without looking up any parents
+        with mock.patch('contentstore.utils.modulestore') as mock_modulestore:
+            source = utils.find_staff_lock_source(item, _outline_ancestors(self, item))
+        self.assertFalse(mock_modulestore.called)
+        self.assertEqual(source.location, expected_source.location)
+
     def test_chapter_source_for_vertical(self):
         """Tests a vertical's staff lock being set by its chapter"""
         self._update_staff_locks(True, False, False)
@@ -388,11 +408,13 @@ class StaffLockSourceTest(StaffLockTest):
     def test_orphan_has_no_source(self):
         """Tests that a orphaned xblock has no staff lock source"""
         self.assertIsNone(utils.find_staff_lock_source(self.orphan))
+        self.assertIsNone(utils.find_staff_lock_source(self.orphan, []))
 
     def test_no_source_for_vertical(self):
         """Tests a vertical with no staff lock set anywhere"""
         self._update_staff_locks(False, False, False)
         self.assertIsNone(utils.find_staff_lock_source(self.vertical))
+        self.assertIsNone(utils.find_staff_lock_source(self.vertical, _outline_ancestors(self, self.vertical)))
 
 
 class InheritedStaffLockTest(StaffLockTest):
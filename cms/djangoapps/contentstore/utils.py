@@ -175,32 +175,36 @@ def is_currently_visible_to_students(xblock):
     return True
 
 
-def find_release_date_source(xblock):
+def find_release_date_source(xblock, ancestors=None):
     """
     Finds the ancestor of xblock that set its release date.
+
+    If given the xblock's ancestors (from its parent up), finds it among them rather than by looking
+    up the xblock's parents.
     """
 
     # Stop searching at the section level
     if xblock.category == 'chapter':
         return xblock
 
-    parent_location = modulestore().get_parent_location(xblock.location,
-                                                        revision=ModuleStoreEnum.RevisionOption.draft_preferred)
+    parent, ancestors = _get_parent(xblock, ancestors)
     # Orphaned xblocks set their own release date
-    if not parent_location:
+    if parent is None:
         return xblock
 
-    parent = modulestore().get_item(parent_location)
     if parent.start != xblock.start:
         return xblock
     else:
-        return find_release_date_source(parent)
+        return find_release_date_source(parent, ancestors)
 
 
-def find_staff_lock_source(xblock):
+def find_staff_lock_source(xblock, ancestors=None):
     """
     Returns the xblock responsible for setting this xblock's staff lock, or None if the xblock is not staff locked.
     If this xblock is explicitly locked, return it, otherwise find the ancestor which sets this xblock's staff lock.
+
+    If given the xblock's ancestors (from its parent up), finds it among them rather than by looking
+    up the xblock's parents.
     """
 
     # Stop searching if this xblock has explicitly set its own staff lock
@@ -211,14 +215,27 @@ def find_staff_lock_source(xblock):
     if xblock.category == 'chapter':
         return None
 
-    parent_location = modulestore().get_parent_location(xblock.location,
-                                                        revision=ModuleStoreEnum.RevisionOption.draft_preferred)
+    parent, ancestors = _get_parent(xblock, ancestors)
     # Orphaned xblocks set their own staff lock
-    if not parent_location:
+    if parent is None:
         return None
 
-    parent = modulestore().get_item(parent_location)
-    return find_staff_lock_source(parent)
+    return find_staff_lock_source(parent, ancestors)
+
+
+def _get_parent(xblock, ancestors):
+    """
+    Returns xblock's parent (or None if it's an orphan) and the parent's ancestors, which are None
+    unless xblock's ancestors are given.
+    """
+    if ancestors is not None:
+        return (ancestors[0], ancestors[1:]) if ancestors else (None, ancestors)
+
+    parent_location = modulestore().get_parent_location(xblock.location,
+                                                        revision=ModuleStoreEnum.RevisionOption.draft_preferred)
+    if not parent_location:
+        return None, None
+    return modulestore().get_item(parent_location), None
 
 
 def ancestor_has_staff_lock(xblock, parent_xblock=None):
@@ -1,18 +1,26 @@
+import base64
+import calendar
+import hashlib
 import logging
+from datetime import datetime, timedelta
 from functools import partial
 import math
 import json
 
+from bson.son import SON
+
 from django.http import HttpResponseBadRequest
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django_future.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_POST
 from django.conf import settings
+from django.core.cache import cache
 
 from edxmako.shortcuts import render_to_response
 from cache_toolbox.core import del_cached_content
 
+from contentstore.tasks import enqueue_asset_processing
 from contentstore.utils import reverse_course_url
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
@@ -25,12 +33,17 @@ from util.date_utils import get_default_time_display
 from util.json_request import JsonResponse
 from django.http import HttpResponseNotFound
 from django.utils.translation import ugettext as _
-from pymongo import ASCENDING, DESCENDING
 from .access import has_course_access
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
 __all__ = ['assets_handler']
 
+# how long the number of a course's assets is cached (uploads and deletes keep it up to date)
+ASSET_COUNT_CACHE_TIMEOUT = 60 * 60
+
+# the attrs ContentStore.process_asset sets which a re-upload of the same content keeps
+PROCESSED_ASSET_ATTRS = ('processed_md5', 'thumbnail_location', 'image_size')
+
 
 # pylint: disable=unused-argument
 @login_required
@@ -91,44 +104,49 @@ def _assets_json(request, course_key):
     """
     Display an editable asset library.
 
-    Supports start (0-based index into the list of assets) and max query parameters.
+    Supports page (0-based), page_size, sort (date_added or display_name), direction (asc or desc), and
+    prefix (of the assets' display names) query parameters. A cursor parameter (the nextCursor of the
+    previous page's response) makes the store read the next page from where the previous one ended
+    rather than skip over all the earlier assets.
     """
     requested_page = int(request.REQUEST.get('page', 0))
     requested_page_size = int(request.REQUEST.get('page_size', 50))
     requested_sort = request.REQUEST.get('sort', 'date_added')
-    sort_direction = DESCENDING
-    if request.REQUEST.get('direction', '').lower() == 'asc':
-        sort_direction = ASCENDING
+    ascending = request.REQUEST.get('direction', '').lower() == 'asc'
+    prefix = request.REQUEST.get('prefix') or None
 
     # Convert the field name to the Mongo name
     if requested_sort == 'date_added':
         requested_sort = 'uploadDate'
     elif requested_sort == 'display_name':
         requested_sort = 'displayname'
-    sort = [(requested_sort, sort_direction)]
+    if requested_sort not in ('uploadDate', 'displayname'):
+        return HttpResponseBadRequest()
 
     current_page = max(requested_page, 0)
     start = current_page * requested_page_size
-    assets, total_count = _get_assets_for_page(request, course_key, current_page, requested_page_size, sort)
-    end = start + len(assets)
+    after = _decode_cursor(request.REQUEST.get('cursor'), requested_sort, ascending, prefix)
+    total_count = _get_asset_count(course_key, prefix)
 
-    # If the query is beyond the final page, then re-query the final page so that at least one asset is returned
+    # If the query is beyond the final page, then query the final page so that at least one asset is returned
     if requested_page > 0 and start >= total_count:
         current_page = int(math.floor((total_count - 1) / requested_page_size))
         start = current_page * requested_page_size
-        assets, total_count = _get_assets_for_page(request, course_key, current_page, requested_page_size, sort)
-        end = start + len(assets)
+        after = None
+
+    assets, next_position = contentstore().get_content_page_for_course(
+        course_key, sort_field=requested_sort, ascending=ascending, page_size=requested_page_size,
+        start=start, after=after, prefix=prefix
+    )
+    end = start + len(assets)
 
     asset_json = []
     for asset in assets:
-        asset_location = asset['asset_key']
-        # note, due to the schema change we may not have a 'thumbnail_location' in the result set
-        thumbnail_location = asset.get('thumbnail_location', None)
-        if thumbnail_location:
-            thumbnail_location = course_key.make_asset_key('thumbnail', thumbnail_location[4])
-
         asset_locked = asset.get('locked', False)
-        asset_json.append(_get_asset_json(asset['displayname'], asset['uploadDate'], asset_location, thumbnail_location, asset_locked))
+        asset_json.append(_get_asset_json(
+            asset['displayname'], asset['uploadDate'], asset['asset_key'], _thumbnail_key(course_key, asset),
+            asset_locked, processing=asset.get('processing', False)
+        ))
 
     return JsonResponse({
         'start': start,
@@ -138,18 +156,88 @@ def _assets_json(request, course_key):
         'totalCount': total_count,
         'assets': asset_json,
         'sort': requested_sort,
+        'nextCursor': _encode_cursor(next_position, requested_sort, ascending, prefix) if end < total_count else None,
     })
 
 
-def _get_assets_for_page(request, course_key, current_page, page_size, sort):
+def _encode_cursor(position, sort, ascending, prefix):
     """
-    Returns the list of assets for the specified page and page size.
+    Encode the store's position after a page (see ContentStore.get_content_page_for_course) for the client
+    to pass back as the cursor of the next page. The cursor records the ordering it's a position in.
     """
-    start = current_page * page_size
+    if position is None:
+        return None
+    value, asset_id = position
+    if isinstance(value, datetime):
+        value = {'$date': calendar.timegm(value.utctimetuple()) * 1000 + value.microsecond // 1000}
+    if isinstance(asset_id, dict):
+        # deprecated assets' ids are compared by their fields in order; so, keep it
+        asset_id = {'$son': asset_id.items()}
+    return base64.urlsafe_b64encode(json.dumps([sort, ascending, prefix, value, asset_id]))
+
+
+def _decode_cursor(cursor, sort, ascending, prefix):
+    """
+    Return the store's position encoded in cursor or None if there's no cursor, it's malformed, or it's
+    a position in another ordering of the assets.
+    """
+    if not cursor:
+        return None
+    try:
+        cursor_sort, cursor_ascending, cursor_prefix, value, asset_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii'))
+        )
+        if (cursor_sort, cursor_ascending, cursor_prefix) != (sort, ascending, prefix):
+            return None
+        if isinstance(value, dict):
+            value = datetime(1970, 1, 1) + timedelta(milliseconds=value['$date'])
+        if isinstance(asset_id, dict):
+            asset_id = SON(asset_id['$son'])
+    except (TypeError, ValueError, KeyError, UnicodeError):
+        logging.warning("Ignoring malformed asset cursor: %s", cursor)
+        return None
+    return value, asset_id
+
+
+def _asset_count_cache_key(course_key):
+    """
+    The cache key of the number of the course's assets
+    """
+    return u"contentstore.asset_count.{}".format(course_key)
 
-    return contentstore().get_all_content_for_course(
-        course_key, start=start, maxresults=page_size, sort=sort
-    )
+
+def _get_asset_count(course_key, prefix=None):
+    """
+    Returns the number of the course's assets (whose display names start with prefix if given). The
+    course's total is cached and kept up to date by uploads and deletes through this view; counts of
+    prefixes aren't.
+    """
+    if prefix:
+        return contentstore().get_content_count_for_course(course_key, prefix=prefix)
+    cache_key = _asset_count_cache_key(course_key)
+    count = cache.get(cache_key)
+    if count is None:
+        count = contentstore().get_content_count_for_course(course_key)
+        cache.set(cache_key, count, ASSET_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def _update_asset_count(course_key, delta):
+    """
+    Add delta to the course's cached number of assets if it's cached
+    """
+    try:
+        cache.incr(_asset_count_cache_key(course_key), delta)
+    except ValueError:
+        # not cached: the next listing counts them
+        pass
+
+
+def clear_asset_count(course_key):
+    """
+    Forget the course's cached number of assets (e.g., after an import replaces them)
+    """
+    cache.delete(_asset_count_cache_key(course_key))
 
 
 @require_POST
@@ -181,36 +269,59 @@ def _upload_asset(request, course_key):
 
     chunked = upload_file.multiple_chunks()
     sc_partial = partial(StaticContent, content_loc, filename, mime_type)
+    md5 = hashlib.md5()
     if chunked:
+        for chunk in upload_file.chunks():
+            md5.update(chunk)
         content = sc_partial(upload_file.chunks())
-        tempfile_path = upload_file.temporary_file_path()
     else:
-        content = sc_partial(upload_file.read())
-        tempfile_path = None
+        data = upload_file.read()
+        md5.update(data)
+        content = sc_partial(data)
+    md5 = md5.hexdigest()
 
-    # first let's see if a thumbnail can be created
-    (thumbnail_content, thumbnail_location) = contentstore().generate_thumbnail(
-            content,
-            tempfile_path=tempfile_path
+    try:
+        previous_attrs = contentstore().get_attrs(content_loc)
+    except NotFoundError:
+        previous_attrs = None
+
+    # the thumbnail and image metadata are generated after the upload returns unless the asset's
+    # content and type are unchanged and were already processed
+    already_processed = (
+        previous_attrs is not None and
+        previous_attrs.get('md5') == md5 and
+        previous_attrs.get('processed_md5') == md5 and
+        previous_attrs.get('contentType') == mime_type
     )
-
-    # delete cached thumbnail even if one couldn't be created this time (else
-    # the old thumbnail will continue to show)
-    del_cached_content(thumbnail_location)
-    # now store thumbnail location only if we could create it
-    if thumbnail_content is not None:
-        content.thumbnail_location = thumbnail_location
+    if already_processed:
+        content.thumbnail_location = _thumbnail_key(course_key, previous_attrs)
 
     # then commit the content
     contentstore().save(content)
     del_cached_content(content.location)
+    if previous_attrs is None:
+        _update_asset_count(course_key, 1)
 
-    # readback the saved content - we need the database timestamp
-    readback = contentstore().find(content.location)
+    if already_processed:
+        contentstore().set_attrs(content_loc, {
+            attr: previous_attrs[attr] for attr in PROCESSED_ASSET_ATTRS if attr in previous_attrs
+        })
+    else:
+        # delete the cached thumbnail (else the old thumbnail will continue to show)
+        del_cached_content(StaticContent.compute_location(
+            course_key, StaticContent.generate_thumbnail_name(content_loc.name), is_thumbnail=True
+        ))
+        enqueue_asset_processing(content_loc, md5)
+
+    # readback the saved content - we need the database timestamp (and the processing may have finished)
+    readback = contentstore().get_attrs(content_loc)
 
     locked = getattr(content, 'locked', False)
     response_payload = {
-        'asset': _get_asset_json(content.name, readback.last_modified_at, content.location, content.thumbnail_location, locked),
+        'asset': _get_asset_json(
+            content.name, readback['uploadDate'], content.location, _thumbnail_key(course_key, readback), locked,
+            processing=readback.get('processing', False)
+        ),
         'msg': _('Upload completed')
     }
 
@@ -254,6 +365,7 @@ def _update_asset(request, course_key, asset_key):
 
         # delete the original
         contentstore().delete(content.get_id())
+        _update_asset_count(course_key, -1)
         # remove from cache
         del_cached_content(content.location)
         return JsonResponse()
@@ -273,9 +385,22 @@ def _update_asset(request, course_key, asset_key):
             return JsonResponse(modified_asset, status=201)
 
 
-def _get_asset_json(display_name, date, location, thumbnail_location, locked):
+def _thumbnail_key(course_key, attrs):
+    """
+    The key of the thumbnail recorded in an asset's attrs or None if it has none
+    """
+    # note, due to the schema change we may not have a 'thumbnail_location' in the attrs
+    thumbnail_location = attrs.get('thumbnail_location')
+    if thumbnail_location:
+        return course_key.make_asset_key('thumbnail', thumbnail_location[4])
+    return None
+
+
+def _get_asset_json(display_name, date, location, thumbnail_location, locked, processing=False):
     """
     Helper method for formatting the asset information to send to client.
+
+    processing is whether the asset's thumbnail and metadata are still being generated.
     """
     asset_url = StaticContent.serialize_asset_key_with_slash(location)
     external_url = settings.LMS_BASE + asset_url
@@ -287,6 +412,7 @@ def _get_asset_json(display_name, date, location, thumbnail_location, locked):
         'portable_url': StaticContent.get_static_path_from_location(location),
         'thumbnail': StaticContent.serialize_asset_key_with_slash(thumbnail_location) if thumbnail_location else None,
         'locked': locked,
+        'processing': processing,
         # Needed for Backbone delete/update.
         'id': unicode(location)
     }
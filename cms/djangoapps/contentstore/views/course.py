@@ -18,12 +18,11 @@ from util.date_utils import get_default_time_display
 from edxmako.shortcuts import render_to_response
 
 from xmodule.course_module import DEFAULT_START_DATE
-from xmodule.error_module import ErrorDescriptor
 from xmodule.modulestore.django import modulestore
 from xmodule.contentstore.content import StaticContent
 from xmodule.tabs import PDFTextbookTabs
 from xmodule.partitions.partitions import UserPartition, Group
-from xmodule.modulestore import EdxJSONEncoder
+from xmodule.modulestore import EdxJSONEncoder, course_in_orgs_or_keys
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locations import Location
@@ -60,9 +59,10 @@ from .item import create_xblock_info
 from course_creators.views import get_course_creator_status, add_user_with_status_unrequested
 from contentstore import utils
 from student.roles import (
-    CourseInstructorRole, CourseStaffRole, CourseCreatorRole, GlobalStaff, UserBasedRole
+    CourseInstructorRole, CourseStaffRole, CourseCreatorRole, GlobalStaff
 )
 from student import auth
+from student.models import CourseAccessRole
 from course_action_state.models import CourseRerunState, CourseRerunUIStateManager
 from course_action_state.managers import CourseActionStateItemNotFoundError
 from microsite_configuration import microsite
@@ -81,14 +81,6 @@ __all__ = ['course_info_handler', 'course_handler', 'course_info_update_handler'
 log = logging.getLogger(__name__)
 
 
-class AccessListFallback(Exception):
-    """
-    An exception that is raised whenever we need to `fall back` to fetching *all* courses
-    available to a user, rather than using a shorter method (i.e. fetching by group)
-    """
-    pass
-
-
 def _get_course_module(course_key, user, depth=0):
     """
     Internal method used to calculate and return the locator and course module
@@ -273,71 +265,45 @@ def _course_outline_json(request, course_module):
     )
 
 
-def _accessible_courses_list(request):
+def _accessible_courses_summary_list(orgs=None, course_keys=None):
     """
-    List all courses available to the logged in user by iterating through all the courses
+    List the summaries (see the modulestores' get_course_summaries) of the courses in orgs or with
+    course_keys (or of all the courses if neither is given) and their unsucceeded course actions
     """
-    def course_filter(course):
-        """
-        Filter out unusable and inaccessible courses
-        """
-        if isinstance(course, ErrorDescriptor):
-            return False
-
+    courses = [
+        course for course in modulestore().get_course_summaries(orgs=orgs, course_keys=course_keys)
         # pylint: disable=fixme
         # TODO remove this condition when templates purged from db
-        if course.location.course == 'templates':
-            return False
-
-        return has_course_access(request.user, course.id)
-
-    courses = filter(course_filter, modulestore().get_courses())
+        if course.location.course != 'templates'
+    ]
     in_process_course_actions = [
         course for course in
         CourseRerunState.objects.find_all(
             exclude_args={'state': CourseRerunUIStateManager.State.SUCCEEDED}, should_display=True
         )
-        if has_course_access(request.user, course.course_key)
+        if course_in_orgs_or_keys(course.course_key, orgs, course_keys)
     ]
     return courses, in_process_course_actions
 
 
-def _accessible_courses_list_from_groups(request):
+def _accessible_courses_summary_list_from_roles(request):
     """
-    List all courses available to the logged in user by reversing access group names
+    List the summaries of the courses the logged in user has staff or instructor access to. The user's
+    course and org wide roles are read in one query and the courses are then selected by key or by org.
     """
-    courses_list = {}
-    in_process_course_actions = []
-
-    instructor_courses = UserBasedRole(request.user, CourseInstructorRole.ROLE).courses_with_role()
-    staff_courses = UserBasedRole(request.user, CourseStaffRole.ROLE).courses_with_role()
-    all_courses = instructor_courses | staff_courses
-
-    for course_access in all_courses:
-        course_key = course_access.course_id
-        if course_key is None:
-            # If the course_access does not have a course_id, it's an org-based role, so we fall back
-            raise AccessListFallback
-        if course_key not in courses_list:
-            # check for any course action state for this course
-            in_process_course_actions.extend(
-                CourseRerunState.objects.find_all(
-                    exclude_args={'state': CourseRerunUIStateManager.State.SUCCEEDED},
-                    should_display=True,
-                    course_key=course_key,
-                )
-            )
-            # check for the course itself
-            try:
-                course = modulestore().get_course(course_key)
-            except ItemNotFoundError:
-                # If a user has access to a course that doesn't exist, don't do anything with that course
-                pass
-            if course is not None and not isinstance(course, ErrorDescriptor):
-                # ignore deleted or errored courses
-                courses_list[course_key] = course
-
-    return courses_list.values(), in_process_course_actions
+    orgs = set()
+    course_keys = set()
+    for access_role in CourseAccessRole.objects.filter(
+            user=request.user, role__in=[CourseInstructorRole.ROLE, CourseStaffRole.ROLE]
+    ):
+        if access_role.course_id is None:
+            # an org-based role gives access to all the org's courses
+            orgs.add(access_role.org)
+        else:
+            course_keys.add(access_role.course_id)
+    if not orgs and not course_keys:
+        return [], []
+    return _accessible_courses_summary_list(orgs=orgs, course_keys=course_keys)
 
 
 @login_required
@@ -345,19 +311,12 @@ def _accessible_courses_list_from_groups(request):
 def course_listing(request):
     """
     List all courses available to the logged in user
-    Try to get all courses by first reversing django groups and fallback to old method if it fails
-    Note: overhead of pymongo reads will increase if getting courses from django groups fails
     """
     if GlobalStaff().has_user(request.user):
         # user has global access so no need to get courses from django groups
-        courses, in_process_course_actions = _accessible_courses_list(request)
+        courses, in_process_course_actions = _accessible_courses_summary_list()
     else:
-        try:
-            courses, in_process_course_actions = _accessible_courses_list_from_groups(request)
-        except AccessListFallback:
-            # user have some old groups or there was some error getting courses from django groups
-            # so fallback to iterating through all courses
-            courses, in_process_course_actions = _accessible_courses_list(request)
+        courses, in_process_course_actions = _accessible_courses_summary_list_from_roles(request)
 
     def format_course_for_view(course):
         """
@@ -397,7 +356,7 @@ def course_listing(request):
     courses = [
         format_course_for_view(c)
         for c in courses
-        if not isinstance(c, ErrorDescriptor) and (c.id not in in_process_action_course_keys)
+        if c.id not in in_process_action_course_keys
     ]
 
     in_process_course_actions = [format_in_process_course_view(uca) for uca in in_process_course_actions]
@@ -29,6 +29,7 @@ from xmodule.modulestore.xml_importer import import_from_xml
 from xmodule.modulestore.xml_exporter import export_to_xml
 
 from .access import has_course_access
+from .assets import clear_asset_count
 
 from extract_tar import safetar_extractall
 from student import auth
@@ -36,6 +37,7 @@ from student.roles import CourseInstructorRole, CourseStaffRole, GlobalStaff
 from util.json_request import JsonResponse
 from util.views import ensure_valid_course_key
 
+from contentstore.tasks import enqueue_asset_processing
 from contentstore.utils import reverse_course_url, reverse_usage_url
 
 
@@ -244,7 +246,10 @@ def import_handler(request, course_key_string):
                     load_error_modules=False,
                     static_content_store=contentstore(),
                     target_course_id=course_key,
+                    asset_processor=enqueue_asset_processing,
+                    incremental=getattr(settings, 'COURSE_IMPORT_INCREMENTAL', False),
                 )
+                clear_asset_count(course_key)
 
                 new_location = course_items[0].location
                 logging.debug('new course at {0}'.format(new_location))
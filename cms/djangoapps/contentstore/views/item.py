@@ -3,6 +3,7 @@ from __future__ import absolute_import
 
 import hashlib
 import logging
+import operator
 from uuid import uuid4
 from datetime import datetime
 from pytz import UTC
@@ -671,28 +672,16 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
 
     In addition, an optional include_children_predicate argument can be provided to define whether or
     not a particular xblock should have its children included.
-    """
-
-    def safe_get_username(user_id):
-        """
-        Guard against bad user_ids, like the infamous "**replace_user**".
-        Note that this will ignore our special known IDs (ModuleStoreEnum.UserID).
-        We should consider adding special handling for those values.
-
-        :param user_id: the user id to get the username of
-        :return: username, or None if the user does not exist or user_id is None
-        """
-        if user_id:
-            try:
-                return User.objects.get(id=user_id).username
-            except:  # pylint: disable=bare-except
-                pass
 
-        return None
+    The xblock and its descendants are visited once, depth first: the children's info is computed first
+    and the aggregate information (has_changes, visibility state, staff only message) is computed from it.
+    """
+    # fetch the ancestors once for the ancestor info, the parent, and the release date and staff lock sources
+    ancestors = _get_ancestor_xblocks(xblock) if include_ancestor_info else None
+    if parent_xblock is None and ancestors:
+        parent_xblock = ancestors[0]
 
     is_xblock_unit = is_unit(xblock, parent_xblock)
-    # this should not be calculated for Sections and Subsections on Unit page
-    has_changes = modulestore().has_changes(xblock) if (is_xblock_unit or course_outline) else None
 
     if graders is None:
         graders = CourseGradingModel.fetch(xblock.location.course_key).graders
@@ -709,6 +698,12 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     else:
         child_info = None
 
+    # this should not be calculated for Sections and Subsections on Unit page
+    if is_xblock_unit or course_outline:
+        has_changes = _compute_has_changes(xblock, child_info)
+    else:
+        has_changes = None
+
     # Treat DEFAULT_START_DATE as a magic number that means the release date has not been set
     release_date = get_default_time_display(xblock.start) if xblock.start != DEFAULT_START_DATE else None
     if xblock.category != 'course':
@@ -742,7 +737,7 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     if metadata is not None:
         xblock_info["metadata"] = metadata
     if include_ancestor_info:
-        xblock_info['ancestor_info'] = _create_xblock_ancestor_info(xblock, course_outline)
+        xblock_info['ancestor_info'] = _create_xblock_ancestor_info(ancestors, course_outline, graders)
     if child_info:
         xblock_info['child_info'] = child_info
     if visibility_state == VisibilityState.staff_only:
@@ -754,13 +749,14 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     # container page when rendering a unit. Since they are expensive to compute, only include them for units
     # that are not being rendered on the course outline.
     if is_xblock_unit and not course_outline:
-        xblock_info["edited_by"] = safe_get_username(xblock.subtree_edited_by)
-        xblock_info["published_by"] = safe_get_username(xblock.published_by)
+        usernames = _get_usernames([xblock.subtree_edited_by, xblock.published_by])
+        xblock_info["edited_by"] = usernames.get(xblock.subtree_edited_by)
+        xblock_info["published_by"] = usernames.get(xblock.published_by)
         xblock_info["currently_visible_to_students"] = is_currently_visible_to_students(xblock)
         if release_date:
-            xblock_info["release_date_from"] = _get_release_date_from(xblock)
+            xblock_info["release_date_from"] = _get_release_date_from(xblock, ancestors)
         if visibility_state == VisibilityState.staff_only:
-            xblock_info["staff_lock_from"] = _get_staff_lock_from(xblock)
+            xblock_info["staff_lock_from"] = _get_staff_lock_from(xblock, ancestors)
         else:
             xblock_info["staff_lock_from"] = None
     if course_outline:
@@ -774,6 +770,51 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     return xblock_info
 
 
+def _compute_has_changes(xblock, child_info):
+    """
+    Returns whether the xblock has unpublished changes. If any of the children whose info has already been
+    computed has changes, so does the xblock; so, only ask the modulestore (which checks the whole subtree)
+    when none has.
+    """
+    children = child_info and child_info.get('children')
+    if children and any(child['has_changes'] for child in children):
+        return True
+    return modulestore().has_changes(xblock)
+
+
+def _get_usernames(user_ids):
+    """
+    Returns {user_id: username} for the given user ids in one query.
+    Guard against bad user_ids, like the infamous "**replace_user**": they, None, and the ids of
+    users who don't exist are left out.
+    Note that this will ignore our special known IDs (ModuleStoreEnum.UserID).
+    We should consider adding special handling for those values.
+    """
+    valid_ids = {}
+    for user_id in user_ids:
+        try:
+            if user_id:
+                valid_ids[user_id] = int(user_id)
+        except (TypeError, ValueError):
+            pass
+    if not valid_ids:
+        return {}
+    usernames = dict(User.objects.filter(id__in=set(valid_ids.values())).values_list('id', 'username'))
+    return {user_id: usernames[valid_id] for user_id, valid_id in valid_ids.iteritems() if valid_id in usernames}
+
+
+def _get_ancestor_xblocks(xblock):
+    """
+    Returns the xblock's ancestors starting with its parent.
+    """
+    ancestors = []
+    ancestor = get_parent_xblock(xblock)
+    while ancestor:
+        ancestors.append(ancestor)
+        ancestor = get_parent_xblock(ancestor)
+    return ancestors
+
+
 class VisibilityState(object):
     """
     Represents the possible visibility states for an xblock:
@@ -843,29 +884,23 @@ def _compute_visibility_state(xblock, child_info, is_unit_with_changes):
         return VisibilityState.ready
 
 
-def _create_xblock_ancestor_info(xblock, course_outline):
+def _create_xblock_ancestor_info(ancestors, course_outline, graders):
     """
-    Returns information about the ancestors of an xblock. Note that the direct parent will also return
-    information about all of its children.
+    Returns information about the given ancestors of an xblock (see _get_ancestor_xblocks). Note that the
+    direct parent will also return information about all of its children.
     """
-    ancestors = []
-
-    def collect_ancestor_info(ancestor, include_child_info=False):
-        """
-        Collect xblock info regarding the specified xblock and its ancestors.
-        """
-        if ancestor:
-            direct_children_only = lambda parent: parent == ancestor
-            ancestors.append(create_xblock_info(
-                ancestor,
-                include_child_info=include_child_info,
-                course_outline=course_outline,
-                include_children_predicate=direct_children_only
-            ))
-            collect_ancestor_info(get_parent_xblock(ancestor))
-    collect_ancestor_info(get_parent_xblock(xblock), include_child_info=True)
+    ancestor_infos = []
+    for index, ancestor in enumerate(ancestors):
+        ancestor_infos.append(create_xblock_info(
+            ancestor,
+            include_child_info=(index == 0),
+            course_outline=course_outline,
+            include_children_predicate=partial(operator.eq, ancestor),
+            parent_xblock=ancestors[index + 1] if index + 1 < len(ancestors) else None,
+            graders=graders,
+        ))
     return {
-        'ancestors': ancestors
+        'ancestors': ancestor_infos
     }
 
 
@@ -893,18 +928,18 @@ def _create_xblock_child_info(xblock, course_outline, graders, include_children_
     return child_info
 
 
-def _get_release_date_from(xblock):
+def _get_release_date_from(xblock, ancestors=None):
     """
     Returns a string representation of the section or subsection that sets the xblock's release date
     """
-    return _xblock_type_and_display_name(find_release_date_source(xblock))
+    return _xblock_type_and_display_name(find_release_date_source(xblock, ancestors))
 
 
-def _get_staff_lock_from(xblock):
+def _get_staff_lock_from(xblock, ancestors=None):
     """
     Returns a string representation of the section or subsection that sets the xblock's release date
     """
-    source = find_staff_lock_source(xblock)
+    source = find_staff_lock_source(xblock, ancestors)
     return _xblock_type_and_display_name(source) if source else None
 
 
@@ -10,6 +10,7 @@ from datetime import datetime
 from io import BytesIO
 from pytz import UTC
 import json
+from mock import patch
 from contentstore.tests.utils import CourseTestCase
 from contentstore.views import assets
 from contentstore.utils import reverse_course_url
@@ -30,6 +31,8 @@ class AssetsTestCase(CourseTestCase):
     def setUp(self):
         super(AssetsTestCase, self).setUp()
         self.url = reverse_course_url('assets_handler', self.course.id)
+        # the contentstore is dropped between tests but the cached count of the course's assets isn't
+        assets.clear_asset_count(self.course.id)
 
     def upload_asset(self, name="asset-1"):
         f = BytesIO(name)
@@ -96,6 +99,50 @@ class PaginationTestCase(AssetsTestCase):
         self.assert_correct_asset_response(self.url + "?page_size=2&page=2", 2, 1, 3)
         self.assert_correct_asset_response(self.url + "?page_size=3&page=1", 0, 3, 3)
 
+    def test_cursor_pagination(self):
+        self.upload_asset("asset-1")
+        self.upload_asset("asset-2")
+        self.upload_asset("asset-3")
+
+        url = self.url + "?page_size=2&sort=display_name&direction=asc"
+        first_page = json.loads(self.client.get(url, HTTP_ACCEPT='application/json').content)
+        self.assertIsNotNone(first_page['nextCursor'])
+        second_page = json.loads(self.client.get(
+            url + "&page=1&cursor=" + first_page['nextCursor'], HTTP_ACCEPT='application/json'
+        ).content)
+        self.assertEquals(second_page['start'], 2)
+        self.assertEquals([asset['display_name'] for asset in second_page['assets']], ['asset-3.txt'])
+        self.assertIsNone(second_page['nextCursor'])
+
+        # a cursor of another sort or a malformed one is ignored
+        for cursor in (first_page['nextCursor'], 'not-a-cursor'):
+            resp = self.client.get(
+                self.url + "?page_size=2&page=1&sort=date_added&cursor=" + cursor, HTTP_ACCEPT='application/json'
+            )
+            self.assertEquals(len(json.loads(resp.content)['assets']), 1)
+
+    def test_prefix(self):
+        self.upload_asset("asset-1")
+        self.upload_asset("other-1")
+        resp = self.client.get(self.url + "?prefix=other", HTTP_ACCEPT='application/json')
+        json_response = json.loads(resp.content)
+        self.assertEquals(json_response['totalCount'], 1)
+        self.assertEquals([asset['display_name'] for asset in json_response['assets']], ['other-1.txt'])
+
+    def test_cached_count(self):
+        self.upload_asset("asset-1")
+        self.assert_correct_asset_response(self.url, 0, 1, 1)
+        # uploads and deletes keep the cached count up to date
+        self.upload_asset("asset-2")
+        self.upload_asset("asset-2")
+        self.assert_correct_asset_response(self.url, 0, 2, 2)
+        asset_key = self.course.id.make_asset_key('asset', 'asset-2.txt')
+        self.client.delete(
+            reverse_course_url('assets_handler', self.course.id, kwargs={'asset_key_string': unicode(asset_key)}),
+            HTTP_ACCEPT='application/json'
+        )
+        self.assert_correct_asset_response(self.url, 0, 1, 1)
+
     def assert_correct_asset_response(self, url, expected_start, expected_length, expected_total):
         resp = self.client.get(url, HTTP_ACCEPT='application/json')
         json_response = json.loads(resp.content)
@@ -135,6 +182,22 @@ class UploadTestCase(AssetsTestCase):
         resp = self.client.post(self.url, {"name": "file.txt"}, "application/json")
         self.assertEquals(resp.status_code, 400)
 
+    def test_thumbnail_processing(self):
+        def upload_image():
+            with open('common/test/data/static/picture1.jpg', 'rb') as image:
+                return json.loads(self.client.post(self.url, {"name": "picture1", "file": image}).content)['asset']
+
+        # the processing task runs eagerly in tests
+        asset = upload_image()
+        self.assertFalse(asset['processing'])
+        self.assertIsNotNone(asset['thumbnail'])
+
+        # re-uploading the same content keeps its processing
+        with patch('contentstore.views.assets.enqueue_asset_processing') as enqueue:
+            asset = upload_image()
+        self.assertFalse(enqueue.called)
+        self.assertIsNotNone(asset['thumbnail'])
+
 
 class DownloadTestCase(AssetsTestCase):
     """
@@ -8,6 +8,7 @@ import os
 import shutil
 import tarfile
 import tempfile
+from mock import patch
 from path import path
 from uuid import uuid4
 
@@ -16,6 +17,7 @@ from django.conf import settings
 from contentstore.utils import reverse_course_url
 
 from xmodule.modulestore.tests.factories import ItemFactory
+from xmodule.modulestore.xml_importer import import_from_xml
 
 from contentstore.tests.utils import CourseTestCase
 from student import auth
@@ -106,6 +108,17 @@ class ImportTestCase(CourseTestCase):
 
         self.assertEquals(resp.status_code, 200)
 
+    @override_settings(COURSE_IMPORT_INCREMENTAL=True)
+    def test_incremental_import(self):
+        """
+        Check that the COURSE_IMPORT_INCREMENTAL setting makes Studio's import incremental
+        """
+        with patch('contentstore.views.import_export.import_from_xml', wraps=import_from_xml) as mock_import:
+            with open(self.good_tar) as gtar:
+                resp = self.client.post(self.url, {"name": self.good_tar, "course-data": [gtar]})
+        self.assertEquals(resp.status_code, 200)
+        self.assertTrue(mock_import.call_args[1]['incremental'])
+
     def test_import_in_existing_course(self):
         """
         Check that course is imported successfully in existing course and users have their access roles
@@ -18,7 +18,9 @@ from contentstore.views.component import (
     component_handler, get_component_templates
 )
 
-from contentstore.views.item import create_xblock_info, ALWAYS, VisibilityState, _xblock_type_and_display_name
+from contentstore.views.item import (
+    create_xblock_info, ALWAYS, VisibilityState, _xblock_type_and_display_name, _get_usernames
+)
 from contentstore.tests.utils import CourseTestCase
 from student.tests.factories import UserFactory
 from xmodule.capa_module import CapaDescriptor
@@ -1265,6 +1267,32 @@ class TestXBlockInfo(ItemTest):
         )
         self.validate_component_xblock_info(xblock_info)
 
+    def test_outline_has_changes_from_children(self):
+        course = modulestore().get_item(self.course.location)
+        store = modulestore()
+        with patch.object(store, 'has_changes', side_effect=store.has_changes) as has_changes:
+            xblock_info = create_xblock_info(
+                course,
+                include_child_info=True,
+                course_outline=True,
+                include_children_predicate=lambda xblock: not xblock.category == 'vertical'
+            )
+        # the unpublished unit's changes are the section's, subsection's, and course's
+        chapter_info = xblock_info['child_info']['children'][0]
+        sequential_info = chapter_info['child_info']['children'][0]
+        self.assertTrue(sequential_info['child_info']['children'][0]['has_changes'])
+        self.assertTrue(sequential_info['has_changes'])
+        self.assertTrue(chapter_info['has_changes'])
+        self.assertTrue(xblock_info['has_changes'])
+        # only the unit's changes were looked up
+        self.assertEqual(has_changes.call_count, 1)
+
+    def test_get_usernames(self):
+        self.assertEqual(
+            _get_usernames([self.user.id, '**replace_user**', None, ModuleStoreEnum.UserID.test]),
+            {self.user.id: 'testuser'}
+        )
+
     def validate_course_xblock_info(self, xblock_info, has_child_info=True, course_outline=False):
         """
         Validate that the xblock info is correct for the test course.
@@ -100,6 +100,8 @@ if STATIC_URL_BASE:
 # GITHUB_REPO_ROOT is the base directory
 # for course data
 GITHUB_REPO_ROOT = ENV_TOKENS.get('GITHUB_REPO_ROOT', GITHUB_REPO_ROOT)
+# whether Studio's course import only writes, and deletes, what changed since the last import
+COURSE_IMPORT_INCREMENTAL = ENV_TOKENS.get('COURSE_IMPORT_INCREMENTAL', False)
 
 # STATIC_ROOT specifies the directory where static files are
 # collected
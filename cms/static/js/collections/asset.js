@@ -17,9 +17,19 @@ define(["backbone.paginator", "js/models/asset"], function(BackbonePaginator, As
             'page_size': function() { return this.perPage; },
             'sort': function() { return this.sortField; },
             'direction': function() { return this.sortDirection; },
+            'cursor': function() { return this.cursorForPage(this.currentPage); },
             'format': 'json'
         },
 
+        /**
+         * Returns the cursor the server gave for reading the given page from where the previous page ended,
+         * or an empty string if it didn't give one (the server then skips to the page). Cursors are only
+         * valid for the sort they were made with which the server checks.
+         */
+        cursorForPage: function(page) {
+            return (this.pageCursors && this.pageCursors[page]) || '';
+        },
+
         parse: function(response) {
             var totalCount = response.totalCount,
                 start = response.start,
@@ -30,6 +40,8 @@ define(["backbone.paginator", "js/models/asset"], function(BackbonePaginator, As
             this.totalPages = Math.max(totalPages, 1); // Treat an empty collection as having 1 page...
             this.currentPage = currentPage;
             this.start = start;
+            this.pageCursors = this.pageCursors || {};
+            this.pageCursors[currentPage + 1] = response.nextCursor;
             return response.assets;
         }
     });
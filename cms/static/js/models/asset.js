@@ -10,7 +10,8 @@ define(["backbone"], function(Backbone) {
       url: "",
       external_url: "",
       portable_url: "",
-      locked: false
+      locked: false,
+      processing: false
     }
   });
   return Asset;
@@ -16,6 +16,7 @@ var AssetView = BaseView.extend({
     this.$el.html(this.template({
       display_name: this.model.get('display_name'),
       thumbnail: this.model.get('thumbnail'),
+      processing: this.model.get('processing'),
       date_added: this.model.get('date_added'),
       url: this.model.get('url'),
       external_url: this.model.get('external_url'),
@@ -5,24 +5,85 @@ forums, and to the cohort admin views.
 
 import logging
 import random
+from collections import namedtuple
 
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_save, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.http import Http404
 from django.utils.translation import ugettext as _
 
 from courseware import courses
 from eventtracking import tracker
+from request_cache.middleware import BoundedDict, RequestCache
 from student.models import get_user_by_username_or_email
 from .models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+# The RequestCache namespaces of the course cohort settings snapshots and of users' cohorts (see below)
+COURSE_SETTINGS_NAMESPACE = u"course_groups.cohorts.course_settings"
+MEMBERSHIP_NAMESPACE = u"course_groups.cohorts.membership"
+# how many users' cohorts to keep at once (tasks, e.g. grade reports, go through every user of a course)
+MAX_CACHED_MEMBERSHIPS = 1000
+
+# A snapshot of the course's cohort settings
+CourseCohortSettings = namedtuple(
+    'CourseCohortSettings', 'is_cohorted cohorted_discussions top_level_discussion_topic_ids auto_cohort_groups'
+)
+
+
+def _request_cache(namespace, max_size=None):
+    """
+    The dict of the current request's (or celery task's) cached values in namespace, which holds at most
+    max_size (if given) of them
+    """
+    data = RequestCache.get_request_cache().data
+    if namespace not in data:
+        data[namespace] = {} if max_size is None else BoundedDict(max_size)
+    return data[namespace]
+
+
+def get_course_cohort_settings(course_key):
+    """
+    Return the CourseCohortSettings of the course with course_key. The course is only read once per request
+    (or celery task) however many times its settings are asked for (so, settings changes apply from the
+    next one).
+
+    Raises:
+       Http404 if the course doesn't exist.
+    """
+    course_settings = _request_cache(COURSE_SETTINGS_NAMESPACE)
+    if course_key not in course_settings:
+        course = courses.get_course_by_id(course_key)
+        course_settings[course_key] = CourseCohortSettings(
+            is_cohorted=course.is_cohorted,
+            cohorted_discussions=course.cohorted_discussions,
+            top_level_discussion_topic_ids=course.top_level_discussion_topic_ids,
+            auto_cohort_groups=course.auto_cohort_groups,
+        )
+    return course_settings[course_key]
+
+
+def _forget_cohort_memberships(course_key, user_ids=(), cohort_id=None):
+    """
+    Forget the cached cohorts in the course of the users with user_ids and of the members of the cohort
+    with cohort_id (if given)
+    """
+    memberships = _request_cache(MEMBERSHIP_NAMESPACE, MAX_CACHED_MEMBERSHIPS)
+    for (member_course_key, user_id), cohort in memberships.items():
+        if member_course_key != course_key:
+            continue
+        if user_id in user_ids or (cohort is not None and cohort.id == cohort_id):
+            del memberships[(member_course_key, user_id)]
+
 
 @receiver(post_save, sender=CourseUserGroup)
 def _cohort_added(sender, **kwargs):
     """Emits a tracking log event each time a cohort is created"""
     instance = kwargs["instance"]
+    if instance.group_type == CourseUserGroup.COHORT:
+        # its members' cached cohort objects are out of date (e.g., if it was renamed)
+        _forget_cohort_memberships(instance.course_id, cohort_id=instance.id)
     if kwargs["created"] and instance.group_type == CourseUserGroup.COHORT:
         tracker.emit(
             "edx.cohort.created",
@@ -30,9 +91,20 @@ def _cohort_added(sender, **kwargs):
         )
 
 
+@receiver(pre_delete, sender=CourseUserGroup)
+def _cohort_deleted(sender, **kwargs):
+    """Forgets the cached cohort of the members of a cohort which is being deleted"""
+    instance = kwargs["instance"]
+    if instance.group_type == CourseUserGroup.COHORT:
+        _forget_cohort_memberships(instance.course_id, cohort_id=instance.id)
+
+
 @receiver(m2m_changed, sender=CourseUserGroup.users.through)
 def _cohort_membership_changed(sender, **kwargs):
-    """Emits a tracking log event each time cohort membership is modified"""
+    """
+    Emits a tracking log event each time cohort membership is modified and forgets the cached cohorts of
+    the users whose membership changed
+    """
     def get_event_iter(user_id_iter, cohort_iter):
         return (
             {"cohort_id": cohort.id, "cohort_name": cohort.name, "user_id": user_id}
@@ -55,15 +127,18 @@ def _cohort_membership_changed(sender, **kwargs):
     if reverse:
         user_id_iter = [instance.id]
         if action == "pre_clear":
-            cohort_iter = instance.course_groups.filter(group_type=CourseUserGroup.COHORT)
+            cohort_iter = list(instance.course_groups.filter(group_type=CourseUserGroup.COHORT))
         else:
-            cohort_iter = CourseUserGroup.objects.filter(pk__in=pk_set, group_type=CourseUserGroup.COHORT)
+            cohort_iter = list(CourseUserGroup.objects.filter(pk__in=pk_set, group_type=CourseUserGroup.COHORT))
     else:
         cohort_iter = [instance] if instance.group_type == CourseUserGroup.COHORT else []
         if action == "pre_clear":
-            user_id_iter = (user.id for user in instance.users.all())
+            user_id_iter = [user.id for user in instance.users.all()]
         else:
-            user_id_iter = pk_set
+            user_id_iter = list(pk_set)
+
+    for cohort in cohort_iter:
+        _forget_cohort_memberships(cohort.course_id, user_ids=set(user_id_iter))
 
     for event in get_event_iter(user_id_iter, cohort_iter):
         tracker.emit(event_name, event)
@@ -133,7 +208,7 @@ def is_course_cohorted(course_key):
     Raises:
        Http404 if the course doesn't exist.
     """
-    return courses.get_course_by_id(course_key).is_cohorted
+    return get_course_cohort_settings(course_key).is_cohorted
 
 
 def get_cohort_id(user, course_key):
@@ -157,7 +232,7 @@ def is_commentable_cohorted(course_key, commentable_id):
     Raises:
         Http404 if the course doesn't exist.
     """
-    course = courses.get_course_by_id(course_key)
+    course = get_course_cohort_settings(course_key)
 
     if not course.is_cohorted:
         # this is the easy case :)
@@ -181,7 +256,7 @@ def get_cohorted_commentables(course_key):
     Given a course_key return a set of strings representing cohorted commentables.
     """
 
-    course = courses.get_course_by_id(course_key)
+    course = get_course_cohort_settings(course_key)
 
     if not course.is_cohorted:
         # this is the easy case :)
@@ -211,20 +286,17 @@ def get_cohort(user, course_key):
     # First check whether the course is cohorted (users shouldn't be in a cohort
     # in non-cohorted courses, but settings can change after course starts)
     try:
-        course = courses.get_course_by_id(course_key)
+        course = get_course_cohort_settings(course_key)
     except Http404:
         raise ValueError("Invalid course_key")
 
     if not course.is_cohorted:
         return None
 
-    try:
-        return CourseUserGroup.objects.get(course_id=course_key,
-                                            group_type=CourseUserGroup.COHORT,
-                                            users__id=user.id)
-    except CourseUserGroup.DoesNotExist:
-        # Didn't find the group.  We'll go on to create one if needed.
-        pass
+    cohort = get_cohorts_by_user_id(course_key, [user.id])[user.id]
+    if cohort is not None:
+        return cohort
+    # Didn't find the group.  We'll go on to create one if needed.
 
     choices = course.auto_cohort_groups
     if len(choices) > 0:
@@ -243,6 +315,48 @@ def get_cohort(user, course_key):
     return group
 
 
+def get_cohorts_by_user_id(course_key, user_ids):
+    """
+    Return {user id: the user's cohort (a CourseUserGroup) in the course or None} for each of user_ids.
+    Unlike get_cohort, it doesn't check whether the course is cohorted nor assign users to cohorts.
+
+    The users' cohorts are read in one query and cached for the rest of the request or celery task (membership
+    changes forget them).
+    """
+    memberships = _request_cache(MEMBERSHIP_NAMESPACE, MAX_CACHED_MEMBERSHIPS)
+    user_cohorts = {}
+    uncached = set()
+    for user_id in user_ids:
+        if (course_key, user_id) in memberships:
+            user_cohorts[user_id] = memberships[(course_key, user_id)]
+        else:
+            uncached.add(user_id)
+    if uncached:
+        read = dict.fromkeys(uncached)
+        for membership in CourseUserGroup.users.through.objects.filter(
+                courseusergroup__course_id=course_key,
+                courseusergroup__group_type=CourseUserGroup.COHORT,
+                user_id__in=uncached
+        ).select_related('courseusergroup'):
+            read[membership.user_id] = membership.courseusergroup
+        # the cache may not hold all of them; so, answer from what was read
+        for user_id, cohort in read.iteritems():
+            memberships[(course_key, user_id)] = cohort
+        user_cohorts.update(read)
+    return user_cohorts
+
+
+def get_cohort_ids(course_key, user_ids):
+    """
+    Return {user id: the id of the user's cohort in the course or None} for each of user_ids (see
+    get_cohorts_by_user_id).
+    """
+    return {
+        user_id: None if cohort is None else cohort.id
+        for user_id, cohort in get_cohorts_by_user_id(course_key, user_ids).iteritems()
+    }
+
+
 def get_course_cohorts(course):
     """
     Get a list of all the cohorts in the given course. This will include auto cohorts,
@@ -341,19 +455,14 @@ def add_user_to_cohort(cohort, username_or_email):
     previous_cohort_name = None
     previous_cohort_id = None
 
-    course_cohorts = CourseUserGroup.objects.filter(
-        course_id=cohort.course_id,
-        users__id=user.id,
-        group_type=CourseUserGroup.COHORT
-    )
-    if course_cohorts.exists():
-        if course_cohorts[0] == cohort:
+    previous_cohort = get_cohorts_by_user_id(cohort.course_id, [user.id])[user.id]
+    if previous_cohort is not None:
+        if previous_cohort == cohort:
             raise ValueError("User {user_name} already present in cohort {cohort_name}".format(
                 user_name=user.username,
                 cohort_name=cohort.name
             ))
         else:
-            previous_cohort = course_cohorts[0]
             previous_cohort.users.remove(user)
             previous_cohort_name = previous_cohort.name
             previous_cohort_id = previous_cohort.id
@@ -5,6 +5,7 @@ from factory import post_generation, Sequence
 from factory.django import DjangoModelFactory
 from course_groups.models import CourseUserGroup
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from request_cache.middleware import RequestCache
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore import ModuleStoreEnum
 
@@ -88,3 +89,5 @@ def config_course_cohorts(
         modulestore().update_item(course, ModuleStoreEnum.UserID.test)
     except NotImplementedError:
         pass
+    # cohort settings are read once per request
+    RequestCache().clear_request_cache()
@@ -1,11 +1,13 @@
 import django.test
+from celery.signals import task_prerun
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.http import Http404
 
 from django.test.utils import override_settings
-from mock import call, patch
+from mock import call, Mock, patch
 
+from request_cache.middleware import RequestCache
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from course_groups.models import CourseUserGroup
@@ -131,6 +133,7 @@ class TestCohorts(django.test.TestCase):
         Make sure that course is reloaded every time--clear out the modulestore.
         """
         clear_existing_modulestores()
+        RequestCache().clear_request_cache()
         self.toy_course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
 
     def test_is_course_cohorted(self):
@@ -414,6 +417,76 @@ class TestCohorts(django.test.TestCase):
             lambda: cohorts.get_cohorted_commentables(SlashSeparatedCourseKey("course", "does_not", "exist"))
         )
 
+    def test_course_cohort_settings_cached(self):
+        """
+        Make sure the course is read once per request however many cohort settings are asked for
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        config_course_cohorts(course, ["General"], cohorted=True, cohorted_discussions=["General"])
+        with patch.object(cohorts.courses, "get_course_by_id", wraps=cohorts.courses.get_course_by_id) as get_course:
+            self.assertTrue(cohorts.is_course_cohorted(course.id))
+            self.assertTrue(cohorts.is_commentable_cohorted(course.id, topic_name_to_id(course, "General")))
+            self.assertEqual(len(cohorts.get_cohorted_commentables(course.id)), 1)
+            self.assertEqual(get_course.call_count, 1)
+
+    def test_course_cohort_settings_cleared_around_tasks(self):
+        """
+        Make sure celery tasks see settings changes made since the worker's previous task
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        self.assertFalse(cohorts.is_course_cohorted(course.id))
+        task_prerun.send(sender=None, task_id='task', task=Mock(request=Mock(is_eager=False)))
+        with patch.object(cohorts.courses, "get_course_by_id", wraps=cohorts.courses.get_course_by_id) as get_course:
+            self.assertFalse(cohorts.is_course_cohorted(course.id))
+            self.assertEqual(get_course.call_count, 1)
+
+    def test_get_cohort_ids(self):
+        """
+        Make sure cohorts.get_cohort_ids() reads many users' cohorts in one query and that membership
+        changes are seen
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        config_course_cohorts(course, discussions=[], cohorted=True)
+        users = [UserFactory(username="test{}".format(index)) for index in range(3)]
+        cohort = CohortFactory(course_id=course.id, name="TestCohort", users=users[:2])
+        other_course_cohort = CohortFactory(course_id=SlashSeparatedCourseKey("a", "b", "c"), users=users[2:])
+        user_ids = [user.id for user in users]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                cohorts.get_cohort_ids(course.id, user_ids),
+                {users[0].id: cohort.id, users[1].id: cohort.id, users[2].id: None}
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(cohorts.get_cohort_id(users[0], course.id), cohort.id)
+
+        cohort.users.remove(users[0])
+        other_cohort = CohortFactory(course_id=course.id, name="OtherCohort", users=[users[2]])
+        self.assertEqual(
+            cohorts.get_cohort_ids(course.id, user_ids),
+            {users[0].id: None, users[1].id: cohort.id, users[2].id: other_cohort.id}
+        )
+        self.assertEqual(
+            cohorts.get_cohort_ids(other_course_cohort.course_id, user_ids)[users[2].id], other_course_cohort.id
+        )
+
+    @patch.object(cohorts, "MAX_CACHED_MEMBERSHIPS", 2)
+    def test_get_cohort_ids_bounded(self):
+        """
+        Make sure cohorts.get_cohort_ids() answers for more users than it caches
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        users = [UserFactory(username="test{}".format(index)) for index in range(3)]
+        cohort = CohortFactory(course_id=course.id, name="TestCohort", users=users)
+        self.assertEqual(
+            cohorts.get_cohort_ids(course.id, [user.id for user in users]),
+            {user.id: cohort.id for user in users}
+        )
+
+        cohort.name = "RenamedCohort"
+        cohort.save()
+        self.assertEqual(cohorts.get_cohort(users[1], course.id).name, "RenamedCohort")
+
     def test_get_cohort_by_name(self):
         """
         Make sure cohorts.get_cohort_by_name() properly finds a cohort by name for a given course.  Also verify that it
@@ -1,4 +1,7 @@
 import threading
+from collections import OrderedDict
+
+from celery.signals import task_postrun, task_prerun
 
 _request_cache_threadlocal = threading.local()
 _request_cache_threadlocal.data = {}
@@ -17,4 +20,32 @@ class RequestCache(object):
 
     def process_response(self, request, response):
         self.clear_request_cache()
-        return response
\ No newline at end of file
+        return response
+
+
+@task_prerun.connect
+@task_postrun.connect
+def clear_request_cache_for_task(task=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Celery tasks don't go through the middleware; so, clear the cache around each task as the middleware
+    does around each request so that nothing cached outlives the task (or goes stale) in the worker. Eager
+    tasks run within the caller's request (or task) and so share its cache.
+    """
+    if task is not None and getattr(task.request, 'is_eager', False):
+        return
+    RequestCache().clear_request_cache()
+
+
+class BoundedDict(OrderedDict):
+    """
+    A dict which forgets its oldest entries once it holds more than max_size. For caching per user values
+    in the request cache: a request only touches a few users but a task can touch all of a course's.
+    """
+    def __init__(self, max_size, *args, **kwargs):
+        self.max_size = max_size
+        super(BoundedDict, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):  # pylint: disable=arguments-differ
+        OrderedDict.__setitem__(self, key, value)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
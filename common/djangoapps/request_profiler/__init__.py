@@ -0,0 +1,8 @@
+"""
+Opt-in profiling of where requests spend their time.
+
+When FEATURES['ENABLE_REQUEST_PROFILER'] is on, :class:`request_profiler.middleware.RequestProfilerMiddleware`
+installs hooks (see :mod:`request_profiler.profiler`) around the modulestores' reads, sql queries, mongo
+round trips, the cache, template rendering, safe_exec, and comment service calls and, for the sampled
+requests, attributes wall time and call counts to them.
+"""
@@ -0,0 +1,141 @@
+"""
+Middleware which profiles a sample of requests.
+
+Usage:
+
+# Enable the middleware in your settings (it should directly follow request_cache's RequestCache)
+FEATURES['ENABLE_REQUEST_PROFILER'] = True
+
+# Then configure it with
+REQUEST_PROFILER = {
+    # the fraction of requests to profile; 0 profiles only the requests of global staff who ask for it
+    'SAMPLE_RATE': 0.01,
+    # the query parameter with which global staff ask for a profile panel on an html page
+    'PANEL_PARAMETER': 'profile',
+    # {name: dotted path of a function returning a json-able dict} of other per request counts to report
+    'COUNTERS': {},
+    # (module, function, subsystem) triples of other functions to time
+    'FUNCTION_HOOKS': (),
+}
+
+Each profiled response gets an X-Request-Profile header summarizing it, e.g.,
+``total=212.3ms; modulestore=14/80.1ms; mongo=9/31.0ms; sql=22/18.4ms; cache_hits=40; cache_misses=3``
+and the profile is logged as json to the request_profiler.middleware logger.
+"""
+import json
+import logging
+import random
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.html import escape
+from django.utils.importlib import import_module
+
+from request_profiler import profiler
+from student.roles import GlobalStaff
+
+log = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Request-Profile'
+
+
+def _import_function(path):
+    """
+    Return the function at the dotted path
+    """
+    module_name, __, name = path.rpartition('.')
+    return getattr(import_module(module_name), name)
+
+
+class RequestProfilerMiddleware(object):
+    """
+    Profiles a sample of requests and the requests of global staff who ask for it
+    """
+    def __init__(self):
+        if not settings.FEATURES.get('ENABLE_REQUEST_PROFILER', False):
+            raise MiddlewareNotUsed()
+        config = getattr(settings, 'REQUEST_PROFILER', {})
+        self.sample_rate = config.get('SAMPLE_RATE', 0)
+        self.panel_parameter = config.get('PANEL_PARAMETER', 'profile')
+        self.counters = {
+            name: _import_function(path) for name, path in config.get('COUNTERS', {}).iteritems()
+        }
+        profiler.install_hooks(config.get('FUNCTION_HOOKS', ()))
+
+    def process_request(self, request):
+        """
+        Start profiling the request if it's sampled or asks for a panel
+        """
+        # request.user isn't set yet; so, whether a panel may be shown is checked in process_response
+        request.profile_sampled = random.random() < self.sample_rate
+        if request.profile_sampled or self.panel_parameter in request.GET:
+            profiler.start_profile()
+
+    def process_response(self, request, response):
+        """
+        Report the request's profile if it has one
+        """
+        profile = profiler.stop_profile()
+        if profile is None:
+            return response
+
+        show_panel = self._show_panel(request, response)
+        if not (show_panel or getattr(request, 'profile_sampled', False)):
+            return response
+
+        data = profile.to_json()
+        data.update({
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+        })
+        for name, counter in self.counters.iteritems():
+            try:
+                data['counters'][name] = counter()
+            except Exception:  # pylint: disable=broad-except
+                log.exception(u"Request profiler counter %s failed", name)
+
+        response[PROFILE_HEADER] = profile.summary()
+        log.info(u"request profile: %s", json.dumps(data, sort_keys=True))
+        if show_panel:
+            self._add_panel(response, data)
+        return response
+
+    def _show_panel(self, request, response):
+        """
+        Whether to add a profile panel to response: only global staff may see them and only on html pages
+        """
+        user = getattr(request, 'user', None)
+        return (
+            self.panel_parameter in request.GET and
+            user is not None and user.is_authenticated() and GlobalStaff().has_user(user) and
+            response.status_code == 200 and
+            response.get('Content-Type', '').startswith('text/html') and
+            not getattr(response, 'streaming', False)
+        )
+
+    @staticmethod
+    def _add_panel(response, data):
+        """
+        Insert a table of the profile data before the end of response's body
+        """
+        rows = [u"<tr><th>total</th><td></td><td></td><td>{}ms</td></tr>".format(data['total_ms'])]
+        for subsystem, labels in sorted(data['subsystems'].iteritems()):
+            for label, calls in sorted(labels.iteritems(), key=lambda item: -item[1]['ms']):
+                rows.append(u"<tr><th>{}</th><td>{}</td><td>{}</td><td>{}ms</td></tr>".format(
+                    escape(subsystem), escape(label), calls['calls'], calls['ms']
+                ))
+        rows.append(u"<tr><th>counters</th><td colspan='3'>{}</td></tr>".format(
+            escape(json.dumps(data['counters'], sort_keys=True))
+        ))
+        panel = (
+            u"<div id='request-profile' style='font: 12px monospace; background: #fff; padding: 1em;'>"
+            u"<table><tr><th>subsystem</th><th>call</th><th>calls</th><th>time</th></tr>{}</table></div>"
+        ).format(u"".join(rows)).encode('utf-8')
+        content = response.content
+        index = content.rfind('</body>')
+        if index == -1:
+            return
+        response.content = content[:index] + panel + content[index:]
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
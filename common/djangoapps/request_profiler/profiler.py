@@ -0,0 +1,368 @@
+"""
+Attribute the wall time and call counts of a request's calls into its subsystems to the request.
+
+:func:`install_hooks` wraps the entry points of each subsystem (see the *_HOOKS below) once per
+process. The wrappers only do more than check for a profile when :func:`start_profile` has started one
+for the current request; so, they cost next to nothing for requests which aren't sampled.
+
+Only the outermost call into each subsystem is timed so that a store method which calls another
+(e.g., a draft store's get_item calling its base class's) isn't counted twice. Subsystems nest though:
+the mongo round trips of a modulestore read count toward both "modulestore" and "mongo".
+"""
+import logging
+import re
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.backends import BaseDatabaseWrapper
+from django.db.models import get_models
+from django.utils.importlib import import_module
+
+import monkey_patch
+from request_cache.middleware import RequestCache
+
+log = logging.getLogger(__name__)
+
+# The RequestCache namespace of the current request's RequestProfile
+PROFILE_NAMESPACE = u"request_profiler.profile"
+
+# (module, class) of each modulestore whose reads are timed per store class and method
+MODULESTORE_CLASSES = (
+    ('xmodule.modulestore.mongo.base', 'MongoModuleStore'),
+    ('xmodule.modulestore.mongo.draft', 'DraftModuleStore'),
+    ('xmodule.modulestore.split_mongo.split', 'SplitMongoModuleStore'),
+    ('xmodule.modulestore.split_mongo.split_draft', 'DraftVersioningModuleStore'),
+    ('xmodule.modulestore.xml', 'XMLModuleStore'),
+)
+MODULESTORE_READS = (
+    'get_item', 'get_items', 'has_item', 'get_course', 'get_courses', 'has_course',
+    'get_parent_location', 'get_orphans',
+)
+
+# (module, class, method, label) of each mongo client method which makes a round trip
+MONGO_HOOKS = (
+    ('pymongo.mongo_client', 'MongoClient', '_send_message_with_response', 'query'),
+    ('pymongo.mongo_client', 'MongoClient', '_send_message', 'write'),
+    ('pymongo.mongo_replica_set_client', 'MongoReplicaSetClient', '_send_message_with_response', 'query'),
+    ('pymongo.mongo_replica_set_client', 'MongoReplicaSetClient', '_send_message', 'write'),
+)
+
+# (module, function, subsystem) of other functions to time. Apps add their own with
+# settings.REQUEST_PROFILER['FUNCTION_HOOKS'] (e.g., the lms's comment service client).
+FUNCTION_HOOKS = (
+    ('capa.safe_exec.safe_exec', 'codejail_safe_exec', 'safe_exec'),
+    ('capa.safe_exec.safe_exec', 'codejail_not_safe_exec', 'safe_exec'),
+)
+
+CACHE_METHODS = ('get', 'get_many', 'set', 'set_many', 'add', 'delete', 'delete_many')
+
+# the table an sql statement reads or writes
+SQL_TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+[`"]?(\w+)', re.IGNORECASE)
+
+# what install_hooks patched as (owner, attribute name) pairs so uninstall_hooks can restore them
+_installed = []
+
+
+class RequestProfile(object):
+    """
+    The wall time and call counts of one request's calls into each subsystem
+    """
+    def __init__(self):
+        self.start = time.time()
+        # {subsystem: {label: [calls, seconds]}}
+        self.subsystems = {}
+        # {name: count} of things which aren't timed (e.g., cache hits)
+        self.counters = {}
+        # the subsystems currently being timed
+        self.active = set()
+
+    def record(self, subsystem, label, seconds):
+        """
+        Count a call to label in subsystem which took seconds
+        """
+        calls = self.subsystems.setdefault(subsystem, {}).setdefault(label, [0, 0.0])
+        calls[0] += 1
+        calls[1] += seconds
+
+    def increment(self, name, amount=1):
+        """
+        Add amount to the counter name
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def totals(self):
+        """
+        Return {subsystem: (calls, seconds)} summed over each subsystem's labels
+        """
+        return {
+            subsystem: (sum(calls for calls, __ in labels.itervalues()),
+                        sum(seconds for __, seconds in labels.itervalues()))
+            for subsystem, labels in self.subsystems.iteritems()
+        }
+
+    def summary(self):
+        """
+        A one line summary of the profile for a response header
+        """
+        parts = [u"total={:.1f}ms".format((time.time() - self.start) * 1000)]
+        for subsystem, (calls, seconds) in sorted(self.totals().iteritems()):
+            parts.append(u"{}={}/{:.1f}ms".format(subsystem, calls, seconds * 1000))
+        for name, count in sorted(self.counters.iteritems()):
+            parts.append(u"{}={}".format(name, count))
+        return u"; ".join(parts)
+
+    def to_json(self):
+        """
+        The profile as a json-able dict with times in milliseconds
+        """
+        return {
+            'total_ms': round((time.time() - self.start) * 1000, 1),
+            'subsystems': {
+                subsystem: {
+                    label: {'calls': calls, 'ms': round(seconds * 1000, 1)}
+                    for label, (calls, seconds) in labels.iteritems()
+                }
+                for subsystem, labels in self.subsystems.iteritems()
+            },
+            'counters': dict(self.counters),
+        }
+
+
+def start_profile():
+    """
+    Start profiling the current request
+    """
+    profile = RequestProfile()
+    RequestCache.get_request_cache().data[PROFILE_NAMESPACE] = profile
+    return profile
+
+
+def get_profile():
+    """
+    Return the current request's RequestProfile or None if it's not being profiled
+    """
+    # threads which never served a request (e.g., celery's) have no request cache data
+    return getattr(RequestCache.get_request_cache(), 'data', {}).get(PROFILE_NAMESPACE)
+
+
+def stop_profile():
+    """
+    Stop profiling the current request and return its RequestProfile (None if it wasn't being profiled)
+    """
+    return getattr(RequestCache.get_request_cache(), 'data', {}).pop(PROFILE_NAMESPACE, None)
+
+
+def timed(subsystem, label, function):
+    """
+    Wrap function to record its calls in the current request's profile under subsystem and label.
+    label is either a string or a function of function's arguments which returns one.
+    """
+    @wraps(function)
+    def timed_function(*args, **kwargs):
+        """
+        Call function timing it if the request is being profiled
+        """
+        profile = get_profile()
+        if profile is None or subsystem in profile.active:
+            return function(*args, **kwargs)
+        profile.active.add(subsystem)
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.active.discard(subsystem)
+            profile.record(subsystem, label(*args, **kwargs) if callable(label) else label, time.time() - start)
+    return timed_function
+
+
+class ProfilingCursorWrapper(object):
+    """
+    A database cursor which times its queries by the model of the table they use
+    """
+    _table_models = None
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    @classmethod
+    def model_label(cls, sql, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        The label of the model whose table sql uses (or the table if no model has it)
+        """
+        if cls._table_models is None:
+            # pylint: disable=protected-access
+            cls._table_models = {
+                model._meta.db_table: u"{}.{}".format(model._meta.app_label, model.__name__)
+                for model in get_models()
+            }
+        match = SQL_TABLE_RE.search(sql)
+        if match is None:
+            return u"other"
+        return cls._table_models.get(match.group(1), match.group(1))
+
+    def execute(self, sql, *args, **kwargs):
+        """
+        See the db-api's cursor.execute
+        """
+        return timed('sql', lambda sql, *args, **kwargs: self.model_label(sql), self.cursor.execute)(
+            sql, *args, **kwargs
+        )
+
+    def executemany(self, sql, *args, **kwargs):
+        """
+        See the db-api's cursor.executemany
+        """
+        return timed('sql', lambda sql, *args, **kwargs: self.model_label(sql), self.cursor.executemany)(
+            sql, *args, **kwargs
+        )
+
+
+def _profiled_cursor(cursor_method):
+    """
+    Wrap BaseDatabaseWrapper.cursor to return cursors which time their queries when profiling
+    """
+    @wraps(cursor_method)
+    def cursor(self):
+        """
+        Return the connection's cursor wrapped if the request is being profiled
+        """
+        db_cursor = cursor_method(self)
+        if get_profile() is None:
+            return db_cursor
+        return ProfilingCursorWrapper(db_cursor)
+    return cursor
+
+
+def _profiled_cache_get(get):
+    """
+    Wrap cache.get to count hits and misses
+    """
+    @wraps(get)
+    def profiled_get(key, default=None, *args, **kwargs):
+        """
+        See django's cache.get
+        """
+        value = get(key, default, *args, **kwargs)
+        profile = get_profile()
+        if profile is not None:
+            profile.increment('cache_hits' if value is not default else 'cache_misses')
+        return value
+    return profiled_get
+
+
+def _profiled_cache_get_many(get_many):
+    """
+    Wrap cache.get_many to count hits and misses
+    """
+    @wraps(get_many)
+    def profiled_get_many(keys, *args, **kwargs):
+        """
+        See django's cache.get_many
+        """
+        keys = list(keys)
+        values = get_many(keys, *args, **kwargs)
+        profile = get_profile()
+        if profile is not None:
+            profile.increment('cache_hits', len(values))
+            profile.increment('cache_misses', len(keys) - len(values))
+        return values
+    return profiled_get_many
+
+
+def _store_method_label(method):
+    """
+    The label function of a modulestore's method: the store's class and the method
+    """
+    def label(store, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        e.g., DraftModuleStore.get_item
+        """
+        return u"{}.{}".format(store.__class__.__name__, method)
+    return label
+
+
+def _patch(owner, name, replacement):
+    """
+    Patch owner's name with replacement remembering to unpatch it
+    """
+    monkey_patch.patch(owner, name, replacement)
+    _installed.append((owner, name))
+
+
+def _import_attribute(module_name, name):
+    """
+    Return module_name's attribute name or None if it can't be imported (e.g., the cms has no comment client)
+    """
+    try:
+        return getattr(import_module(module_name), name)
+    except (ImportError, AttributeError):
+        log.debug(u"Not profiling %s.%s which can't be imported", module_name, name)
+        return None
+
+
+def install_hooks(function_hooks=()):
+    """
+    Install the profiling wrappers if they aren't already. function_hooks are (module, function, subsystem)
+    triples in addition to FUNCTION_HOOKS.
+    """
+    if _installed:
+        return
+
+    for module_name, class_name in MODULESTORE_CLASSES:
+        store_class = _import_attribute(module_name, class_name)
+        if store_class is None:
+            continue
+        for method in MODULESTORE_READS:
+            # only wrap where it's defined so each store class is labeled by its own name
+            if method in store_class.__dict__:
+                _patch(store_class, method, timed(
+                    'modulestore', _store_method_label(method), getattr(store_class, method)
+                ))
+
+    for module_name, class_name, method, label in MONGO_HOOKS:
+        client_class = _import_attribute(module_name, class_name)
+        if client_class is not None and method in client_class.__dict__:
+            _patch(client_class, method, timed('mongo', label, getattr(client_class, method)))
+
+    for module_name, function_name, subsystem in tuple(FUNCTION_HOOKS) + tuple(function_hooks):
+        function = _import_attribute(module_name, function_name)
+        if function is not None:
+            _patch(import_module(module_name), function_name, timed(subsystem, function_name, function))
+
+    _patch(BaseDatabaseWrapper, 'cursor', _profiled_cursor(BaseDatabaseWrapper.cursor))
+
+    for method in CACHE_METHODS:
+        if hasattr(cache, method):
+            replacement = timed('cache', method, getattr(cache, method))
+            if method == 'get':
+                replacement = _profiled_cache_get(replacement)
+            elif method == 'get_many':
+                replacement = _profiled_cache_get_many(replacement)
+            _patch(cache, method, replacement)
+
+    mako_template = _import_attribute('mako.template', 'Template')
+    if mako_template is not None:
+        _patch(mako_template, 'render_unicode', timed(
+            'template', lambda self, *args, **kwargs: self.uri or u"<string>", mako_template.render_unicode
+        ))
+    django_template = _import_attribute('django.template.base', 'Template')
+    if django_template is not None:
+        _patch(django_template, 'render', timed(
+            'template', lambda self, *args, **kwargs: self.name or u"<string>", django_template.render
+        ))
+
+
+def uninstall_hooks():
+    """
+    Remove the wrappers install_hooks installed
+    """
+    while _installed:
+        owner, name = _installed.pop()
+        monkey_patch.unpatch(owner, name)
@@ -0,0 +1,124 @@
+"""
+Tests for the request profiler
+"""
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from request_cache.middleware import RequestCache
+from request_profiler import profiler
+from request_profiler.middleware import RequestProfilerMiddleware, PROFILE_HEADER
+from student.tests.factories import UserFactory
+
+FEATURES_WITH_PROFILER = settings.FEATURES.copy()
+FEATURES_WITH_PROFILER['ENABLE_REQUEST_PROFILER'] = True
+PROFILER_SETTINGS = {'SAMPLE_RATE': 1, 'PANEL_PARAMETER': 'profile', 'COUNTERS': {}, 'FUNCTION_HOOKS': ()}
+
+
+class TestProfiler(TestCase):
+    """
+    Test timing calls into subsystems
+    """
+    def setUp(self):
+        super(TestProfiler, self).setUp()
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+
+    def test_not_profiling(self):
+        calls = []
+        profiler.timed('store', 'get', calls.append)(1)
+        self.assertEqual(calls, [1])
+        self.assertIsNone(profiler.get_profile())
+
+    def test_outermost_call_only(self):
+        inner = profiler.timed('store', 'inner', lambda: None)
+        outer = profiler.timed('store', lambda value: 'outer.{}'.format(value), lambda value: inner())
+        other = profiler.timed('mongo', 'query', lambda: None)
+        nested = profiler.timed('store', 'nested', other)
+
+        profile = profiler.start_profile()
+        outer(1)
+        outer(2)
+        nested()
+        self.assertEqual(sorted(profile.subsystems['store']), ['nested', 'outer.1', 'outer.2'])
+        # other subsystems nest
+        self.assertEqual(profile.subsystems['mongo']['query'][0], 1)
+        self.assertEqual(profile.totals()['store'][0], 3)
+        self.assertIs(profiler.stop_profile(), profile)
+        self.assertIsNone(profiler.get_profile())
+
+    def test_cache_hits(self):
+        profiler.install_hooks()
+        self.addCleanup(profiler.uninstall_hooks)
+        profile = profiler.start_profile()
+        cache.set('request_profiler_test', 1)
+        cache.get('request_profiler_test')
+        cache.get('request_profiler_test_missing')
+        cache.get_many(['request_profiler_test', 'request_profiler_test_missing'])
+        self.assertEqual(profile.counters, {'cache_hits': 2, 'cache_misses': 2})
+        self.assertEqual(profile.subsystems['cache']['get'][0], 2)
+        self.assertIn('cache=4/', profile.summary())
+
+    def test_sql_by_model(self):
+        profiler.install_hooks()
+        self.addCleanup(profiler.uninstall_hooks)
+        profile = profiler.start_profile()
+        UserFactory.create()
+        self.assertIn('auth.User', profile.subsystems['sql'])
+
+    def test_uninstall(self):
+        get = cache.get
+        profiler.install_hooks()
+        self.assertNotEqual(cache.get, get)
+        profiler.uninstall_hooks()
+        self.assertEqual(cache.get, get)
+
+
+@override_settings(FEATURES=FEATURES_WITH_PROFILER, REQUEST_PROFILER=PROFILER_SETTINGS)
+class TestRequestProfilerMiddleware(TestCase):
+    """
+    Test reporting request profiles
+    """
+    def setUp(self):
+        super(TestRequestProfilerMiddleware, self).setUp()
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+        self.addCleanup(profiler.uninstall_hooks)
+        self.middleware = RequestProfilerMiddleware()
+
+    def _process(self, path, user):
+        """
+        Process a request for path by user through the middleware with an html response
+        """
+        request = RequestFactory().get(path)
+        self.middleware.process_request(request)
+        request.user = user
+        cache.get('request_profiler_test')
+        response = HttpResponse('<html><body>content</body></html>')
+        return self.middleware.process_response(request, response)
+
+    def test_header(self):
+        response = self._process('/', AnonymousUser())
+        self.assertIn('cache_misses=1', response[PROFILE_HEADER])
+        self.assertNotIn('request-profile', response.content)
+        self.assertIsNone(profiler.get_profile())
+
+    def test_panel_is_staff_only(self):
+        response = self._process('/?profile', UserFactory.create())
+        self.assertNotIn('request-profile', response.content)
+        response = self._process('/?profile', UserFactory.create(is_staff=True))
+        self.assertIn("<div id='request-profile'", response.content)
+        self.assertTrue(response.content.endswith('</body></html>'))
+
+    @override_settings(REQUEST_PROFILER=dict(PROFILER_SETTINGS, SAMPLE_RATE=0))
+    def test_not_sampled(self):
+        middleware = RequestProfilerMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        self.assertIsNone(profiler.get_profile())
+        response = middleware.process_response(request, HttpResponse())
+        self.assertFalse(response.has_header(PROFILE_HEADER))
@@ -6,7 +6,10 @@ adding users, removing users, and listing members
 from abc import ABCMeta, abstractmethod
 
 from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
+from request_cache.middleware import BoundedDict, RequestCache
 from student.models import CourseAccessRole
 from xmodule_django.models import CourseKeyField
 
@@ -14,11 +17,50 @@ from xmodule_django.models import CourseKeyField
 class RoleCache(object):
     """
     A cache of the CourseAccessRoles held by a particular user
+
+    Use :meth:`for_user` to get the one shared by every role and access check of that user during
+    the current request (or celery task). Changing a user's roles or the user invalidates it.
     """
+    CACHE_NAMESPACE = u"student.roles.RoleCache"
+    # how many users' RoleCaches to keep at once (tasks, e.g. grading, go through every user of a course)
+    MAX_CACHED_USERS = 100
+
     def __init__(self, user):
         self._roles = set(
             CourseAccessRole.objects.filter(user=user).all()
         )
+        # access decisions derived from these roles which courseware.access memoizes here so that
+        # they get invalidated along with the roles
+        self.access_decisions = {}
+
+    @classmethod
+    def _request_roles(cls):
+        """
+        The request scoped dict of user id to RoleCache
+        """
+        return RequestCache.get_request_cache().data.setdefault(
+            cls.CACHE_NAMESPACE, BoundedDict(cls.MAX_CACHED_USERS)
+        )
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Return the RoleCache for user for this request, loading all of the user's roles in one query
+        the first time.
+        """
+        if user.id is None:
+            return cls(user)
+        request_roles = cls._request_roles()
+        if user.id not in request_roles:
+            request_roles[user.id] = cls(user)
+        return request_roles[user.id]
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        Forget the cached roles and access decisions of the user with user_id
+        """
+        cls._request_roles().pop(user_id, None)
 
     def has_role(self, role, course_id, org):
         """
@@ -114,13 +156,7 @@ class RoleBase(AccessRole):
         if not (user.is_authenticated() and user.is_active):
             return False
 
-        # pylint: disable=protected-access
-        if not hasattr(user, '_roles'):
-            # Cache a list of tuples identifying the particular roles that a user has
-            # Stored as tuples, rather than django models, to make it cheaper to construct objects for comparison
-            user._roles = RoleCache(user)
-
-        return user._roles.has_role(self._role_name, self.course_key, self.org)
+        return RoleCache.for_user(user).has_role(self._role_name, self.course_key, self.org)
 
     def add_users(self, *users):
         """
@@ -133,8 +169,6 @@ class RoleBase(AccessRole):
             if user.is_authenticated and user.is_active and not self.has_user(user):
                 entry = CourseAccessRole(user=user, role=self._role_name, course_id=self.course_key, org=self.org)
                 entry.save()
-                if hasattr(user, '_roles'):
-                    del user._roles
 
     def remove_users(self, *users):
         """
@@ -144,9 +178,6 @@ class RoleBase(AccessRole):
             user__in=users, role=self._role_name, org=self.org, course_id=self.course_key
         )
         entries.delete()
-        for user in users:
-            if hasattr(user, '_roles'):
-                del user._roles
 
     def users_with_role(self):
         """
@@ -259,11 +290,7 @@ class UserBasedRole(object):
         if not (self.user.is_authenticated() and self.user.is_active):
             return False
 
-        # pylint: disable=protected-access
-        if not hasattr(self.user, '_roles'):
-            self.user._roles = RoleCache(self.user)
-
-        return self.user._roles.has_role(self.role, course_key, course_key.org)
+        return RoleCache.for_user(self.user).has_role(self.role, course_key, course_key.org)
 
     def add_course(self, *course_keys):
         """
@@ -273,8 +300,6 @@ class UserBasedRole(object):
             for course_key in course_keys:
                 entry = CourseAccessRole(user=self.user, role=self.role, course_id=course_key, org=course_key.org)
                 entry.save()
-            if hasattr(self.user, '_roles'):
-                del self.user._roles
         else:
             raise ValueError("user is not active. Cannot grant access to courses")
 
@@ -284,8 +309,6 @@ class UserBasedRole(object):
         """
         entries = CourseAccessRole.objects.filter(user=self.user, role=self.role, course_id__in=course_keys)
         entries.delete()
-        if hasattr(self.user, '_roles'):
-            del self.user._roles
 
     def courses_with_role(self):
         """
@@ -297,3 +320,21 @@ class UserBasedRole(object):
         * role (will be self.role--thus uninteresting)
         """
         return CourseAccessRole.objects.filter(role=self.role, user=self.user)
+
+
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+def invalidate_role_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the RoleCache of the user whose role changed
+    """
+    RoleCache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_role_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the RoleCache of a changed user (e.g., is_staff or is_active) or of a
+    newly created user reusing the id of a deleted one
+    """
+    RoleCache.invalidate(instance.id)
@@ -2,7 +2,10 @@
 Tests of student.roles
 """
 import ddt
+from celery.signals import task_prerun
+from django.contrib.auth.models import User
 from django.test import TestCase
+from mock import Mock
 
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from student.tests.factories import AnonymousUserFactory
@@ -191,3 +194,31 @@ class RoleCacheTestCase(TestCase):
     def test_empty_cache(self, role, target):
         cache = RoleCache(self.user)
         self.assertFalse(cache.has_role(*target))
+
+    def test_shared_across_user_instances(self):
+        role = CourseStaffRole(self.IN_KEY)
+        role.add_users(self.user)
+        same_user = User.objects.get(id=self.user.id)
+        self.assertIs(RoleCache.for_user(self.user), RoleCache.for_user(same_user))
+        with self.assertNumQueries(0):
+            self.assertTrue(role.has_user(same_user))
+
+    def test_cleared_around_tasks(self):
+        cache = RoleCache.for_user(self.user)
+        task_prerun.send(sender=None, task_id='task', task=Mock(request=Mock(is_eager=False)))
+        self.assertIsNot(RoleCache.for_user(self.user), cache)
+
+    def test_bounded(self):
+        cache = RoleCache.for_user(self.user)
+        for __ in range(RoleCache.MAX_CACHED_USERS):
+            RoleCache.for_user(UserFactory())
+        self.assertIsNot(RoleCache.for_user(self.user), cache)
+
+    def test_invalidated_by_role_change(self):
+        role = CourseStaffRole(self.IN_KEY)
+        self.assertFalse(role.has_user(self.user))
+        # change the role via a different instance of the same user
+        role.add_users(User.objects.get(id=self.user.id))
+        self.assertTrue(role.has_user(self.user))
+        role.remove_users(User.objects.get(id=self.user.id))
+        self.assertFalse(role.has_user(self.user))
@@ -8,7 +8,7 @@ from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 
 from track.contexts import COURSE_REGEX
-from user_api.models import UserCourseTag
+from user_api import user_service
 
 
 class UserTagsEventContextMiddleware(object):
@@ -35,12 +35,8 @@ class UserTagsEventContextMiddleware(object):
             context['course_id'] = course_id
 
             if request.user.is_authenticated():
-                context['course_user_tags'] = dict(
-                    UserCourseTag.objects.filter(
-                        user=request.user.pk,
-                        course_id=course_key,
-                    ).values_list('key', 'value')
-                )
+                # also caches them for the request's partition lookups
+                context['course_user_tags'] = dict(user_service.get_course_tags(request.user, course_key))
             else:
                 context['course_user_tags'] = {}
 
@@ -5,6 +5,7 @@ from unittest import TestCase
 from django.http import HttpResponse
 from django.test.client import RequestFactory
 
+from request_cache.middleware import RequestCache
 from student.tests.factories import UserFactory, AnonymousUserFactory
 from user_api.tests.factories import UserCourseTagFactory
 from user_api.middleware import UserTagsEventContextMiddleware
@@ -15,6 +16,7 @@ class TagsMiddlewareTest(TestCase):
     Test the UserTagsEventContextMiddleware
     """
     def setUp(self):
+        RequestCache().clear_request_cache()
         self.middleware = UserTagsEventContextMiddleware()
         self.user = UserFactory.create()
         self.other_user = UserFactory.create()
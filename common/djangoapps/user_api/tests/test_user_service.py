@@ -3,8 +3,10 @@ Test the user service
 """
 from django.test import TestCase
 
+from request_cache.middleware import RequestCache
 from student.tests.factories import UserFactory
 from user_api import user_service
+from user_api.models import UserCourseTag
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 
@@ -13,6 +15,7 @@ class TestUserService(TestCase):
     Test the user service
     """
     def setUp(self):
+        RequestCache().clear_request_cache()
         self.user = UserFactory.create()
         self.course_id = SlashSeparatedCourseKey('test_org', 'test_course_number', 'test_run')
         self.test_key = 'test_key'
@@ -33,3 +36,59 @@ class TestUserService(TestCase):
         user_service.set_course_tag(self.user, self.course_id, self.test_key, test_value)
         tag = user_service.get_course_tag(self.user, self.course_id, self.test_key)
         self.assertEqual(tag, test_value)
+
+    def test_get_course_tags_cached(self):
+        user_service.set_course_tags(self.user, self.course_id, {'key1': 'value1', 'key2': 2})
+        RequestCache().clear_request_cache()
+
+        with self.assertNumQueries(1):
+            tags = user_service.get_course_tags(self.user, self.course_id)
+        self.assertEqual(tags, {'key1': 'value1', 'key2': '2'})
+        with self.assertNumQueries(0):
+            self.assertEqual(user_service.get_course_tag(self.user, self.course_id, 'key1'), 'value1')
+            self.assertIsNone(user_service.get_course_tag(self.user, self.course_id, 'key3'))
+
+        # the cached tags are kept up to date by writes
+        user_service.set_course_tags(self.user, self.course_id, {'key2': 'new', 'key3': 'value3'})
+        self.assertEqual(
+            user_service.get_course_tags(self.user, self.course_id),
+            {'key1': 'value1', 'key2': 'new', 'key3': 'value3'}
+        )
+        RequestCache().clear_request_cache()
+        self.assertEqual(
+            user_service.get_course_tags(self.user, self.course_id),
+            {'key1': 'value1', 'key2': 'new', 'key3': 'value3'}
+        )
+
+    def test_set_course_tags_created_concurrently(self):
+        self.assertEqual(user_service.get_course_tags(self.user, self.course_id), {})
+        # another process sets a tag after this one read the tags
+        UserCourseTag.objects.create(user=self.user, course_id=self.course_id, key='key1', value='other')
+
+        user_service.set_course_tags(self.user, self.course_id, {'key1': 'value1', 'key2': 'value2'})
+        RequestCache().clear_request_cache()
+        self.assertEqual(
+            user_service.get_course_tags(self.user, self.course_id), {'key1': 'value1', 'key2': 'value2'}
+        )
+
+    def test_get_course_tags_for_users(self):
+        other_user = UserFactory.create()
+        untagged_user = UserFactory.create()
+        user_service.set_course_tag(self.user, self.course_id, self.test_key, 'value')
+        user_service.set_course_tag(other_user, self.course_id, self.test_key, 'other_value')
+        RequestCache().clear_request_cache()
+
+        users = [self.user, other_user, untagged_user]
+        with self.assertNumQueries(1):
+            tags = user_service.get_course_tags_for_users(users, self.course_id)
+        self.assertEqual(tags, {
+            self.user.id: {self.test_key: 'value'},
+            other_user.id: {self.test_key: 'other_value'},
+            untagged_user.id: {},
+        })
+        with self.assertNumQueries(0):
+            self.assertEqual(user_service.get_course_tag(other_user, self.course_id, self.test_key), 'other_value')
+
+        user_service.forget_course_tags(users, self.course_id)
+        with self.assertNumQueries(1):
+            user_service.get_course_tag(other_user, self.course_id, self.test_key)
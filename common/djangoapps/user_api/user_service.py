@@ -7,6 +7,9 @@ Stores global metadata using the UserPreference model, and per-course metadata u
 UserCourseTag model.
 """
 
+from django.db import IntegrityError, transaction
+
+from request_cache.middleware import RequestCache
 from user_api.models import UserCourseTag
 
 # Scopes
@@ -14,6 +17,71 @@ from user_api.models import UserCourseTag
 # global tags (e.g. using the existing UserPreferences table))
 COURSE_SCOPE = 'course'
 
+# The RequestCache namespace of users' course tags as {(user id, course_id): {key: value}}
+COURSE_TAGS_NAMESPACE = u"user_api.user_service.course_tags"
+
+
+def _cached_course_tags():
+    """
+    The current request's cached course tags
+    """
+    return RequestCache.get_request_cache().data.setdefault(COURSE_TAGS_NAMESPACE, {})
+
+
+def get_course_tags(user, course_id):
+    """
+    Gets all of the user's course tags in the specified course_id. They're read in one query
+    the first time they're asked for in a request and cached for the rest of it.
+
+    Args:
+        user: the User object for the course tags
+        course_id: course identifier (string)
+
+    Returns:
+        dict of key to string value
+    """
+    cached = _cached_course_tags()
+    cache_key = (user.id, course_id)
+    if cache_key not in cached:
+        cached[cache_key] = dict(
+            UserCourseTag.objects.filter(user=user, course_id=course_id).values_list('key', 'value')
+        )
+    return cached[cache_key]
+
+
+def get_course_tags_for_users(users, course_id):
+    """
+    Gets the course tags of each of the users in the specified course_id, reading the ones which
+    aren't already cached in one query (and caching them for the rest of the request).
+
+    Args:
+        users: the User objects
+        course_id: course identifier (string)
+
+    Returns:
+        dict of user id to dict of key to string value
+    """
+    cached = _cached_course_tags()
+    uncached_ids = set(user.id for user in users if (user.id, course_id) not in cached)
+    if uncached_ids:
+        for user_id in uncached_ids:
+            cached[(user_id, course_id)] = {}
+        for user_id, key, value in UserCourseTag.objects.filter(
+                user__in=uncached_ids, course_id=course_id
+        ).values_list('user_id', 'key', 'value'):
+            cached[(user_id, course_id)][key] = value
+    return {user.id: cached[(user.id, course_id)] for user in users}
+
+
+def forget_course_tags(users, course_id):
+    """
+    Drops the cached course tags of the users in the specified course_id (e.g., once a batch of
+    users loaded by get_course_tags_for_users is done with outside of a request)
+    """
+    cached = _cached_course_tags()
+    for user in users:
+        cached.pop((user.id, course_id), None)
+
 
 def get_course_tag(user, course_id, key):
     """
@@ -28,15 +96,7 @@ def get_course_tag(user, course_id, key):
     Returns:
         string value, or None if there is no value saved
     """
-    try:
-        record = UserCourseTag.objects.get(
-            user=user,
-            course_id=course_id,
-            key=key)
-
-        return record.value
-    except UserCourseTag.DoesNotExist:
-        return None
+    return get_course_tags(user, course_id).get(key)
 
 
 def set_course_tag(user, course_id, key, value):
@@ -53,14 +113,44 @@ def set_course_tag(user, course_id, key, value):
         key: arbitrary (<=255 char string)
         value: arbitrary string
     """
+    set_course_tags(user, course_id, {key: value})
 
-    record, _ = UserCourseTag.objects.get_or_create(
-        user=user,
-        course_id=course_id,
-        key=key)
 
-    record.value = value
-    record.save()
+def set_course_tags(user, course_id, tags):
+    """
+    Sets the values of several of the user's course tags in the specified course_id.
+    Overwrites any previous values. The new tags are created in one query (unless another
+    process created some of them meanwhile, in which case they're set one at a time).
+
+    Args:
+        user: the User object
+        course_id: course identifier (string)
+        tags: dict of key (arbitrary <=255 char string) to value (arbitrary string)
+    """
+    tags = {key: unicode(value) for key, value in tags.iteritems()}
+    current = get_course_tags(user, course_id)
 
-    # TODO: There is a risk of IntegrityErrors being thrown here given
-    # simultaneous calls from many processes.  Handle by retrying after a short delay?
+    new_tags = {key: value for key, value in tags.iteritems() if key not in current}
+    if new_tags:
+        # as get_or_create: roll back to a savepoint if a concurrent request (e.g., another xblock
+        # handler call assigning the same partition) created any of the tags since they were read
+        sid = transaction.savepoint()
+        try:
+            UserCourseTag.objects.bulk_create([
+                UserCourseTag(user=user, course_id=course_id, key=key, value=value)
+                for key, value in new_tags.iteritems()
+            ])
+            transaction.savepoint_commit(sid)
+        except IntegrityError:
+            transaction.savepoint_rollback(sid)
+            for key, value in new_tags.iteritems():
+                record, created = UserCourseTag.objects.get_or_create(
+                    user=user, course_id=course_id, key=key, defaults={'value': value}
+                )
+                if not created and record.value != value:
+                    record.value = value
+                    record.save()
+    for key, value in tags.iteritems():
+        if key in current and current[key] != value:
+            UserCourseTag.objects.filter(user=user, course_id=course_id, key=key).update(value=value)
+    current.update(tags)
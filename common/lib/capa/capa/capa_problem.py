@@ -241,20 +241,26 @@ class LoncapaProblem(object):
         Returns a dictionary {'score': integer, from 0 to get_max_score(),
                               'total': get_max_score()}.
         """
+        return {'score': self.score_from_correct_map(self.correct_map, self.student_answers),
+                'total': self.get_max_score()}
+
+    @staticmethod
+    def score_from_correct_map(correct_map, student_answers):
+        """
+        The number of points correct_map awards (none if there are no student_answers)
+        """
         correct = 0
-        for key in self.correct_map:
+        for key in correct_map:
             try:
-                correct += self.correct_map.get_npoints(key)
+                correct += correct_map.get_npoints(key)
             except Exception:
-                log.error('key=%s, correct_map = %s', key, self.correct_map)
+                log.error('key=%s, correct_map = %s', key, correct_map)
                 raise
 
-        if (not self.student_answers) or len(self.student_answers) == 0:
-            return {'score': 0,
-                    'total': self.get_max_score()}
+        if (not student_answers) or len(student_answers) == 0:
+            return 0
         else:
-            return {'score': correct,
-                    'total': self.get_max_score()}
+            return correct
 
     def update_score(self, score_msg, queuekey):
         """
@@ -2017,16 +2017,11 @@ class CodeResponse(LoncapaResponse):
 
     def update_score(self, score_msg, oldcmap, queuekey):
         """Updates the user's score based on the returned message from the grader."""
-        (valid_score_msg, correct, points, msg) = self._parse_score_msg(score_msg)
+        (valid_score_msg, correct, points, msg) = self.parse_score_msg(score_msg)
 
         _ = self.capa_system.i18n.ugettext
 
-        dog_stats_api.increment(xqueue_interface.XQUEUE_METRIC_NAME, tags=[
-            'action:update_score',
-            'correct:{}'.format(correct)
-        ])
-
-        dog_stats_api.histogram(xqueue_interface.XQUEUE_METRIC_NAME + '.update_score.points_earned', points)
+        self.record_score_metrics(correct, points)
 
         if not valid_score_msg:
             # Translators: 'grader' refers to the edX automatic code grader.
@@ -2034,23 +2029,13 @@ class CodeResponse(LoncapaResponse):
             oldcmap.set(self.answer_id, msg=error_msg)
             return oldcmap
 
-        correctness = 'correct' if correct else 'incorrect'
-
         # TODO: Find out how this is used elsewhere, if any
-        self.context['correct'] = correctness
+        self.context['correct'] = 'correct' if correct else 'incorrect'
 
         # Replace 'oldcmap' with new grading results if queuekey matches.  If queuekey
         # does not match, we keep waiting for the score_msg whose key actually
         # matches
-        if oldcmap.is_right_queuekey(self.answer_id, queuekey):
-            # Sanity check on returned points
-            if points < 0:
-                points = 0
-            # Queuestate is consumed
-            oldcmap.set(
-                self.answer_id, npoints=points, correctness=correctness,
-                msg=msg.replace('&nbsp;', '&#160;'), queuestate=None)
-        else:
+        if not self.set_score(oldcmap, self.answer_id, queuekey, correct, points, msg):
             log.debug(
                 'CodeResponse: queuekey %s does not match for answer_id=%s.',
                 queuekey,
@@ -2059,6 +2044,35 @@ class CodeResponse(LoncapaResponse):
 
         return oldcmap
 
+    @staticmethod
+    def record_score_metrics(correct, points):
+        """
+        Record the metrics of a grader reply's score
+        """
+        dog_stats_api.increment(xqueue_interface.XQUEUE_METRIC_NAME, tags=[
+            'action:update_score',
+            'correct:{}'.format(correct)
+        ])
+
+        dog_stats_api.histogram(xqueue_interface.XQUEUE_METRIC_NAME + '.update_score.points_earned', points)
+
+    @staticmethod
+    def set_score(cmap, answer_id, queuekey, correct, points, msg):
+        """
+        Set answer_id's entry in cmap to a valid grader reply's score if the entry is waiting for the
+        reply with queuekey. Returns whether it was.
+        """
+        if not cmap.is_right_queuekey(answer_id, queuekey):
+            return False
+        # Sanity check on returned points
+        if points < 0:
+            points = 0
+        # Queuestate is consumed
+        cmap.set(
+            answer_id, npoints=points, correctness='correct' if correct else 'incorrect',
+            msg=msg.replace('&nbsp;', '&#160;'), queuestate=None)
+        return True
+
     def get_answers(self):
         anshtml = '<span class="code-answer"><pre><code>%s</code></pre></span>' % self.answer
         return {self.answer_id: anshtml}
@@ -2070,7 +2084,8 @@ class CodeResponse(LoncapaResponse):
         """
         return {self.answer_id: self.initial_display}
 
-    def _parse_score_msg(self, score_msg):
+    @staticmethod
+    def parse_score_msg(score_msg):
         """
          Grader reply is a JSON-dump of the following dict
            { 'correct': True/False,
@@ -0,0 +1,45 @@
+"""
+Tests for the xqueue interfaces
+"""
+import json
+import unittest
+
+from mock import patch
+
+from capa.xqueue_interface import AsyncXQueueInterface, XQueueInterface, make_xheader
+
+
+class AsyncXQueueInterfaceTest(unittest.TestCase):
+    """
+    Test submitting to xqueue from background threads
+    """
+    def setUp(self):
+        super(AsyncXQueueInterfaceTest, self).setUp()
+        self.interface = AsyncXQueueInterface('http://xqueue', {'username': 'lms', 'password': 'secret'}, retries=1)
+        self.header = make_xheader('http://lms/callback', 'key', 'queue')
+        self.body = json.dumps({'student_response': 'print 1'})
+
+    def test_send_in_background(self):
+        with patch.object(XQueueInterface, 'send_to_queue', return_value=(0, '3')) as send_to_queue:
+            error, __ = self.interface.send_to_queue(self.header, self.body)
+            self.interface.wait_for_pending()
+        self.assertEqual(error, 0)
+        send_to_queue.assert_called_once_with(self.header, self.body)
+
+    def test_retries(self):
+        with patch.object(XQueueInterface, 'send_to_queue', return_value=(1, 'cannot connect to server')) as send:
+            error, __ = self.interface.send_to_queue(self.header, self.body)
+            self.interface.wait_for_pending()
+        # the student isn't told of failures to deliver in the background
+        self.assertEqual(error, 0)
+        self.assertEqual(send.call_count, 2)
+
+    def test_files_sent_at_once(self):
+        with patch.object(XQueueInterface, 'send_to_queue', return_value=(1, 'unexpected HTTP status code [500]')):
+            error, msg = self.interface.send_to_queue(self.header, self.body, files_to_upload=[])
+        self.assertEqual((error, msg), (1, 'unexpected HTTP status code [500]'))
+        self.assertIsNone(self.interface._workers_pid)  # pylint: disable=protected-access
+
+    def test_pooled_connections(self):
+        adapter = self.interface.session.get_adapter('http://xqueue/xqueue/submit/')
+        self.assertIs(adapter, self.interface.session.get_adapter('https://xqueue/xqueue/submit/'))
@@ -4,6 +4,10 @@
 import hashlib
 import json
 import logging
+import os
+import Queue
+import threading
+
 import requests
 import dogstats_wrapper as dog_stats_api
 
@@ -16,6 +20,9 @@ XQUEUE_METRIC_NAME = 'edxapp.xqueue'
 # Wait time for response from Xqueue.
 XQUEUE_TIMEOUT = 35 # seconds
 
+# The most connections to xqueue an interface keeps open for reuse
+XQUEUE_POOL_SIZE = 10
+
 
 def make_hashkey(seed):
     """
@@ -67,11 +74,15 @@ class XQueueInterface(object):
     Interface to the external grading system
     """
 
-    def __init__(self, url, django_auth, requests_auth=None):
+    def __init__(self, url, django_auth, requests_auth=None, pool_size=XQUEUE_POOL_SIZE):
         self.url = unicode(url)
         self.auth = django_auth
         self.session = requests.Session()
         self.session.auth = requests_auth
+        # reuse connections rather than reconnecting per submission
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def send_to_queue(self, header, body, files_to_upload=None):
         """
@@ -143,3 +154,86 @@ class XQueueInterface(object):
             return (1, 'unexpected HTTP status code [%d]' % r.status_code)
 
         return parse_xreply(r.text)
+
+
+class AsyncXQueueInterface(XQueueInterface):
+    """
+    Interface to the external grading system which submits from background threads so that checking a
+    problem doesn't wait on xqueue.
+
+    send_to_queue queues the submission and returns at once with the number of submissions waiting to be
+    sent as its message (in place of xqueue's queue length). Submissions with files are sent at once since
+    the uploaded files don't outlive the request. A submission which still fails after its retries is logged
+    and counted; the student can resubmit once the problem's xqueue wait time has passed.
+    """
+
+    def __init__(self, url, django_auth, requests_auth=None, pool_size=XQUEUE_POOL_SIZE, workers=2,
+                 max_pending=1000, retries=2):
+        super(AsyncXQueueInterface, self).__init__(url, django_auth, requests_auth, pool_size)
+        self.workers = workers
+        self.retries = retries
+        self.pending = Queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        # the process the worker threads were started in (threads don't survive forking)
+        self._workers_pid = None
+
+    def send_to_queue(self, header, body, files_to_upload=None):
+        """
+        Queue a request to xqueue. See XQueueInterface.send_to_queue.
+        """
+        if files_to_upload is not None:
+            return super(AsyncXQueueInterface, self).send_to_queue(header, body, files_to_upload)
+
+        self._start_workers()
+        try:
+            self.pending.put_nowait((header, body))
+        except Queue.Full:
+            # rather than drop the submission, wait for it
+            log.warning("The xqueue submission queue is full; submitting synchronously")
+            return super(AsyncXQueueInterface, self).send_to_queue(header, body)
+        return (0, str(self.pending.qsize()))
+
+    def wait_for_pending(self):
+        """
+        Block until the queued submissions have been sent
+        """
+        self.pending.join()
+
+    def _start_workers(self):
+        """
+        Start the worker threads if they aren't running in this process
+        """
+        if self._workers_pid == os.getpid():
+            return
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            for __ in range(self.workers):
+                worker = threading.Thread(target=self._work, name='xqueue-submitter')
+                worker.daemon = True
+                worker.start()
+            self._workers_pid = os.getpid()
+
+    def _work(self):
+        """
+        Send the queued submissions forever
+        """
+        while True:
+            header, body = self.pending.get()
+            try:
+                self._send_with_retries(header, body)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Unexpected error sending a submission to xqueue")
+            finally:
+                self.pending.task_done()
+
+    def _send_with_retries(self, header, body):
+        """
+        Send a submission retrying it up to self.retries times
+        """
+        for __ in range(self.retries + 1):
+            (error, msg) = super(AsyncXQueueInterface, self).send_to_queue(header, body)
+            if not error:
+                return
+        log.error("Failed to send a submission to xqueue: %s", msg)
+        dog_stats_api.increment(XQUEUE_METRIC_NAME, tags=[u'action:send_to_queue_failed'])
@@ -7,6 +7,9 @@ XASSET_THUMBNAIL_TAIL_NAME = '.jpg'
 
 STREAM_DATA_CHUNK_SIZE = 1024
 
+# content types which say nothing specific about the content; so, process_asset checks if it's an image
+SNIFFED_CONTENT_TYPES = ('application/octet-stream', 'binary/octet-stream')
+
 import os
 import logging
 import StringIO
@@ -18,6 +21,8 @@ from opaque_keys.edx.keys import CourseKey, AssetKey
 from opaque_keys import InvalidKeyError
 from PIL import Image
 
+from xmodule.exceptions import NotFoundError
+
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
@@ -235,6 +240,27 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_content_page_for_course(self, course_key, sort_field='uploadDate', ascending=False, page_size=50,
+                                    start=0, after=None, prefix=None):
+        '''
+        Returns a page of a course's static assets sorted by sort_field ('uploadDate' or 'displayname')
+        and then by id, followed by the position to pass as after to get the next page (None if this is
+        the last page).
+
+        after is the position returned with the previous page: if given, the page starts right after it
+        regardless of start. Otherwise, the page starts at the start'th asset. prefix, if given, limits
+        the assets to those whose display names start with it.
+
+        The assets are dictionaries as get_all_content_for_course's.
+        '''
+        raise NotImplementedError
+
+    def get_content_count_for_course(self, course_key, prefix=None):
+        '''
+        Returns the number of static assets in the course (whose display names start with prefix if given)
+        '''
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -291,6 +317,53 @@ class ContentStore(object):
 
         return thumbnail_content, thumbnail_file_location
 
+    def process_asset(self, asset_key, md5=None):
+        """
+        Do the post-processing of a saved asset which its upload or import doesn't wait for: generate its
+        thumbnail, record its image size, and, if it was saved without a specific content type, set the
+        type of image it turns out to be. Marks the asset processed (its processed_md5 attr) and not
+        processing.
+
+        Does nothing if the asset no longer exists, its content has changed since md5 (its md5 then: a
+        newer save has its own processing), or its current content was already processed. So, it's
+        safe to repeat.
+
+        Returns whether it processed the asset.
+        """
+        try:
+            attrs = self.get_attrs(asset_key)
+        except NotFoundError:
+            return False
+        current_md5 = attrs.get('md5')
+        if (md5 is not None and md5 != current_md5) or attrs.get('processed_md5') == current_md5:
+            return False
+
+        updates = {'processed_md5': current_md5, 'processing': False}
+        content_type = attrs.get('contentType')
+        if content_type is None or content_type in SNIFFED_CONTENT_TYPES or content_type.split('/')[0] == 'image':
+            content = self.find(asset_key, throw_on_not_found=False)
+            if content is None:
+                return False
+            try:
+                image = Image.open(StringIO.StringIO(content.data))
+                updates['image_size'] = list(image.size)
+                sniffed_type = Image.MIME.get(image.format)
+                if sniffed_type is not None and sniffed_type != content_type:
+                    updates['contentType'] = content.content_type = sniffed_type
+            except Exception:  # pylint: disable=broad-except
+                # not an image PIL can read (generate_thumbnail logs if it should have been)
+                pass
+            thumbnail_content, thumbnail_location = self.generate_thumbnail(content)
+            if thumbnail_content is not None:
+                updates['thumbnail_location'] = thumbnail_location.to_deprecated_list_repr()
+
+        try:
+            self.set_attrs(asset_key, updates)
+        except NotFoundError:
+            # deleted while being processed
+            return False
+        return True
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
@@ -10,7 +10,9 @@ from .content import StaticContent, ContentStore, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from fs.osfs import OSFS
 import os
+import re
 import json
+from bson.objectid import ObjectId
 from bson.son import SON
 from opaque_keys.edx.keys import AssetKey
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
@@ -42,6 +44,7 @@ class MongoContentStore(ContentStore):
         self.fs = gridfs.GridFS(_db, bucket)
 
         self.fs_files = _db[bucket + ".files"]  # the underlying collection GridFS uses
+        self.fs_chunks = _db[bucket + ".chunks"]
 
     def close_connections(self):
         """
@@ -83,37 +86,77 @@ class MongoContentStore(ContentStore):
     def delete(self, location_or_id):
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
+        fs_entry = self.fs_files.find_one({'_id': location_or_id}, fields=['shared_file_id', 'refcount'])
+        if fs_entry is not None:
+            if fs_entry.get('shared_file_id') is not None:
+                # a copy which only references another file's chunks
+                self.fs_files.remove({'_id': location_or_id})
+                self._release_shared_file(fs_entry['shared_file_id'])
+                return
+            if fs_entry.get('refcount', 0) > 0:
+                # copies still read this file's chunks
+                self._detach_shared_file(location_or_id)
+                return
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
 
+    def _release_shared_file(self, file_id):
+        """
+        Drop one reference to the file whose chunks are shared by copies and delete the file
+        once nothing refers to it and its own asset has been deleted.
+        """
+        fs_entry = self.fs_files.find_and_modify({'_id': file_id}, {'$inc': {'refcount': -1}}, new=True)
+        if fs_entry is not None and fs_entry.get('refcount', 0) <= 0 and fs_entry.get('detached', False):
+            self.fs.delete(file_id)
+
+    def _detach_shared_file(self, file_id):
+        """
+        Free up file_id (an asset's id) while keeping its chunks for the copies which reference them:
+        the file is moved to an anonymous id which no course query matches and the copies are repointed.
+        """
+        fs_entry = self.fs_files.find_one({'_id': file_id})
+        holder_id = ObjectId()
+        fs_entry['_id'] = holder_id
+        fs_entry.pop('content_son', None)
+        fs_entry['detached'] = True
+        self.fs_files.insert(fs_entry)
+        self.fs_chunks.update({'files_id': file_id}, {'$set': {'files_id': holder_id}}, multi=True)
+        self.fs_files.update({'shared_file_id': file_id}, {'$set': {'shared_file_id': holder_id}}, multi=True)
+        self.fs_files.remove({'_id': file_id})
+
+    def _open(self, content_id):
+        """
+        Returns the GridOut holding content_id's attributes and the GridOut holding its bytes. These are
+        different files when the asset was copied by copy_all_course_assets and shares the source's chunks.
+        """
+        fp = self.fs.get(content_id)
+        shared_file_id = getattr(fp, 'shared_file_id', None)
+        if shared_file_id is None:
+            return fp, fp
+        return fp, self.fs.get(shared_file_id)
+
     def find(self, location, throw_on_not_found=True, as_stream=False):
         content_id, __ = self.asset_db_key(location)
 
         try:
+            fp, data_fp = self._open(content_id)
+            thumbnail_location = getattr(fp, 'thumbnail_location', None)
+            if thumbnail_location:
+                thumbnail_location = location.course_key.make_asset_key(
+                    'thumbnail',
+                    thumbnail_location[4]
+                )
             if as_stream:
-                fp = self.fs.get(content_id)
-                thumbnail_location = getattr(fp, 'thumbnail_location', None)
-                if thumbnail_location:
-                    thumbnail_location = location.course_key.make_asset_key(
-                        'thumbnail',
-                        thumbnail_location[4]
-                    )
                 return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                    location, fp.displayname, fp.content_type, data_fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
                     length=fp.length, locked=getattr(fp, 'locked', False)
                 )
             else:
-                with self.fs.get(content_id) as fp:
-                    thumbnail_location = getattr(fp, 'thumbnail_location', None)
-                    if thumbnail_location:
-                        thumbnail_location = location.course_key.make_asset_key(
-                            'thumbnail',
-                            thumbnail_location[4]
-                        )
+                with data_fp:
                     return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
+                        location, fp.displayname, fp.content_type, data_fp.read(), last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
                         length=fp.length, locked=getattr(fp, 'locked', False)
@@ -163,7 +206,9 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in [
+                        '_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'shared_file_id', 'refcount'
+                ]:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
@@ -189,12 +234,12 @@ class MongoContentStore(ContentStore):
                 ('{}.category'.format(prefix), 'asset'),
                 ('{}.name'.format(prefix), {'$regex': ASSET_IGNORE_REGEX}),
             ])
-            items = self.fs_files.find(query)
-            assets_to_delete = assets_to_delete + items.count()
+            # read the ids first as deleting shared files moves and updates other files
+            items = list(self.fs_files.find(query, fields=['_id']))
+            assets_to_delete = assets_to_delete + len(items)
             for asset in items:
-                self.fs.delete(asset[prefix])
-
-            self.fs_files.remove(query)
+                # delete keeps the chunks of files which are shared with copies
+                self.delete(asset['_id'])
         return assets_to_delete
 
     def _get_all_content_for_course(self, course_key, get_thumbnails=False, start=0, maxresults=-1, sort=None):
@@ -227,6 +272,57 @@ class MongoContentStore(ContentStore):
             asset['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
         return assets, count
 
+    def get_content_page_for_course(self, course_key, sort_field='uploadDate', ascending=False, page_size=50,
+                                    start=0, after=None, prefix=None):
+        """
+        See :meth:`.ContentStore.get_content_page_for_course`
+
+        Paging with after reads only the page's entries through the (course, category, sort_field, _id)
+        indexes rather than skipping over all the earlier ones. The position is the last entry's
+        (sort_field value, _id).
+        """
+        direction = pymongo.ASCENDING if ascending else pymongo.DESCENDING
+        query = self._query_for_course_assets(course_key, prefix)
+        if after is not None:
+            after_value, after_id = after
+            past = '$gt' if ascending else '$lt'
+            query['$or'] = [
+                {sort_field: {past: after_value}},
+                {sort_field: after_value, '_id': {past: after_id}},
+            ]
+        items = self.fs_files.find(
+            query, sort=[(sort_field, direction), ('_id', direction)],
+            skip=start if after is None else 0, limit=page_size,
+        )
+        assets = list(items)
+
+        for asset in assets:
+            asset_id = asset.get('content_son', asset['_id'])
+            asset['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
+
+        next_position = None
+        if len(assets) == page_size:
+            last = assets[-1]
+            # the ids of deprecated courses' assets are compared by their fields in their stored order
+            next_position = (last.get(sort_field), self.make_id_son(dict(last)))
+        return assets, next_position
+
+    def get_content_count_for_course(self, course_key, prefix=None):
+        """
+        See :meth:`.ContentStore.get_content_count_for_course`
+        """
+        return self.fs_files.find(self._query_for_course_assets(course_key, prefix)).count()
+
+    @staticmethod
+    def _query_for_course_assets(course_key, prefix=None):
+        """
+        The query for the course's assets (not thumbnails) whose display names start with prefix if given
+        """
+        query = query_for_course(course_key, 'asset')
+        if prefix:
+            query['displayname'] = {'$regex': u'^{}'.format(re.escape(prefix))}
+        return query
+
     def set_attr(self, asset_key, attr, value=True):
         """
         Add/set the given attr on the asset at the given location. Does not allow overwriting gridFS built in
@@ -291,17 +387,19 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation doesn't copy any data: each copied asset is a files entry which references the
+        source file's chunks. The source file counts its references so that deleting or overwriting either
+        the source or the copy leaves the other intact.
         """
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
         for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
+            source_id = self.make_id_son(asset)
+            asset_key = source_id
             if isinstance(asset_key, basestring):
                 asset_key = AssetKey.from_string(asset_key)
                 __, asset_key = self.asset_db_key(asset_key)
+            else:
+                asset_key = SON(asset_key)
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -314,17 +412,24 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
-                # thumbnail is not technically correct but will be functionally correct as the code
-                # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
-                # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
-            )
+            # copies of copies share the original chunks
+            shared_file_id = asset.get('shared_file_id', source_id)
+            copied = dict(asset)
+            copied.pop('refcount', None)
+            copied.pop('asset_key', None)
+            copied.update({
+                '_id': asset_id,
+                'content_son': asset_key,
+                'shared_file_id': shared_file_id,
+            })
+            # remove any previous copy so that its reference gets released
+            self.delete(asset_id)
+            # count the reference before writing it so that a failure in between can only leave the shared
+            # chunks over-referenced (kept) rather than under-referenced (deleted while the copy reads them)
+            self.fs_files.update({'_id': shared_file_id}, {'$inc': {'refcount': 1}})
+            # upsert rather than insert so that a copy written concurrently is replaced rather than failing
+            del copied['_id']
+            self.fs_files.update({'_id': asset_id}, copied, upsert=True)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -336,7 +441,7 @@ class MongoContentStore(ContentStore):
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self.delete(asset_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -378,7 +483,7 @@ class MongoContentStore(ContentStore):
     def ensure_indexes(self):
 
         # Index needed thru 'category' by `_get_all_content_for_course` and others. That query also takes a sort
-        # which can be `uploadDate`, `display_name`,
+        # which can be `uploadDate`, `displayname`,
 
         self.fs_files.create_index(
             [('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING), ('_id.name', pymongo.ASCENDING)],
@@ -388,22 +493,22 @@ class MongoContentStore(ContentStore):
             [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('content_son.name', pymongo.ASCENDING)],
             sparse=True
         )
-        self.fs_files.create_index(
-            [('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING), ('uploadDate', pymongo.ASCENDING)],
-            sparse=True
-        )
-        self.fs_files.create_index(
-            [('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING), ('display_name', pymongo.ASCENDING)],
-            sparse=True
-        )
-        self.fs_files.create_index(
-            [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('uploadDate', pymongo.ASCENDING)],
-            sparse=True
-        )
-        self.fs_files.create_index(
-            [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('display_name', pymongo.ASCENDING)],
-            sparse=True
-        )
+        # `get_content_page_for_course` sorts a course's assets by one of these and then by _id (in either
+        # direction) and pages by the last (sort key, _id) read
+        for prefix in ('_id', 'content_son'):
+            for sort_key in ('uploadDate', 'displayname'):
+                self.fs_files.create_index(
+                    [
+                        ('{}.org'.format(prefix), pymongo.ASCENDING),
+                        ('{}.course'.format(prefix), pymongo.ASCENDING),
+                        ('{}.category'.format(prefix), pymongo.ASCENDING),
+                        (sort_key, pymongo.ASCENDING),
+                        ('_id', pymongo.ASCENDING),
+                    ],
+                    sparse=True
+                )
+        # copies made by copy_all_course_assets get repointed when their source is deleted
+        self.fs_files.create_index([('shared_file_id', pymongo.ASCENDING)], sparse=True)
 
 
 def query_for_course(course_key, category=None):
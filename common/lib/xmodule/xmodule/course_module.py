@@ -1062,3 +1062,40 @@ class CourseDescriptor(CourseFields, SequenceDescriptor):
             return self.display_organization
 
         return self.org
+
+
+class CourseSummary(object):
+    """
+    The few fields of a course which course listings show, read from the course's root without
+    loading the course (see the modulestores' get_course_summaries)
+    """
+    def __init__(self, location, display_name=None, display_organization=None, display_coursenumber=None):
+        self.location = location
+        # as the course's display_name field, which defaults when the course doesn't set it
+        self.display_name = display_name if display_name is not None else CourseFields.display_name.default
+        self.display_organization = display_organization
+        self.display_coursenumber = display_coursenumber
+
+    @property
+    def id(self):  # pylint: disable=invalid-name
+        """
+        The course's key
+        """
+        return self.location.course_key
+
+    @property
+    def display_org_with_default(self):
+        """
+        As CourseDescriptor.display_org_with_default
+        """
+        return self.display_organization or self.location.org
+
+    @property
+    def display_number_with_default(self):
+        """
+        As CourseDescriptor.display_number_with_default
+        """
+        return self.display_coursenumber or self.location.course
+
+    def __repr__(self):
+        return u"CourseSummary({!r})".format(self.location)
@@ -6,6 +6,8 @@ import sys
 
 from collections import namedtuple
 
+import numpy
+
 log = logging.getLogger("edx.courseware")
 
 # This is a tuple for holding scores, either from problems or sections.
@@ -40,6 +42,70 @@ def aggregate_scores(scores, section_name="summary"):
     return all_total, graded_total
 
 
+class ScoreMatrix(object):
+    """
+    The graded totals of many students' sections (what a grade sheet holds for one student) as arrays
+    for CourseGrader.grade_matrix.
+
+    sections is a list of (section format, section name) of the columns. earned and possible are
+    students x sections arrays. Unlike a grade sheet, every student has a score for every section; so,
+    sections which grade sheets leave out (those with no possible points) must be left out for all.
+    """
+    def __init__(self, sections, earned, possible):
+        self.sections = list(sections)
+        self.earned = numpy.asarray(earned, dtype=float)
+        self.possible = numpy.asarray(possible, dtype=float)
+        if self.earned.ndim != 2 or self.earned.shape != self.possible.shape or \
+                self.earned.shape[1] != len(self.sections):
+            raise ValueError("earned and possible must be students x sections arrays")
+
+    @classmethod
+    def from_grade_sheets(cls, grade_sheets):
+        """
+        Make the ScoreMatrix of grade_sheets (a list of grade sheets, see CourseGrader). Every grade sheet
+        must have the same sections.
+        """
+        sections = None
+        earned = []
+        possible = []
+        for grade_sheet in grade_sheets:
+            scores = [
+                (section_format, score)
+                for section_format, format_scores in sorted(grade_sheet.iteritems())
+                for score in format_scores
+            ]
+            grade_sheet_sections = [(section_format, score.section) for section_format, score in scores]
+            if sections is None:
+                sections = grade_sheet_sections
+            elif grade_sheet_sections != sections:
+                raise ValueError("The grade sheets don't all have the same sections")
+            earned.append([score.earned for __, score in scores])
+            possible.append([score.possible for __, score in scores])
+        sections = sections or []
+        shape = (len(grade_sheets), len(sections))
+        return cls(sections, numpy.reshape(earned, shape), numpy.reshape(possible, shape))
+
+    @property
+    def students(self):
+        """
+        The number of students (rows)
+        """
+        return self.earned.shape[0]
+
+    def columns(self, section_format):
+        """
+        The indices of section_format's sections' columns in order
+        """
+        return [index for index, (column_format, __) in enumerate(self.sections) if column_format == section_format]
+
+    def percents(self, columns):
+        """
+        The students x len(columns) array of the percents of the sections in columns
+        """
+        columns = numpy.array(columns, dtype=int)
+        return self.earned[:, columns] / self.possible[:, columns]
+
+
 def invalid_args(func, argdict):
     """
     Given a function and a dictionary of arguments, returns a set of arguments
@@ -154,6 +220,15 @@ class CourseGrader(object):
         '''Given a grade sheet, return a dict containing grading information'''
         raise NotImplementedError
 
+    def grade_matrix(self, scores):
+        '''
+        Given a ScoreMatrix, grade all of its students at once. Returns the same dict as grade except
+        that the percents are arrays with a value per student, the breakdowns have no detail strings, and
+        the section breakdown marks dropped sections with a boolean array under 'dropped'. The percents
+        are identical to grading each student's grade sheet.
+        '''
+        raise NotImplementedError
+
 
 class WeightedSubsectionsGrader(CourseGrader):
     """
@@ -193,6 +268,24 @@ class WeightedSubsectionsGrader(CourseGrader):
                 'section_breakdown': section_breakdown,
                 'grade_breakdown': grade_breakdown}
 
+    def grade_matrix(self, scores):
+        total_percent = numpy.zeros(scores.students)
+        section_breakdown = []
+        grade_breakdown = []
+
+        for subgrader, category, weight in self.sections:
+            subgrade_result = subgrader.grade_matrix(scores)
+
+            weighted_percent = subgrade_result['percent'] * weight
+
+            total_percent += weighted_percent
+            section_breakdown += subgrade_result['section_breakdown']
+            grade_breakdown.append({'percent': weighted_percent, 'category': category})
+
+        return {'percent': total_percent,
+                'section_breakdown': section_breakdown,
+                'grade_breakdown': grade_breakdown}
+
 
 class SingleSectionGrader(CourseGrader):
     """
@@ -243,6 +336,21 @@ class SingleSectionGrader(CourseGrader):
                 #No grade_breakdown here
                 }
 
+    def grade_matrix(self, scores):
+        percent = numpy.zeros(scores.students)
+        for index in scores.columns(self.type):
+            if scores.sections[index][1] == self.name:
+                percent = scores.percents([index])[:, 0]
+                break
+
+        breakdown = [{'percent': percent, 'label': self.short_label,
+                      'category': self.category, 'prominent': True}]
+
+        return {'percent': percent,
+                'section_breakdown': breakdown,
+                #No grade_breakdown here
+                }
+
 
 class AssignmentFormatGrader(CourseGrader):
     """
@@ -382,3 +490,51 @@ class AssignmentFormatGrader(CourseGrader):
                 'section_breakdown': breakdown,
                 #No grade_breakdown here
                 }
+
+    def grade_matrix(self, scores):
+        columns = scores.columns(self.type)
+        count = max(self.min_count, len(columns))
+        # the sections' percents followed by placeholder 0s for the unreleased ones
+        percents = numpy.zeros((scores.students, count))
+        percents[:, :len(columns)] = scores.percents(columns)
+
+        # As grade, drop the lowest scores and of equal scores the later ones. A stable sort of the
+        # negated percents orders each student's sections as grade's sort does.
+        dropped = numpy.zeros(percents.shape, dtype=bool)
+        if self.drop_count > 0:
+            order = numpy.argsort(-percents, axis=1, kind='mergesort')
+            dropped[numpy.arange(scores.students)[:, numpy.newaxis], order[:, -self.drop_count:]] = True
+
+        # sum section by section so the floating point additions are grade's
+        total_percent = numpy.zeros(scores.students)
+        for index in range(count):
+            total_percent += numpy.where(dropped[:, index], 0.0, percents[:, index])
+        if count - self.drop_count > 0:
+            total_percent /= count - self.drop_count
+
+        breakdown = [
+            {'percent': percents[:, index],
+             'label': u"{short_label} {index:02d}".format(index=index + self.starting_index,
+                                                          short_label=self.short_label),
+             'category': self.category,
+             'dropped': dropped[:, index]}
+            for index in range(count)
+        ]
+
+        if len(breakdown) == 1:
+            # as grade, act like a SingleSectionGrader
+            breakdown = [{'percent': total_percent, 'label': u"{short_label}".format(short_label=self.short_label),
+                          'category': self.category, 'prominent': True}, ]
+        else:
+            if self.show_only_average:
+                breakdown = []
+
+            if not self.hide_average:
+                breakdown.append({'percent': total_percent,
+                                  'label': u"{short_label} Avg".format(short_label=self.short_label),
+                                  'category': self.category, 'prominent': True})
+
+        return {'percent': total_percent,
+                'section_breakdown': breakdown,
+                #No grade_breakdown here
+                }
@@ -411,6 +411,15 @@ class ModuleStoreRead(object):
         '''
         pass
 
+    @abstractmethod
+    def get_course_summaries(self, orgs=None, course_keys=None, **kwargs):
+        '''
+        Returns a list of :class:`~xmodule.course_module.CourseSummary` of the courses in this
+        modulestore without loading the courses. If orgs or course_keys is given, only of the
+        courses in one of the orgs or with one of the keys.
+        '''
+        pass
+
     @abstractmethod
     def get_course(self, course_id, depth=0, **kwargs):
         '''
@@ -682,6 +691,22 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
                 return course
         return None
 
+    def get_course_summaries(self, orgs=None, course_keys=None, **kwargs):
+        """
+        Default impl--summarize the loaded courses
+        """
+        from xmodule.course_module import CourseSummary  # pylint: disable=cyclic-import
+        return [
+            CourseSummary(
+                course.location,
+                course.display_name,
+                getattr(course, 'display_organization', None),
+                getattr(course, 'display_coursenumber', None),
+            )
+            for course in self.get_courses(**kwargs)
+            if course_in_orgs_or_keys(course.id, orgs, course_keys)
+        ]
+
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
@@ -764,6 +789,18 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
         return wrapper
 
 
+def course_in_orgs_or_keys(course_key, orgs=None, course_keys=None):
+    """
+    Whether course_key is in one of orgs or one of course_keys (ignoring branches and versions).
+    With neither, every course is.
+    """
+    if orgs is None and course_keys is None:
+        return True
+    if orgs and course_key.org in orgs:
+        return True
+    return bool(course_keys) and course_key.for_branch(None).version_agnostic() in course_keys
+
+
 def hashvalue(arg):
     """
     If arg is an xblock, use its location. otherwise just turn it into a string
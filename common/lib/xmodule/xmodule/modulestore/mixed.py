@@ -260,6 +260,21 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                     courses[course_id] = course
         return courses.values()
 
+    @strip_key
+    def get_course_summaries(self, orgs=None, course_keys=None, **kwargs):
+        '''
+        Returns the CourseSummary's of the courses in all the modulestores (see
+        ModuleStoreRead.get_course_summaries).
+        '''
+        summaries = {}
+        for store in self.modulestores:
+            for summary in store.get_course_summaries(orgs=orgs, course_keys=course_keys, **kwargs):
+                course_id = self._clean_course_id_for_mapping(summary.id)
+                # as get_courses: the first store's course wins
+                if course_id not in summaries:
+                    summaries[course_id] = summary
+        return summaries.values()
+
     def make_course_key(self, org, course, run):
         """
         Return a valid :class:`~opaque_keys.edx.keys.CourseKey` for this modulestore
@@ -30,6 +30,7 @@ from importlib import import_module
 from xmodule.errortracker import null_error_tracker, exc_info_to_str
 from xmodule.mako_module import MakoDescriptorSystem
 from xmodule.error_module import ErrorDescriptor
+from xmodule.course_module import CourseSummary
 from xblock.runtime import KvsFieldData
 from xblock.exceptions import InvalidScopeError
 from xblock.fields import Scope, ScopeIds, Reference, ReferenceList, ReferenceValueDict
@@ -337,6 +338,12 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         """
         return xblock._edit_info.get('subtree_edited_on')
 
+    def get_course_version(self, xblock):
+        """
+        Return a token which changes whenever xblock's course changes (see MongoModuleStore.get_course_version)
+        """
+        return self.modulestore.get_course_version(xblock.location.course_key)
+
     def get_published_by(self, xblock):
         """
         See :class: cms.lib.xblock.runtime.EditInfoRuntimeMixin
@@ -553,9 +560,12 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             return location.replace(revision=MongoRevisionKey.draft)
         return location.replace(revision=MongoRevisionKey.published)
 
-    def _compute_metadata_inheritance_tree(self, course_id):
+    def _compute_metadata_inheritance_tree(self, course_id, parent_locations=None):
         '''
         TODO (cdodge) This method can be deleted when the 'split module store' work has been completed
+
+        If given a dict as parent_locations, fills it with the course's child to parent map from the same
+        query (see _get_cached_parent_locations).
         '''
         # get all collections in the course, this query should not return any leaf nodes
         # note this is a bit ugly as when we add new categories of containers, we have to add it here
@@ -589,6 +599,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             location = as_published(Location._from_deprecated_son(result['_id'], course_id.run))
 
             location_url = unicode(location)
+            if parent_locations is not None:
+                # record each revision's parentage before the revisions' children are merged below
+                for child in result.get('definition', {}).get('children', []):
+                    parent_locations.setdefault(child, []).append([location_url, result['_id'].get('revision')])
             if location_url in results_by_url:
                 # found either draft or live to complement the other revision
                 existing_children = results_by_url[location_url].get('definition', {}).get('children', [])
@@ -651,11 +665,13 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         if not tree:
             # if not in subsystem, or we are on force refresh, then we have to compute
-            tree = self._compute_metadata_inheritance_tree(course_id)
+            parent_locations = {}
+            tree = self._compute_metadata_inheritance_tree(course_id, parent_locations)
 
             # now write out computed tree to caching subsystem (e.g. memcached), if available
             if self.metadata_inheritance_cache_subsystem is not None:
                 self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+            self._cache_parent_locations(course_id, parent_locations)
 
         # now populate a request_cache, if available. NOTE, we are outside of the
         # scope of the above if: statement so that after a memcache hit, it'll get
@@ -669,6 +685,61 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         return tree
 
+    @staticmethod
+    def _parent_locations_cache_key(course_id):
+        '''
+        The key of the course's child to parent map in the metadata inheritance cache subsystem
+        '''
+        return u'{}.parent_locations'.format(course_id)
+
+    def _get_cached_parent_locations(self, course_id):
+        '''
+        Return the course's child to parent map, {child url: [[parent url, parent revision], ...]}, from the
+        request cache or the caching subsystem computing it (along with the inheritance tree) if neither
+        has it. Returns None if the map can't be used: the store has no caches or the course is in a bulk
+        operation (whose writes don't refresh the cached inheritance).
+        '''
+        course_id = self.fill_in_run(course_id)
+        if self.request_cache is None and self.metadata_inheritance_cache_subsystem is None:
+            return None
+        if self._is_in_bulk_operation(course_id):
+            return None
+
+        parent_locations = None
+        if self.request_cache is not None:
+            parent_locations = self.request_cache.data.get('parent_locations', {}).get(unicode(course_id))
+        if parent_locations is None and self.metadata_inheritance_cache_subsystem is not None:
+            parent_locations = self.metadata_inheritance_cache_subsystem.get(
+                self._parent_locations_cache_key(course_id)
+            )
+            if parent_locations is not None and self.request_cache is not None:
+                self.request_cache.data.setdefault('parent_locations', {})[unicode(course_id)] = parent_locations
+        if parent_locations is None:
+            parent_locations = {}
+            self._compute_metadata_inheritance_tree(course_id, parent_locations)
+            self._cache_parent_locations(course_id, parent_locations)
+        return parent_locations
+
+    def _cache_parent_locations(self, course_id, parent_locations):
+        '''
+        Write the course's child to parent map to the caching subsystem and the request cache (if present)
+        '''
+        if self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(self._parent_locations_cache_key(course_id), parent_locations)
+        if self.request_cache is not None:
+            self.request_cache.data.setdefault('parent_locations', {})[unicode(course_id)] = parent_locations
+
+    def _clear_cached_parent_locations(self, course_id):
+        '''
+        Drop the course's cached child to parent map. Call this on any write which may change which items
+        claim which children (the next lookup or inheritance refresh recomputes it).
+        '''
+        course_id = self.fill_in_run(course_id).for_branch(None)
+        if self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.delete(self._parent_locations_cache_key(course_id))
+        if self.request_cache is not None:
+            self.request_cache.data.get('parent_locations', {}).pop(unicode(course_id), None)
+
     def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
@@ -683,6 +754,38 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
             if runtime:
                 runtime.cached_metadata = cached_metadata
+            if self.metadata_inheritance_cache_subsystem is not None:
+                self._new_course_version(course_id)
+
+    @staticmethod
+    def _course_version_cache_key(course_id):
+        '''
+        The key of the course's version token in the metadata inheritance cache subsystem
+        '''
+        return u'{}.version'.format(course_id)
+
+    def _new_course_version(self, course_id):
+        '''
+        Record a new version token for the course in the caching subsystem and return it
+        '''
+        version = uuid4().hex
+        self.metadata_inheritance_cache_subsystem.set(self._course_version_cache_key(course_id), version)
+        return version
+
+    def get_course_version(self, course_id):
+        '''
+        Return a token which changes whenever the course changes (each write outside of a bulk operation
+        and the end of each bulk operation which wrote), for keying caches of values computed from the
+        course. Old mongo courses don't record a version; so, the token lives in the caching subsystem
+        and a new one is made whenever it's missing. Returns None if the store has no caching subsystem.
+        '''
+        if self.metadata_inheritance_cache_subsystem is None:
+            return None
+        course_id = self.fill_in_run(course_id).for_branch(None)
+        version = self.metadata_inheritance_cache_subsystem.get(self._course_version_cache_key(course_id))
+        if version is None:
+            version = self._new_course_version(course_id)
+        return version
 
     def _clean_item_data(self, item):
         """
@@ -818,6 +921,35 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         )
         return [course for course in base_list if not isinstance(course, ErrorDescriptor)]
 
+    def get_course_summaries(self, orgs=None, course_keys=None, **kwargs):
+        '''
+        Returns CourseSummary's of the courses (see ModuleStoreRead.get_course_summaries) from one query
+        which only reads the courses' ids and display metadata.
+        '''
+        query = SON([('_id.tag', 'i4x'), ('_id.category', 'course')])
+        if orgs is not None or course_keys is not None:
+            query['$or'] = [{'_id.org': {'$in': list(orgs or [])}}] + [
+                {'_id.org': course_key.org, '_id.course': course_key.course, '_id.name': course_key.run}
+                for course_key in course_keys or []
+            ]
+        record_filter = {
+            '_id': 1, 'metadata.display_name': 1,
+            'metadata.display_organization': 1, 'metadata.display_coursenumber': 1,
+        }
+        summaries = []
+        for course in self.collection.find(query, record_filter):
+            # TODO kill this (see get_courses)
+            if course['_id']['org'] == 'edx' and course['_id']['course'] == 'templates':
+                continue
+            metadata = course.get('metadata', {})
+            summaries.append(CourseSummary(
+                Location._from_deprecated_son(course['_id'], course['_id']['name']),
+                metadata.get('display_name'),
+                metadata.get('display_organization'),
+                metadata.get('display_coursenumber'),
+            ))
+        return summaries
+
     def _find_one(self, location):
         '''Look for a given location in the collection. If the item is not present, raise
         ItemNotFoundError.
@@ -1171,6 +1303,8 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             upsert=allow_not_found,
             w=1,  # wait until primary commits
         )
+        if 'definition.children' in update:
+            self._clear_cached_parent_locations(location.course_key)
         if result['n'] == 0:
             raise ItemNotFoundError(location)
 
@@ -1299,6 +1433,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                         multi=False,
                         upsert=True,
                     )
+                    self._clear_cached_parent_locations(location.course_key)
                 elif ancestor_loc.category == 'course':
                     # once we reach the top location of the tree and if the location is not an orphan then the
                     # parent is not an orphan either
@@ -1316,6 +1451,20 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         assert revision == ModuleStoreEnum.RevisionOption.published_only \
             or revision == ModuleStoreEnum.RevisionOption.draft_preferred
 
+        parent_locations = self._get_cached_parent_locations(location.course_key)
+        if parent_locations is not None:
+            parents = parent_locations.get(unicode(location), [])
+            published = [url for url, parent_revision in parents if parent_revision == MongoRevisionKey.published]
+            drafts = [url for url, parent_revision in parents if parent_revision == MongoRevisionKey.draft]
+            # multiple PUBLISHED parents need the orphan resolution below
+            if len(published) <= 1:
+                run = location.course_key.run
+                if revision == ModuleStoreEnum.RevisionOption.draft_preferred and drafts:
+                    return as_draft(Location.from_deprecated_string(drafts[0]).replace(run=run))
+                if published:
+                    return Location.from_deprecated_string(published[0]).replace(run=run)
+                return None
+
         # create a query with tag, org, course, and the children field set to the given location
         query = self._course_key_to_son(location.course_key)
         query['definition.children'] = unicode(location)
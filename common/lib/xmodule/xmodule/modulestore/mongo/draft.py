@@ -155,6 +155,7 @@ class DraftModuleStore(MongoModuleStore):
         # delete all of the db records for the course
         course_query = self._course_key_to_son(course_key)
         self.collection.remove(course_query, multi=True)
+        self._clear_cached_parent_locations(course_key)
 
     def clone_course(self, source_course_id, dest_course_id, user_id, fields=None, **kwargs):
         """
@@ -424,6 +425,10 @@ class DraftModuleStore(MongoModuleStore):
                 # prevent re-creation of DRAFT versions, unless explicitly requested to ignore
                 if not ignore_if_draft:
                     raise DuplicateItemError(item['_id'], self, 'collection')
+            else:
+                if next_tier:
+                    # the draft claims the children too
+                    self._clear_cached_parent_locations(location.course_key)
 
             # delete the old PUBLISHED version if requested
             if delete_published:
@@ -596,6 +601,7 @@ class DraftModuleStore(MongoModuleStore):
             bulk_record = self._get_bulk_ops_record(root_usages[0].course_key)
             bulk_record.dirty = True
             self.collection.remove({'_id': {'$in': to_be_deleted}}, safe=self.collection.safe)
+            self._clear_cached_parent_locations(root_usages[0].course_key)
 
     @MongoModuleStore.memoize_request_cache
     def has_changes(self, xblock):
@@ -693,6 +699,7 @@ class DraftModuleStore(MongoModuleStore):
             bulk_record = self._get_bulk_ops_record(location.course_key)
             bulk_record.dirty = True
             self.collection.remove({'_id': {'$in': to_be_deleted}})
+            self._clear_cached_parent_locations(location.course_key)
         return self.get_item(as_published(location))
 
     def unpublish(self, location, user_id, **kwargs):
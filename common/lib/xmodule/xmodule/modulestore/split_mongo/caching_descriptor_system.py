@@ -278,6 +278,13 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
 
         return getattr(xblock, '_subtree_edited_on')
 
+    def get_course_version(self, xblock):  # pylint: disable=unused-argument
+        """
+        Return a token which changes whenever xblock's course changes: the version of the structure this
+        runtime loaded it from (each change to a branch, e.g., each publish, makes a new structure).
+        """
+        return unicode(self.course_entry.structure['_id'])
+
     def get_published_by(self, xblock):
         """
         See :class: cms.lib.xblock.runtime.EditInfoRuntimeMixin
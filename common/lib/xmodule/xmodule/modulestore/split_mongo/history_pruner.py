@@ -0,0 +1,153 @@
+"""
+Garbage collection of split modulestore history.
+
+Every edit in split creates a new structure and nothing ever removes the old ones. This module finds
+the structures which are neither the head of some branch of some course index nor within the retention
+window of one, and the definitions which no remaining structure uses, and removes them.
+
+Retention:
+    * every version which a course index points to (all branches of courses and libraries)
+    * the ``retain_versions`` predecessors of each of those heads
+    * any version or definition edited within the last ``retain_days`` days regardless of reachability
+      (this also protects ones written by an in flight bulk operation but not yet indexed)
+    * the ``original_version`` of each retained structure as that's what history queries key off of
+    * the ``delta_base`` snapshot of each retained delta encoded structure as it can't be read without it
+
+The ``previous_version`` of the oldest retained structure (and definition) may thus point to a
+removed document: history walks just stop there.
+"""
+import datetime
+import logging
+from collections import namedtuple
+
+from pytz import UTC
+
+log = logging.getLogger(__name__)
+
+PruneStats = namedtuple(
+    'PruneStats',
+    'structures_total structures_reclaimable structure_bytes '
+    'definitions_total definitions_reclaimable definition_bytes'
+)
+
+
+class SplitHistoryPruner(object):
+    """
+    Finds and removes the unreachable structures and definitions of a split modulestore.
+    """
+    DEFAULT_RETAIN_VERSIONS = 10
+    DEFAULT_RETAIN_DAYS = 30
+    # how many ids to put in each $in query
+    BATCH_SIZE = 1000
+
+    def __init__(self, db_connection, retain_versions=DEFAULT_RETAIN_VERSIONS, retain_days=DEFAULT_RETAIN_DAYS):
+        """
+        Args:
+            db_connection (MongoConnection): the split modulestore's connection
+            retain_versions (int): how many predecessors of each head version to keep
+            retain_days (int): never remove anything edited more recently than this
+        """
+        self.db_connection = db_connection
+        self.retain_versions = retain_versions
+        self.retain_days = retain_days
+
+    def find_unreachable(self):
+        """
+        Returns a 4-tuple of (list of unreachable structure ids, total number of structures,
+        list of unreachable definition ids, total number of definitions)
+        """
+        cutoff = datetime.datetime.now(UTC) - datetime.timedelta(days=self.retain_days)
+
+        heads = set()
+        for index_entry in self.db_connection.find_matching_course_indexes():
+            heads.update(index_entry.get('versions', {}).itervalues())
+
+        version_info = {
+            structure['_id']: structure for structure in self.db_connection.find_structures_version_info()
+        }
+        retained = set(
+            version_guid for version_guid, structure in version_info.iteritems()
+            if self._is_recent(structure.get('edited_on'), cutoff)
+        )
+        # the shallowest depth at which each version has been walked so shared history isn't rewalked
+        walked = {}
+        for head in heads:
+            version_guid = head
+            depth = 0
+            while version_guid in version_info and depth < walked.get(version_guid, self.retain_versions + 1):
+                walked[version_guid] = depth
+                structure = version_info[version_guid]
+                retained.add(version_guid)
+                if structure.get('original_version') is not None:
+                    retained.add(structure['original_version'])
+                version_guid = structure.get('previous_version')
+                depth += 1
+        retained.update([
+            version_info[retained_guid]['delta_base'] for retained_guid in list(retained)
+            if version_info.get(retained_guid, {}).get('delta_base') is not None
+        ])
+        unreachable_structures = [guid for guid in version_info if guid not in retained]
+
+        used_definitions = set()
+        retained_list = list(retained)
+        for batch in self._batches(retained_list):
+            used_definitions.update(self.db_connection.find_definition_ids_in_structures(batch))
+        definitions = self.db_connection.find_definitions_version_info()
+        unreachable_definitions = [
+            definition['_id'] for definition in definitions
+            if definition['_id'] not in used_definitions and
+            not self._is_recent(definition.get('edit_info', {}).get('edited_on'), cutoff)
+        ]
+        return unreachable_structures, len(version_info), unreachable_definitions, len(definitions)
+
+    def stats(self, unreachable=None):
+        """
+        Compute the :class:`PruneStats` of what pruning would remove. Pass the result of
+        :meth:`find_unreachable` to avoid recomputing it.
+        """
+        if unreachable is None:
+            unreachable = self.find_unreachable()
+        structure_ids, structures_total, definition_ids, definitions_total = unreachable
+        return PruneStats(
+            structures_total=structures_total,
+            structures_reclaimable=len(structure_ids),
+            structure_bytes=sum(self.db_connection.structures_size(batch) for batch in self._batches(structure_ids)),
+            definitions_total=definitions_total,
+            definitions_reclaimable=len(definition_ids),
+            definition_bytes=sum(
+                self.db_connection.definitions_size(batch) for batch in self._batches(definition_ids)
+            ),
+        )
+
+    def prune(self, unreachable=None):
+        """
+        Remove the unreachable structures and definitions. Returns the 4-tuple from :meth:`find_unreachable`.
+        """
+        if unreachable is None:
+            unreachable = self.find_unreachable()
+        structure_ids, __, definition_ids, __ = unreachable
+        # structures first so that an interrupted run never leaves a structure pointing to missing definitions
+        for batch in self._batches(structure_ids):
+            self.db_connection.delete_structures(batch)
+        for batch in self._batches(definition_ids):
+            self.db_connection.delete_definitions(batch)
+        log.info("Pruned %d structures and %d definitions", len(structure_ids), len(definition_ids))
+        return unreachable
+
+    def _batches(self, ids):
+        """
+        Split ids into lists of at most BATCH_SIZE
+        """
+        for start in xrange(0, len(ids), self.BATCH_SIZE):
+            yield ids[start:start + self.BATCH_SIZE]
+
+    @staticmethod
+    def _is_recent(edited_on, cutoff):
+        """
+        Whether edited_on is after cutoff. Documents w/o an edited_on are treated as old.
+        """
+        if edited_on is None:
+            return False
+        if edited_on.tzinfo is None:
+            edited_on = edited_on.replace(tzinfo=UTC)
+        return edited_on >= cutoff
@@ -1,21 +1,25 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import copy
 import re
 import pymongo
+import threading
 import time
+from bson import BSON
+from collections import OrderedDict
 
-# Import this just to export it
-from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
-
-from contracts import check
+from contracts import check, new_contract
 from functools import wraps
 from pymongo.errors import AutoReconnect
 from xmodule.exceptions import HeartbeatFailure
+from xmodule.modulestore.exceptions import ReferentialIntegrityError
 from xmodule.modulestore.split_mongo import BlockKey
 import datetime
 import pytz
 
+new_contract('BlockKey', BlockKey)
+
 
 def structure_from_mongo(structure):
     """
@@ -94,16 +98,51 @@ def autoretry_read(wait=0.1, retries=5):
     return decorate
 
 
+def _normalize_for_compare(value):
+    """
+    Convert tuples (e.g., BlockKeys) to lists recursively so that a block about to be written compares
+    equal to the same block as read back from mongo.
+    """
+    if isinstance(value, (list, tuple)):
+        return [_normalize_for_compare(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize_for_compare(item) for key, item in value.iteritems()}
+    return value
+
+
+def _mongo_block_key(block):
+    """
+    The (block_type, block_id) of a block in mongo format
+    """
+    return (block['block_type'], block['block_id'])
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
+
+    If ``structure_snapshot_interval`` is set, new structures are stored as deltas: only the blocks which
+    differ from the most recent full snapshot in their version history get stored along with the
+    ids of any removed blocks. Every ``structure_snapshot_interval``th version (and any version whose delta
+    would be more than half of its blocks) is stored in full. Reads reassemble the full structure so this
+    is transparent to callers. Structures stored in either format remain readable regardless of the setting.
     """
+    # the fields which distinguish a delta from a full structure document
+    DELTA_FIELDS = ('delta_base', 'delta_depth', 'blocks_removed')
+    # how many snapshots to keep in memory to rebuild deltas from
+    SNAPSHOT_CACHE_SIZE = 16
+
     def __init__(
-        self, db, collection, host, port=27017, tz_aware=True, user=None, password=None, asset_collection=None, **kwargs
+        self, db, collection, host, port=27017, tz_aware=True, user=None, password=None, asset_collection=None,
+        structure_snapshot_interval=None, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
         """
+        self.structure_snapshot_interval = structure_snapshot_interval
+        self._snapshot_cache = OrderedDict()
+        # the connection (and so its cache) is shared by the threads serving requests
+        self._snapshot_lock = threading.Lock()
         self.database = pymongo.database.Database(
             pymongo.MongoClient(
                 host=host,
@@ -147,7 +186,7 @@ class MongoConnection(object):
         """
         Get the structure from the persistence mechanism whose id is the given key
         """
-        return structure_from_mongo(self.structures.find_one({'_id': key}))
+        return structure_from_mongo(self._expand_structure(self.structures.find_one({'_id': key})))
 
     @autoretry_read()
     def find_structures_by_id(self, ids):
@@ -157,7 +196,10 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
+        return [
+            structure_from_mongo(self._expand_structure(structure))
+            for structure in self.structures.find({'_id': {'$in': ids}})
+        ]
 
     @autoretry_read()
     def find_structures_derived_from(self, ids):
@@ -167,7 +209,10 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'previous_version': {'$in': ids}})]
+        return [
+            structure_from_mongo(self._expand_structure(structure))
+            for structure in self.structures.find({'previous_version': {'$in': ids}})
+        ]
 
     @autoretry_read()
     def find_ancestor_structures(self, original_version, block_key):
@@ -178,22 +223,150 @@ class MongoConnection(object):
             original_version (str or ObjectID): The id of a structure
             block_key (BlockKey): The id of the block in question
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({
+        block_match = {
+            'block_id': block_key.id,
+            'block_type': block_key.type,
+        }
+        matches = list(self.structures.find({
             'original_version': original_version,
-            'blocks': {
-                '$elemMatch': {
-                    'block_id': block_key.id,
-                    'block_type': block_key.type,
-                    'edit_info.update_version': {'$exists': True},
-                }
-            }
-        })]
+            'blocks': {'$elemMatch': dict(block_match, **{'edit_info.update_version': {'$exists': True}})}
+        }))
+        # deltas only hold the blocks which changed; so, also find the ones which inherit the block from a
+        # matching snapshot
+        snapshot_ids = [structure['_id'] for structure in matches if 'delta_base' not in structure]
+        if snapshot_ids:
+            matches.extend(self.structures.find({
+                'delta_base': {'$in': snapshot_ids},
+                '_id': {'$nin': [structure['_id'] for structure in matches]},
+                'blocks_removed': {'$not': {'$elemMatch': block_match}},
+            }))
+        return [structure_from_mongo(self._expand_structure(structure)) for structure in matches]
 
     def insert_structure(self, structure):
         """
         Insert a new structure into the database.
         """
-        self.structures.insert(structure_to_mongo(structure))
+        mongo_structure = structure_to_mongo(structure)
+        if self.structure_snapshot_interval and structure.get('previous_version') is not None:
+            mongo_structure = self._make_delta(mongo_structure)
+        self.structures.insert(mongo_structure)
+
+    def _make_delta(self, mongo_structure):
+        """
+        Return the delta encoding of mongo_structure against the snapshot its previous version is based on
+        or mongo_structure itself if it should be stored as a full snapshot.
+        """
+        previous = self.structures.find_one(
+            {'_id': mongo_structure['previous_version']}, fields=['delta_base', 'delta_depth']
+        )
+        if previous is None:
+            return mongo_structure
+        depth = previous.get('delta_depth', 0) + 1
+        if depth >= self.structure_snapshot_interval:
+            return mongo_structure
+        snapshot = self._get_snapshot(previous.get('delta_base', previous['_id']))
+        if snapshot is None:
+            return mongo_structure
+
+        snapshot_blocks = {
+            _mongo_block_key(block): _normalize_for_compare(block) for block in snapshot['blocks']
+        }
+        changed = [
+            block for block in mongo_structure['blocks']
+            if snapshot_blocks.get(_mongo_block_key(block)) != _normalize_for_compare(block)
+        ]
+        if len(changed) * 2 > len(mongo_structure['blocks']):
+            return mongo_structure
+        current_keys = set(_mongo_block_key(block) for block in mongo_structure['blocks'])
+        delta = dict(mongo_structure)
+        delta['blocks'] = changed
+        delta['blocks_removed'] = [
+            {'block_type': block_type, 'block_id': block_id}
+            for block_type, block_id in snapshot_blocks
+            if (block_type, block_id) not in current_keys
+        ]
+        delta['delta_base'] = snapshot['_id']
+        delta['delta_depth'] = depth
+        return delta
+
+    def _expand_structure(self, raw_structure):
+        """
+        If raw_structure is a delta, rebuild the full structure from it and its snapshot.
+        """
+        if raw_structure is None or 'delta_base' not in raw_structure:
+            return raw_structure
+        snapshot = self._get_snapshot(raw_structure['delta_base'])
+        if snapshot is None:
+            raise ReferentialIntegrityError(
+                u"Structure {} is stored as a delta of structure {}, which is missing".format(
+                    raw_structure['_id'], raw_structure['delta_base']
+                )
+            )
+        # structure_from_mongo modifies the blocks; so, don't let it modify the cached snapshot
+        blocks = OrderedDict(
+            (_mongo_block_key(block), block) for block in copy.deepcopy(snapshot['blocks'])
+        )
+        for removed in raw_structure['blocks_removed']:
+            blocks.pop(_mongo_block_key(removed), None)
+        for block in raw_structure['blocks']:
+            blocks[_mongo_block_key(block)] = block
+        structure = {key: value for key, value in raw_structure.iteritems() if key not in self.DELTA_FIELDS}
+        structure['blocks'] = blocks.values()
+        return structure
+
+    def _get_snapshot(self, snapshot_id):
+        """
+        Get the raw (mongo format) full structure snapshot_id, caching the most recently used ones.
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot_cache.pop(snapshot_id, None)
+            if snapshot is not None:
+                self._snapshot_cache[snapshot_id] = snapshot
+                return snapshot
+        # don't hold the lock while reading from mongo
+        snapshot = self.structures.find_one({'_id': snapshot_id})
+        if snapshot is None:
+            return None
+        with self._snapshot_lock:
+            self._snapshot_cache[snapshot_id] = snapshot
+            while len(self._snapshot_cache) > self.SNAPSHOT_CACHE_SIZE:
+                self._snapshot_cache.popitem(last=False)
+        return snapshot
+
+    @autoretry_read()
+    def find_structures_version_info(self):
+        """
+        Return the ``_id``, ``previous_version``, ``original_version``, ``edited_on``, and (for deltas)
+        ``delta_base`` of every structure without fetching their blocks.
+        """
+        return list(self.structures.find(
+            {}, fields=['previous_version', 'original_version', 'edited_on', 'delta_base']
+        ))
+
+    @autoretry_read()
+    def find_definition_ids_in_structures(self, ids):
+        """
+        Return the set of definition ids which the blocks of the structures in ``ids`` use.
+
+        Arguments:
+            ids (list): A list of structure ids
+        """
+        definition_ids = set()
+        for structure in self.structures.find({'_id': {'$in': ids}}, fields=['blocks.definition']):
+            definition_ids.update(block['definition'] for block in structure['blocks'])
+        return definition_ids
+
+    def structures_size(self, ids):
+        """
+        Return the total bson size in bytes of the structures in ``ids``.
+        """
+        return sum(len(BSON.encode(structure)) for structure in self.structures.find({'_id': {'$in': ids}}))
+
+    def delete_structures(self, ids):
+        """
+        Remove the structures in ``ids``. Only for use by history pruning: the store is otherwise append only.
+        """
+        self.structures.remove({'_id': {'$in': ids}})
 
     @autoretry_read()
     def get_course_index(self, key, ignore_case=False):
@@ -283,7 +456,7 @@ class MongoConnection(object):
         """
         Retrieve all definitions listed in `definitions`.
         """
-        return self.definitions.find({'$in': {'_id': definitions}})
+        return self.definitions.find({'_id': {'$in': definitions}})
 
     def insert_definition(self, definition):
         """
@@ -291,6 +464,32 @@ class MongoConnection(object):
         """
         self.definitions.insert(definition)
 
+    @autoretry_read()
+    def find_definitions_version_info(self):
+        """
+        Return the ``_id`` and ``edit_info.edited_on`` of every definition without fetching their fields.
+        """
+        return list(self.definitions.find({}, fields=['edit_info.edited_on']))
+
+    def definitions_size(self, ids):
+        """
+        Return the total bson size in bytes of the definitions in ``ids``.
+        """
+        return sum(len(BSON.encode(definition)) for definition in self.definitions.find({'_id': {'$in': ids}}))
+
+    def delete_definitions(self, ids):
+        """
+        Remove the definitions in ``ids``. Only for use by history pruning: the store is otherwise append only.
+        """
+        self.definitions.remove({'_id': {'$in': ids}})
+
+    def insert_definitions(self, definitions):
+        """
+        Create all of the given definitions in the db in one round trip. Inserts all of the definitions
+        which don't already exist before raising DuplicateKeyError for any which did.
+        """
+        self.definitions.insert(definitions, continue_on_error=True)
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
@@ -307,3 +506,4 @@ class MongoConnection(object):
             ],
             unique=True
         )
+        self.structures.create_index('delta_base', sparse=True)
@@ -70,14 +70,16 @@ from opaque_keys.edx.locator import (
 from xmodule.modulestore.exceptions import InsufficientSpecificationError, VersionConflictError, DuplicateItemError, \
     DuplicateCourseError
 from xmodule.modulestore import (
-    inheritance, ModuleStoreWriteBase, ModuleStoreEnum, BulkOpsRecord, BulkOperationsMixin
+    inheritance, ModuleStoreWriteBase, ModuleStoreEnum, BulkOpsRecord, BulkOperationsMixin, course_in_orgs_or_keys
 )
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from pymongo.errors import DuplicateKeyError
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.error_module import ErrorDescriptor
+from xmodule.course_module import CourseSummary
 from collections import defaultdict
 from types import NoneType
 from xmodule.assetstore import AssetMetadata
@@ -238,14 +240,18 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate structure %s", _id)
 
-        for _id in bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db:
+        # Definitions are written in a single batch as a save of a large subtree may have touched many
+        new_definition_ids = bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db
+        if new_definition_ids:
             try:
-                self.db_connection.insert_definition(bulk_write_record.definitions[_id])
+                self.db_connection.insert_definitions(
+                    [bulk_write_record.definitions[_id] for _id in new_definition_ids]
+                )
             except DuplicateKeyError:
-                # We may not have looked up this definition inside this bulk operation, and thus
-                # didn't realize that it was already in the database. That's OK, the store is
-                # append only, so if it's already been written, we can just keep going.
-                log.debug("Attempted to insert duplicate definition %s", _id)
+                # We may not have looked up some of these definitions inside this bulk operation, and thus
+                # didn't realize that they were already in the database. That's OK, the store is
+                # append only, and the batch continues past duplicates, so we can just keep going.
+                log.debug("Attempted to insert duplicate definitions among %s", new_definition_ids)
 
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             if bulk_write_record.initial_index is None:
@@ -574,14 +580,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None,
-                 services=None, **kwargs):
+                 services=None, structure_snapshot_interval=None, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_snapshot_interval: if set, store structures as deltas against a full snapshot
+            written every this many versions (see MongoConnection)
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        self.db_connection = MongoConnection(
+            structure_snapshot_interval=structure_snapshot_interval, **doc_store_config
+        )
         self.db = self.db_connection.database
 
         # Code review question: How should I expire entries?
@@ -775,6 +785,35 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # add it in the envelope for the structure.
         return CourseEnvelope(course_key.replace(version_guid=version_guid), entry)
 
+    def get_course_summaries(self, branch, orgs=None, course_keys=None, **kwargs):
+        '''
+        Returns CourseSummary's of the courses on branch (see ModuleStoreRead.get_course_summaries) from
+        their course indexes and their structures' root blocks without loading any xblocks. Only the
+        structures of the matching courses are read.
+        '''
+        # courses may share a structure (e.g., a course created from another's versions)
+        id_version_map = defaultdict(list)
+        for course_index in self.find_matching_course_indexes(branch):
+            course_key = CourseLocator(course_index['org'], course_index['course'], course_index['run'])
+            if not course_in_orgs_or_keys(course_key, orgs, course_keys):
+                continue
+            id_version_map[course_index['versions'][branch]].append(course_key)
+
+        if not id_version_map:
+            return []
+
+        summaries = []
+        for structure in self.find_structures_by_id(id_version_map.keys()):
+            fields = structure['blocks'][structure['root']].get('fields', {})
+            for course_key in id_version_map[structure['_id']]:
+                summaries.append(CourseSummary(
+                    course_key.make_usage_key(structure['root'].type, structure['root'].id),
+                    fields.get('display_name'),
+                    fields.get('display_organization'),
+                    fields.get('display_coursenumber'),
+                ))
+        return summaries
+
     def get_courses(self, branch, **kwargs):
         '''
         Returns a list of course descriptors matching any given qualifiers.
@@ -1420,8 +1459,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         See :meth: `.ModuleStoreWrite.clone_course` for documentation.
 
-        In split, other than copying the assets, this is cheap as it merely creates a new version of the
-        existing course.
+        In split, this is cheap: the new course's index points at the source's structures and thus shares
+        their blocks and definitions until one of them is edited (copy-on-write), and the contentstore
+        shares the assets' data rather than copying it.
         """
         source_index = self.get_course_index_info(source_course_id)
         if source_index is None:
@@ -1563,12 +1603,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             versions_dict[master_branch] = new_id
         else:  # Pointing to an existing course structure
             new_id = versions_dict[master_branch]
-            draft_version = CourseLocator(version_guid=new_id)
-            draft_structure = self._lookup_course(draft_version).structure
+            draft_structure = None
 
         locator = locator.replace(version_guid=new_id)
         with self.bulk_operations(locator):
-            self.update_structure(locator, draft_structure)
+            if draft_structure is None:
+                # the new index shares the existing structure (and thus its definitions) until the first edit.
+                # Fetching it within the bulk operation marks it as already persisted so it won't be rewritten.
+                if self.get_structure(locator, new_id) is None:
+                    raise ItemNotFoundError('Structure: {}'.format(new_id))
+            else:
+                self.update_structure(locator, draft_structure)
             index_entry = {
                 '_id': ObjectId(),
                 'org': org,
@@ -77,6 +77,21 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         else:
             raise InsufficientSpecificationError()
 
+    def get_course_summaries(self, orgs=None, course_keys=None, **kwargs):
+        """
+        Returns the summaries of the courses on the Draft or Published branch depending on the branch setting.
+        """
+        branch_setting = self.get_branch_setting()
+        if branch_setting == ModuleStoreEnum.Branch.draft_preferred:
+            branch = ModuleStoreEnum.BranchName.draft
+        elif branch_setting == ModuleStoreEnum.Branch.published_only:
+            branch = ModuleStoreEnum.BranchName.published
+        else:
+            raise InsufficientSpecificationError()
+        return super(DraftVersioningModuleStore, self).get_course_summaries(
+            branch, orgs=orgs, course_keys=course_keys, **kwargs
+        )
+
     def _auto_publish_no_children(self, location, category, user_id, **kwargs):
         """
         Publishes item if the category is DIRECT_ONLY. This assumes another method has checked that
@@ -166,6 +166,87 @@ class TestContentstore(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(course_assets, [])
 
+    @ddt.data(
+        *[(deprecated, sort_field, ascending) for deprecated in (True, False)
+          for sort_field in ('uploadDate', 'displayname') for ascending in (True, False)]
+    )
+    @ddt.unpack
+    def test_get_content_page(self, deprecated, sort_field, ascending):
+        """
+        Test paging through get_content_page_for_course by position and by start
+        """
+        self.set_up_assets(deprecated)
+        expected = sorted(self.course1_files, reverse=not ascending)
+        by_position = []
+        after = None
+        for __ in range(len(self.course1_files)):
+            page, after = self.contentstore.get_content_page_for_course(
+                self.course1_key, sort_field=sort_field, ascending=ascending, page_size=1, after=after
+            )
+            by_position.extend(page)
+            self.assertIsNotNone(after)
+        page, after = self.contentstore.get_content_page_for_course(
+            self.course1_key, sort_field=sort_field, ascending=ascending, page_size=1, after=after
+        )
+        self.assertEqual(page, [])
+        self.assertIsNone(after)
+
+        by_start, __ = self.contentstore.get_content_page_for_course(
+            self.course1_key, sort_field=sort_field, ascending=ascending, page_size=2, start=1
+        )
+        if sort_field == 'displayname':
+            self.assertEqual([asset['displayname'] for asset in by_position], expected)
+        self.assertEqual(
+            [asset['asset_key'] for asset in by_start], [asset['asset_key'] for asset in by_position[1:]]
+        )
+
+    @ddt.data(True, False)
+    def test_get_content_prefix(self, deprecated):
+        """
+        Test filtering get_content_page_for_course and get_content_count_for_course by display name prefix
+        """
+        self.set_up_assets(deprecated)
+        self.assertEqual(self.contentstore.get_content_count_for_course(self.course1_key), 3)
+        self.assertEqual(self.contentstore.get_content_count_for_course(self.course1_key, prefix='picture'), 2)
+        self.assertEqual(self.contentstore.get_content_count_for_course(self.course1_key, prefix='pic.'), 0)
+        page, __ = self.contentstore.get_content_page_for_course(
+            self.course1_key, sort_field='displayname', ascending=True, prefix='picture'
+        )
+        self.assertEqual([asset['displayname'] for asset in page], ['picture1.jpg', 'picture2.jpg'])
+
+    @ddt.data(True, False)
+    def test_process_asset(self, deprecated):
+        """
+        Test that process_asset generates thumbnails and image metadata once per content
+        """
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', 'picture1.jpg')
+        md5 = self.contentstore.get_attr(asset_key, 'md5')
+        self.assertFalse(self.contentstore.process_asset(asset_key, 'changed since'))
+        self.assertTrue(self.contentstore.process_asset(asset_key, md5))
+        attrs = self.contentstore.get_attrs(asset_key)
+        self.assertEqual(attrs['processed_md5'], md5)
+        self.assertFalse(attrs['processing'])
+        self.assertEqual(len(attrs['image_size']), 2)
+        self.assertEqual(attrs['thumbnail_location'][4], StaticContent.generate_thumbnail_name('picture1.jpg'))
+        self.assertIsNotNone(self.contentstore.find(
+            self.course1_key.make_asset_key('thumbnail', attrs['thumbnail_location'][4])
+        ))
+        # it's already processed
+        self.assertFalse(self.contentstore.process_asset(asset_key, md5))
+
+        # images saved without a specific type get their type
+        sniffed_key = self.course1_key.make_asset_key('asset', 'sniffed')
+        content = self.contentstore.find(asset_key)
+        self.contentstore.save(StaticContent(sniffed_key, 'sniffed', 'application/octet-stream', content.data))
+        self.assertTrue(self.contentstore.process_asset(sniffed_key))
+        self.assertEqual(self.contentstore.get_attr(sniffed_key, 'contentType'), 'image/jpeg')
+
+        # other content is only marked processed
+        other_key = self.course1_key.make_asset_key('asset', 'contains.sh')
+        self.assertTrue(self.contentstore.process_asset(other_key))
+        self.assertNotIn('thumbnail_location', self.contentstore.get_attrs(other_key))
+
     @ddt.data(True, False)
     def test_attrs(self, deprecated):
         """
@@ -197,6 +278,59 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_shares_data(self, deprecated):
+        """
+        copy_all_course_assets doesn't duplicate chunks and copies survive deleting the source
+        """
+        self.set_up_assets(deprecated)
+        chunk_count = self.contentstore.fs_chunks.count()
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.fs_chunks.count(), chunk_count)
+
+        filename = self.course1_files[0]
+        source_key = self.course1_key.make_asset_key('asset', filename)
+        dest_key = dest_course.make_asset_key('asset', filename)
+        source_data = self.contentstore.find(source_key).data
+        self.contentstore.delete(source_key)
+        with self.assertRaises(NotFoundError):
+            self.contentstore.find(source_key)
+        self.assertEqual(self.contentstore.find(dest_key).data, source_data)
+
+        # the chunks go away with the last reference to them
+        self.contentstore.delete(dest_key)
+        with self.assertRaises(NotFoundError):
+            self.contentstore.find(dest_key)
+        self.assertEqual(self.contentstore.fs_files.find({'detached': True}).count(), 0)
+
+        # overwriting a copy doesn't change the source
+        filename = self.course1_files[1]
+        source_key = self.course1_key.make_asset_key('asset', filename)
+        dest_key = dest_course.make_asset_key('asset', filename)
+        self.save_asset(self.course1_files[2], dest_key, filename, False)
+        self.assertNotEqual(self.contentstore.find(source_key).data, self.contentstore.find(dest_key).data)
+
+    @ddt.data(True, False)
+    def test_remove_redundant_shared_assets(self, deprecated):
+        """
+        remove_redundant_content_for_courses releases copies' references rather than deleting shared chunks
+        """
+        self.set_up_assets(deprecated)
+        chunk_count = self.contentstore.fs_chunks.count()
+        redundant_key = self.course1_key.make_asset_key('asset', '._' + self.course1_files[1])
+        self.save_asset(self.course1_files[1], redundant_key, '._' + self.course1_files[1], False)
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+
+        self.assertEqual(self.contentstore.remove_redundant_content_for_courses(), 2)
+        self.assertEqual(self.contentstore.fs_chunks.count(), chunk_count)
+        self.assertEqual(self.contentstore.fs_files.find({'detached': True}).count(), 0)
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename))
+            self.assertEqual(source.data, copied.data)
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
@@ -69,6 +69,15 @@ class MemoryCache(object):
         """
         self._data[key] = value
 
+    def delete(self, key):
+        """
+        Delete a key from the cache.
+
+        Args:
+            key: The key to delete.
+        """
+        self._data.pop(key, None)
+
 
 class MongoModulestoreBuilder(object):
     """
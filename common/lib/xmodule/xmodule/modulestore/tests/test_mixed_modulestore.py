@@ -266,7 +266,7 @@ class TestMixedModuleStore(CourseComparisonTest):
             for course_id, course_key in self.course_locations.iteritems()  # pylint: disable=maybe-no-member
         }
 
-        mongo_course_key = self.course_locations[self.MONGO_COURSEID].course_key
+        mongo_course_key = self.course_locations[self.MONGO_COURSEID].course_key.for_branch(None)
         self.fake_location = self.store.make_course_key(mongo_course_key.org, mongo_course_key.course, mongo_course_key.run).make_usage_key('vertical', 'fake')
 
         self.xml_chapter_location = self.course_locations[self.XML_COURSEID1].replace(
@@ -833,6 +833,24 @@ class TestMixedModuleStore(CourseComparisonTest):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    @ddt.data('draft', 'split')
+    def test_get_course_summaries(self, default_ms):
+        self.initdb(default_ms)
+        courses = self.store.get_courses()
+        summaries = self.store.get_course_summaries()
+        self.assertItemsEqual([summary.id for summary in summaries], [course.id for course in courses])
+        for summary in summaries:
+            course = self.store.get_course(summary.id)
+            self.assertEqual(summary.display_name, course.display_name)
+            self.assertEqual(summary.display_org_with_default, course.display_org_with_default)
+            self.assertEqual(summary.display_number_with_default, course.display_number_with_default)
+
+        mongo_course_key = self.course_locations[self.MONGO_COURSEID].course_key.for_branch(None)
+        summaries = self.store.get_course_summaries(orgs=set(), course_keys={mongo_course_key})
+        self.assertEqual([summary.id for summary in summaries], [mongo_course_key])
+        summaries = self.store.get_course_summaries(orgs={mongo_course_key.org}, course_keys=set())
+        self.assertIn(mongo_course_key, [summary.id for summary in summaries])
+
     def test_xml_get_courses(self):
         """
         Test that the xml modulestore only loaded the courses from the maps.
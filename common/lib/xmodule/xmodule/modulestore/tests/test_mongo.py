@@ -13,6 +13,7 @@ from uuid import uuid4
 from datetime import datetime
 from pytz import UTC
 import unittest
+from mock import Mock, patch
 from xblock.core import XBlock
 
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
@@ -584,6 +585,35 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
 
         return locations
 
+    def test_cached_parent_locations(self):
+        """
+        Test that parent lookups come from the cached child to parent map and agree with querying for them
+        """
+        course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        locations = [item.location for item in self.draft_store.get_items(course_key)]
+        revisions = (ModuleStoreEnum.RevisionOption.published_only, ModuleStoreEnum.RevisionOption.draft_preferred)
+        expected = {
+            (location, revision): self.draft_store.get_parent_location(location, revision)
+            for location in locations for revision in revisions
+        }
+
+        self.draft_store.request_cache = Mock(data={})
+        try:
+            with patch.object(self.draft_store, 'collection', Mock(wraps=self.draft_store.collection)) as collection:
+                for (location, revision), parent in expected.iteritems():
+                    self.assertEqual(self.draft_store.get_parent_location(location, revision), parent)
+                # only the query which computed the map
+                self.assertEqual(collection.find.call_count, 1)
+
+                # writes to children drop the map
+                course = self.draft_store.get_course(course_key)
+                self.draft_store._update_single_item(
+                    course.location, {'definition.children': [unicode(child) for child in course.children]}
+                )
+                self.assertNotIn(unicode(course_key), self.draft_store.request_cache.data['parent_locations'])
+        finally:
+            self.draft_store.request_cache = None
+
     def test_migrate_published_info(self):
         """
         Tests that blocks that were storing published_date and published_by through CMSBlockMixin are loaded correctly
@@ -0,0 +1,94 @@
+"""
+Tests for pruning split modulestore history
+"""
+import datetime
+import unittest
+
+from bson.objectid import ObjectId
+from mock import MagicMock
+from pytz import UTC
+
+from xmodule.modulestore.split_mongo.history_pruner import SplitHistoryPruner
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+
+
+class TestSplitHistoryPruner(unittest.TestCase):
+    """
+    Test which structures and definitions the pruner considers unreachable
+    """
+    def setUp(self):
+        super(TestSplitHistoryPruner, self).setUp()
+        self.conn = MagicMock(name='db_connection', spec=MongoConnection)
+        self.old = datetime.datetime.now(UTC) - datetime.timedelta(days=100)
+        # a chain of 5 versions of one course: v0 <- v1 <- v2 <- v3 <- v4 (head)
+        self.versions = [ObjectId() for __ in range(5)]
+        self.structures = []
+        for index, version_guid in enumerate(self.versions):
+            self.structures.append({
+                '_id': version_guid,
+                'previous_version': self.versions[index - 1] if index else None,
+                'original_version': self.versions[0],
+                'edited_on': self.old,
+            })
+        self.conn.find_matching_course_indexes.return_value = [
+            {'versions': {'draft-branch': self.versions[4], 'published-branch': self.versions[2]}}
+        ]
+        self.conn.find_structures_version_info.return_value = self.structures
+        self.used_definition = ObjectId()
+        self.unused_definition = ObjectId()
+        self.conn.find_definition_ids_in_structures.return_value = set([self.used_definition])
+        self.conn.find_definitions_version_info.return_value = [
+            {'_id': self.used_definition, 'edit_info': {'edited_on': self.old}},
+            {'_id': self.unused_definition, 'edit_info': {'edited_on': self.old}},
+        ]
+
+    def test_retains_heads_and_predecessors(self):
+        pruner = SplitHistoryPruner(self.conn, retain_versions=1, retain_days=30)
+        structures, total, definitions, definitions_total = pruner.find_unreachable()
+        # v4, v3 from draft; v2, v1 from published; v0 as the original version
+        self.assertEqual(structures, [])
+        self.assertEqual(total, 5)
+        self.assertEqual(definitions, [self.unused_definition])
+        self.assertEqual(definitions_total, 2)
+
+    def test_prunes_beyond_window(self):
+        # the original version isn't retained once it's not referenced
+        for structure in self.structures:
+            structure['original_version'] = None
+        pruner = SplitHistoryPruner(self.conn, retain_versions=0, retain_days=30)
+        structures, __, __, __ = pruner.find_unreachable()
+        self.assertItemsEqual(structures, [self.versions[0], self.versions[1], self.versions[3]])
+
+    def test_retains_recent(self):
+        for structure in self.structures:
+            structure['original_version'] = None
+        self.structures[1]['edited_on'] = datetime.datetime.now(UTC)
+        pruner = SplitHistoryPruner(self.conn, retain_versions=0, retain_days=30)
+        structures, __, __, __ = pruner.find_unreachable()
+        self.assertItemsEqual(structures, [self.versions[0], self.versions[3]])
+
+    def test_retains_delta_base(self):
+        for structure in self.structures:
+            structure['original_version'] = None
+        # the head, v4, is a delta against v0 which would otherwise be pruned
+        self.structures[4]['delta_base'] = self.versions[0]
+        pruner = SplitHistoryPruner(self.conn, retain_versions=0, retain_days=30)
+        structures, __, __, __ = pruner.find_unreachable()
+        self.assertItemsEqual(structures, [self.versions[1], self.versions[3]])
+
+    def test_prune(self):
+        pruner = SplitHistoryPruner(self.conn, retain_versions=0, retain_days=30)
+        unreachable = ([self.versions[0]], 5, [self.unused_definition], 2)
+        pruner.prune(unreachable)
+        self.conn.delete_structures.assert_called_once_with([self.versions[0]])
+        self.conn.delete_definitions.assert_called_once_with([self.unused_definition])
+
+    def test_stats(self):
+        self.conn.structures_size.return_value = 100
+        self.conn.definitions_size.return_value = 10
+        pruner = SplitHistoryPruner(self.conn)
+        stats = pruner.stats(([self.versions[0]], 5, [self.unused_definition], 2))
+        self.assertEqual(stats.structures_reclaimable, 1)
+        self.assertEqual(stats.structure_bytes, 100)
+        self.assertEqual(stats.definitions_reclaimable, 1)
+        self.assertEqual(stats.definition_bytes, 10)
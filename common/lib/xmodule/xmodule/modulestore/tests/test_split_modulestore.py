@@ -1417,6 +1417,19 @@ class TestCourseCreation(SplitModuleTest):
         self.assertEqual(len(new_course.grading_policy['GRADER']), 4)
         self.assertDictEqual(new_course.grade_cutoffs, {"Pass": 0.5})
 
+    def test_cloned_course_summaries(self):
+        """
+        Test that courses sharing a structure each get a summary
+        """
+        original_locator = CourseLocator(org='testx', course='wonderful', run="run", branch=BRANCH_NAME_DRAFT)
+        original_index = modulestore().get_course_index_info(original_locator)
+        modulestore().create_course(
+            'best', 'leech', 'leech_run', 'leech_master', BRANCH_NAME_DRAFT,
+            versions_dict=original_index['versions'])
+        summary_ids = [summary.id for summary in modulestore().get_course_summaries(BRANCH_NAME_DRAFT)]
+        self.assertIn(CourseLocator(org='testx', course='wonderful', run="run"), summary_ids)
+        self.assertIn(CourseLocator(org='best', course='leech', run="leech_run"), summary_ids)
+
     def test_cloned_course(self):
         """
         Test making a course which points to an existing draft and published but not making any changes to either.
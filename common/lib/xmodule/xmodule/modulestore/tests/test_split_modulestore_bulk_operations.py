@@ -154,7 +154,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
         self.assertConnCalls(
-            call.insert_definition(self.definition),
+            call.insert_definitions([self.definition]),
             call.update_course_index(
                 {'versions': {self.course_key.branch: self.definition['_id']}},
                 from_index=original_index
@@ -172,16 +172,14 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.insert_course_index(self.course_key, {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}})
         self.bulk._end_bulk_operation(self.course_key)
         self.assertItemsEqual(
-            [
-                call.insert_definition(self.definition),
-                call.insert_definition(other_definition),
-                call.update_course_index(
-                    {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
-                    from_index=original_index
-                )
-            ],
-            self.conn.mock_calls
+            [self.definition, other_definition],
+            self.conn.insert_definitions.call_args[0][0]
+        )
+        self.conn.update_course_index.assert_called_once_with(
+            {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
+            from_index=original_index
         )
+        self.assertFalse(self.conn.insert_definition.called)
 
     def test_write_definition_on_close(self):
         self.conn.get_course_index.return_value = None
@@ -190,7 +188,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.update_definition(self.course_key, self.definition)
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertConnCalls(call.insert_definition(self.definition))
+        self.assertConnCalls(call.insert_definitions([self.definition]))
 
     def test_write_multiple_definitions_on_close(self):
         self.conn.get_course_index.return_value = None
@@ -201,9 +199,11 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.update_definition(self.course_key.replace(branch='b'), other_definition)
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
+        # all of the definitions go to the db in one batch
+        self.assertEqual(len(self.conn.mock_calls), 1)
         self.assertItemsEqual(
-            [call.insert_definition(self.definition), call.insert_definition(other_definition)],
-            self.conn.mock_calls
+            [self.definition, other_definition],
+            self.conn.insert_definitions.call_args[0][0]
         )
 
     def test_write_index_and_structure_on_close(self):
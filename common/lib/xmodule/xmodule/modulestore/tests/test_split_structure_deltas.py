@@ -0,0 +1,146 @@
+"""
+Tests for delta encoded split structure storage
+"""
+import copy
+import threading
+import unittest
+from collections import OrderedDict
+
+from bson import BSON
+from bson.objectid import ObjectId
+
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.exceptions import ReferentialIntegrityError
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+
+
+class FakeStructures(object):
+    """
+    Just enough of a pymongo collection keyed by _id to store structures in
+    """
+    def __init__(self):
+        self.docs = {}
+
+    def insert(self, doc):
+        # round trip through bson as mongo would (e.g., tuples become lists)
+        self.docs[doc['_id']] = BSON.encode(doc).decode()
+
+    def find_one(self, query, fields=None):  # pylint: disable=unused-argument
+        doc = self.docs.get(query['_id'])
+        return copy.deepcopy(doc)
+
+    def find(self, query):
+        return [copy.deepcopy(self.docs[_id]) for _id in query['_id']['$in'] if _id in self.docs]
+
+
+class TestStructureDeltas(unittest.TestCase):
+    """
+    Test writing structures as deltas and reading them back
+    """
+    def setUp(self):
+        super(TestStructureDeltas, self).setUp()
+        self.conn = MongoConnection.__new__(MongoConnection)
+        self.conn.structures = FakeStructures()
+        self.conn.structure_snapshot_interval = 3
+        self.conn._snapshot_cache = OrderedDict()  # pylint: disable=protected-access
+        self.conn._snapshot_lock = threading.Lock()  # pylint: disable=protected-access
+        self.root = BlockKey('course', 'course')
+        self.blocks = {
+            self.root: self._block(children=[BlockKey('chapter', 'ch{}'.format(index)) for index in range(4)]),
+        }
+        for index in range(4):
+            self.blocks[BlockKey('chapter', 'ch{}'.format(index))] = self._block(display_name='Chapter')
+
+    @staticmethod
+    def _block(**fields):
+        """
+        A block in the in memory structure format
+        """
+        return {'block_type': None, 'definition': ObjectId(), 'fields': fields, 'edit_info': {}}
+
+    def _structure(self, previous):
+        """
+        Make the next version of the structure with copies of the current blocks
+        """
+        version = ObjectId()
+        blocks = {}
+        for block_key, block in self.blocks.iteritems():
+            block = copy.deepcopy(block)
+            block['block_type'] = block_key.type
+            blocks[block_key] = block
+        return {
+            '_id': version,
+            'root': self.root,
+            'previous_version': previous,
+            'original_version': previous or version,
+            'blocks': blocks,
+        }
+
+    def _write_history(self, count):
+        """
+        Write count versions each changing one chapter. Returns the list of structures written.
+        """
+        history = []
+        previous = None
+        for index in range(count):
+            self.blocks[BlockKey('chapter', 'ch{}'.format(index % 4))]['fields']['display_name'] = str(index)
+            structure = self._structure(previous)
+            self.conn.insert_structure(structure)
+            history.append(structure)
+            previous = structure['_id']
+        return history
+
+    def test_snapshot_interval(self):
+        history = self._write_history(5)
+        stored = [self.conn.structures.docs[structure['_id']] for structure in history]
+        self.assertNotIn('delta_base', stored[0])
+        self.assertEqual(stored[1]['delta_base'], history[0]['_id'])
+        self.assertEqual(stored[2]['delta_base'], history[0]['_id'])
+        self.assertEqual(stored[2]['delta_depth'], 2)
+        self.assertNotIn('delta_base', stored[3])
+        self.assertEqual(stored[4]['delta_base'], history[3]['_id'])
+        # only the changed chapter is stored
+        self.assertEqual(len(stored[1]['blocks']), 1)
+
+    def test_round_trip(self):
+        history = self._write_history(5)
+        for structure in history:
+            read = self.conn.get_structure(structure['_id'])
+            self.assertNotIn('delta_base', read)
+            self.assertEqual(read['blocks'], structure['blocks'])
+        read = self.conn.find_structures_by_id([structure['_id'] for structure in history])
+        self.assertEqual([structure['blocks'] for structure in read], [structure['blocks'] for structure in history])
+
+    def test_removed_block(self):
+        self._write_history(1)
+        first = self.conn.structures.docs.keys()[0]
+        removed = BlockKey('chapter', 'ch3')
+        del self.blocks[removed]
+        self.blocks[self.root]['fields']['children'].remove(removed)
+        structure = self._structure(first)
+        self.conn.insert_structure(structure)
+        stored = self.conn.structures.docs[structure['_id']]
+        self.assertEqual(stored['blocks_removed'], [{'block_type': 'chapter', 'block_id': 'ch3'}])
+        self.assertNotIn(removed, self.conn.get_structure(structure['_id'])['blocks'])
+
+    def test_missing_snapshot(self):
+        history = self._write_history(2)
+        del self.conn.structures.docs[history[0]['_id']]
+        self.conn._snapshot_cache.clear()  # pylint: disable=protected-access
+        with self.assertRaises(ReferentialIntegrityError):
+            self.conn.get_structure(history[1]['_id'])
+
+    def test_large_change_is_full(self):
+        self._write_history(1)
+        first = self.conn.structures.docs.keys()[0]
+        for block in self.blocks.itervalues():
+            block['fields']['display_name'] = 'changed'
+        structure = self._structure(first)
+        self.conn.insert_structure(structure)
+        self.assertNotIn('delta_base', self.conn.structures.docs[structure['_id']])
+
+    def test_disabled(self):
+        self.conn.structure_snapshot_interval = None
+        history = self._write_history(3)
+        for structure in history:
+            self.assertNotIn('delta_base', self.conn.structures.docs[structure['_id']])
@@ -9,7 +9,7 @@ from xmodule.x_module import XModuleMixin
 from opaque_keys.edx.locations import Location
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.inheritance import InheritanceMixin
-from xmodule.modulestore.xml_importer import _import_module_and_update_references
+from xmodule.modulestore.xml_importer import _import_module_and_update_references, IncrementalImportReport
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -229,3 +229,62 @@ class RemapNamespaceTest(ModuleStoreNoSettings):
         self.assertNotIn(
             'graded', new_version.get_explicitly_set_fields_by_scope(scope=Scope.settings)
         )
+
+
+class IncrementalImportTest(ModuleStoreNoSettings):
+    """
+    Test that an incremental import only rewrites blocks whose definition or settings changed.
+    """
+
+    def setUp(self):
+        """
+        Create a stub XBlock backed by in-memory storage.
+        """
+        self.runtime = mock.MagicMock(Runtime)
+        self.field_data = KvsFieldData(kvs=DictKeyValueStore())
+        self.scope_ids = ScopeIds('Bob', 'stubxblock', '123', 'import')
+        self.xblock = StubXBlock(self.runtime, self.field_data, self.scope_ids)
+        self.xblock.location = Location("org", "import", "run", "category", "stubxblock")
+        self.target_course_key = SlashSeparatedCourseKey("org", "course", "run")
+        super(IncrementalImportTest, self).setUp()
+
+    def _import(self, report):
+        """
+        Import self.xblock into the target course recording into report
+        """
+        return _import_module_and_update_references(
+            self.xblock,
+            modulestore(),
+            999,
+            self.xblock.location.course_key,
+            self.target_course_key,
+            do_import_static=False,
+            import_report=report,
+        )
+
+    def test_unchanged_block_not_rewritten(self):
+        self.xblock.test_content_field = "Explicitly set"
+        self.xblock.save()
+
+        report = IncrementalImportReport()
+        self._import(report)
+        self.assertEqual(report.added, [self.xblock.location])
+
+        report = IncrementalImportReport()
+        with mock.patch.object(modulestore(), 'import_xblock') as import_xblock:
+            new_version = self._import(report)
+        self.assertFalse(import_xblock.called)
+        self.assertEqual(report.unchanged, [self.xblock.location])
+        self.assertEqual(new_version.test_content_field, 'Explicitly set')
+
+    def test_changed_block_rewritten(self):
+        self.xblock.test_settings_field = "Explicitly set"
+        self.xblock.save()
+        self._import(IncrementalImportReport())
+
+        self.xblock.test_settings_field = "Changed"
+        self.xblock.save()
+        report = IncrementalImportReport()
+        new_version = self._import(report)
+        self.assertEqual(report.changed, [self.xblock.location])
+        self.assertEqual(new_version.test_settings_field, 'Changed')
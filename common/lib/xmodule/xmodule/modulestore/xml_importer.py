@@ -20,6 +20,7 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import hashlib
 import logging
 import os
 import mimetypes
@@ -29,6 +30,7 @@ import re
 
 from .xml import XMLModuleStore, ImportSystem, ParentTracker
 from xblock.runtime import KvsFieldData, DictKeyValueStore
+from xblock.core import XBlock
 from xmodule.x_module import XModuleDescriptor
 from opaque_keys.edx.keys import UsageKey
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
@@ -43,13 +45,59 @@ from xmodule.modulestore.exceptions import DuplicateCourseError
 from xmodule.modulestore.mongo.base import MongoRevisionKey
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.exceptions import NotFoundError
 
 log = logging.getLogger(__name__)
 
+# scopes whose values make up a block's persisted definition and settings
+FINGERPRINT_SCOPES = (Scope.content, Scope.settings, Scope.children)
+
+
+class IncrementalImportReport(object):
+    """
+    Records what an incremental (diff-aware) import actually wrote so that unchanged blocks and assets
+    can be skipped and stale ones removed.
+    """
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.unchanged = []
+        self.deleted = []
+        self.assets_written = []
+        self.assets_unchanged = []
+        self.assets_deleted = []
+        # (category, block_id) of every block seen in the xml, used to find deleted blocks
+        self.seen_blocks = set()
+        self.seen_assets = set()
+
+    def summary(self):
+        """
+        Returns a dict of counts suitable for logging
+        """
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'unchanged': len(self.unchanged),
+            'deleted': len(self.deleted),
+            'assets_written': len(self.assets_written),
+            'assets_unchanged': len(self.assets_unchanged),
+            'assets_deleted': len(self.assets_deleted),
+        }
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_course_id, subpath='static', verbose=False):
+        target_course_id, subpath='static', verbose=False, import_report=None, asset_processor=None):
+    """
+    Import all the files under course_data_path/subpath into static_content_store.
+
+    If import_report is given, assets whose content and attributes match what is already stored are
+    not rewritten (nor are their thumbnails regenerated).
+
+    If asset_processor is given, it's called with the key and md5 of each asset after it's saved to
+    generate its thumbnail (e.g., by queuing ContentStore.process_asset) rather than the import
+    generating it first.
+    """
 
     remap_dict = {}
 
@@ -112,15 +160,26 @@ def import_static_content(
                 import_path=fullname_with_subpath, locked=locked
             )
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+            if import_report is not None:
+                import_report.seen_assets.add(asset_key)
+                if _is_asset_unchanged(static_content_store, content):
+                    import_report.assets_unchanged.append(asset_key)
+                    remap_dict[fullname_with_subpath] = asset_key
+                    continue
+                import_report.assets_written.append(asset_key)
+
+            if asset_processor is None:
+                # first let's save a thumbnail so we can get back a thumbnail location
+                thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+                if thumbnail_content is not None:
+                    content.thumbnail_location = thumbnail_location
 
             # then commit the content
             try:
                 static_content_store.save(content)
+                if asset_processor is not None:
+                    asset_processor(asset_key, hashlib.md5(data).hexdigest())
             except Exception as err:
                 log.exception(u'Error importing {0}, error={1}'.format(
                     fullname_with_subpath, err
@@ -133,12 +192,48 @@ def import_static_content(
     return remap_dict
 
 
+def _is_asset_unchanged(static_content_store, content):
+    """
+    Returns True if static_content_store already holds content with the same bytes and attributes.
+    Stores which cannot report stored attributes are always treated as changed.
+    """
+    try:
+        stored = static_content_store.get_attrs(content.location)
+    except (NotFoundError, AttributeError, NotImplementedError):
+        return False
+    return (
+        stored.get('md5') == hashlib.md5(content.data).hexdigest() and
+        stored.get('displayname') == content.name and
+        stored.get('contentType') == content.content_type and
+        stored.get('import_path') == content.import_path and
+        stored.get('locked', False) == content.locked
+    )
+
+
+def _delete_stale_assets(static_content_store, dest_course_id, import_report):
+    """
+    Delete the assets which a previous import created (they have an import_path) but which are no
+    longer in the course's static directories. Assets uploaded through Studio are left alone.
+    """
+    assets, __ = static_content_store.get_all_content_for_course(dest_course_id)
+    for asset in assets:
+        asset_key = asset['asset_key'].for_branch(None)
+        if asset.get('import_path') is None or asset_key in import_report.seen_assets:
+            continue
+        thumbnail_location = asset.get('thumbnail_location')
+        if thumbnail_location:
+            static_content_store.delete(dest_course_id.make_asset_key('thumbnail', thumbnail_location[4]))
+        static_content_store.delete(asset_key)
+        import_report.assets_deleted.append(asset_key)
+
+
 def import_from_xml(
         store, user_id, data_dir, course_dirs=None,
         default_class='xmodule.raw_module.RawDescriptor',
         load_error_modules=True, static_content_store=None,
         target_course_id=None, verbose=False,
-        do_import_static=True, create_new_course_if_not_present=False):
+        do_import_static=True, create_new_course_if_not_present=False,
+        incremental=False, asset_processor=None):
     """
     Import xml-based courses from data_dir into modulestore.
 
@@ -170,6 +265,15 @@ def import_from_xml(
             Otherwise, it throws an InvalidLocationError if the course does not exist.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        incremental: If True, compare each block's definition and settings (and each asset's md5 and
+            attributes) against what the modulestore already holds and only write the ones which were
+            added or changed. Blocks and previously imported assets which are no longer in the xml are
+            deleted. Intended for re-importing a course which is authored outside of Studio.
+
+        asset_processor: if given, a function of an asset's key and md5 which is called after saving
+            each imported asset to generate its thumbnail instead of the import generating it (see
+            import_static_content)
     """
 
     xml_module_store = XMLModuleStore(
@@ -207,6 +311,8 @@ def import_from_xml(
                 )
                 continue
 
+        import_report = IncrementalImportReport() if incremental else None
+
         with store.bulk_operations(dest_course_id):
             source_course = xml_module_store.get_course(course_key)
             # STEP 1: find and import course module
@@ -219,7 +325,8 @@ def import_from_xml(
 
             # STEP 2: import static content
             _import_static_content_wrapper(
-                static_content_store, do_import_static, course_data_path, dest_course_id, verbose
+                static_content_store, do_import_static, course_data_path, dest_course_id, verbose,
+                import_report=import_report, asset_processor=asset_processor,
             )
 
             # STEP 3: import PUBLISHED items
@@ -250,7 +357,8 @@ def import_from_xml(
                                 course_key,
                                 dest_course_id,
                                 do_import_static=do_import_static,
-                                runtime=course.runtime
+                                runtime=course.runtime,
+                                import_report=import_report,
                             )
                             depth_first(child)
 
@@ -266,7 +374,8 @@ def import_from_xml(
                         course_key,
                         dest_course_id,
                         do_import_static=do_import_static,
-                        runtime=course.runtime
+                        runtime=course.runtime,
+                        import_report=import_report,
                     )
 
             # STEP 4: import any DRAFT items
@@ -278,12 +387,41 @@ def import_from_xml(
                     course_data_path,
                     course_key,
                     dest_course_id,
-                    course.runtime
+                    course.runtime,
+                    import_report=import_report,
                 )
 
+            # STEP 5: remove whatever the xml no longer contains
+            if import_report is not None:
+                with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, dest_course_id):
+                    _delete_stale_blocks(store, user_id, dest_course_id, import_report)
+                log.info(u'Incremental import of %s: %s', dest_course_id, import_report.summary())
+
     return new_courses
 
 
+def _delete_stale_blocks(store, user_id, dest_course_id, import_report):
+    """
+    Delete the blocks in dest_course_id which were not part of this import. Detached blocks (e.g.,
+    about, static tab, and course info pages) are left alone as Studio creates them outside of the xml.
+    """
+    detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
+    for item in store.get_items(dest_course_id):
+        block = (item.location.category, item.location.block_id)
+        if item.location.category == 'course' or item.location.category in detached_categories:
+            continue
+        if block in import_report.seen_blocks:
+            continue
+        try:
+            store.delete_item(
+                dest_course_id.make_usage_key(*block), user_id, revision=ModuleStoreEnum.RevisionOption.all
+            )
+        except ItemNotFoundError:
+            # already removed along with a deleted ancestor
+            continue
+        import_report.deleted.append(block)
+
+
 def _import_course_module(
         store, runtime, user_id, data_dir, course_key, dest_course_id, source_course, do_import_static,
         verbose,
@@ -357,13 +495,17 @@ def _import_course_module(
     return course, course_data_path
 
 
-def _import_static_content_wrapper(static_content_store, do_import_static, course_data_path, dest_course_id, verbose):
+def _import_static_content_wrapper(
+        static_content_store, do_import_static, course_data_path, dest_course_id, verbose, import_report=None,
+        asset_processor=None,
+):
     # then import all the static content
     if static_content_store is not None and do_import_static:
         # first pass to find everything in /static/
         import_static_content(
             course_data_path, static_content_store,
-            dest_course_id, subpath='static', verbose=verbose
+            dest_course_id, subpath='static', verbose=verbose, import_report=import_report,
+            asset_processor=asset_processor
         )
 
     elif verbose and not do_import_static:
@@ -386,13 +528,25 @@ def _import_static_content_wrapper(static_content_store, do_import_static, cours
     if os.path.exists(course_data_path / simport):
         import_static_content(
             course_data_path, static_content_store,
-            dest_course_id, subpath=simport, verbose=verbose
+            dest_course_id, subpath=simport, verbose=verbose, import_report=import_report,
+            asset_processor=asset_processor
         )
 
+    if import_report is not None and static_content_store is not None and do_import_static:
+        _delete_stale_assets(static_content_store, dest_course_id, import_report)
+
+
 def _import_module_and_update_references(
         module, store, user_id,
         source_course_id, dest_course_id,
-        do_import_static=True, runtime=None):
+        do_import_static=True, runtime=None, import_report=None):
+    """
+    Convert module into dest_course_id's namespace and write it to store.
+
+    If import_report is given, the module is only written if its definition or settings differ
+    from the version currently in store (as seen through the current branch setting); otherwise
+    the stored version is returned as is.
+    """
 
     logging.debug(u'processing import of module {}...'.format(module.location.to_deprecated_string()))
 
@@ -447,9 +601,51 @@ def _import_module_and_update_references(
             else:
                 fields[field_name] = field.read_from(module)
 
+    if import_report is not None:
+        block = (module.location.category, module.location.block_id)
+        import_report.seen_blocks.add(block)
+        try:
+            stored = store.get_item(dest_course_id.make_usage_key(*block))
+        except ItemNotFoundError:
+            import_report.added.append(module.location)
+        else:
+            if _block_fingerprint(module.fields, fields) == _block_fingerprint(stored.fields, _set_fields(stored)):
+                import_report.unchanged.append(module.location)
+                return stored
+            import_report.changed.append(module.location)
+
     return store.import_xblock(user_id, dest_course_id, module.location.category, module.location.block_id, fields, runtime)
 
 
+def _set_fields(block):
+    """
+    Returns a dict of the explicitly set definition, settings, and children field values of block
+    """
+    return {
+        field_name: field.read_from(block)
+        for field_name, field in block.fields.iteritems()
+        if field.scope in FINGERPRINT_SCOPES and field.is_set_on(block)
+    }
+
+
+def _block_fingerprint(block_fields, values):
+    """
+    Compute a stable digest of a block's definition, settings, and children.
+
+    Args:
+        block_fields: the block class's ``fields`` dict (field name -> Field)
+        values: dict of field name -> value to digest. Fields outside of FINGERPRINT_SCOPES are ignored.
+    """
+    digest = hashlib.sha1()
+    for field_name in sorted(values):
+        field = block_fields.get(field_name)
+        if field is None or field.scope not in FINGERPRINT_SCOPES:
+            continue
+        digest.update(field_name.encode('utf-8'))
+        digest.update(json.dumps(field.to_json(values[field_name]), sort_keys=True, default=unicode))
+    return digest.hexdigest()
+
+
 def _import_course_draft(
         xml_module_store,
         store,
@@ -457,7 +653,8 @@ def _import_course_draft(
         course_data_path,
         source_course_id,
         target_course_id,
-        mongo_runtime
+        mongo_runtime,
+        import_report=None,
 ):
     '''
     This will import all the content inside of the 'drafts' folder, if it exists
@@ -528,6 +725,7 @@ def _import_course_draft(
             source_course_id,
             target_course_id,
             runtime=mongo_runtime,
+            import_report=import_report,
         )
         for child in module.get_children():
             _import_module(child)
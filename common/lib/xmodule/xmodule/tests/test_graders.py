@@ -1,8 +1,9 @@
 """Grading tests"""
+import random
 import unittest
 
 from xmodule import graders
-from xmodule.graders import Score, aggregate_scores
+from xmodule.graders import Score, ScoreMatrix, aggregate_scores
 
 
 class GradesheetTest(unittest.TestCase):
@@ -236,3 +237,66 @@ class GraderTest(unittest.TestCase):
 
         # TODO: How do we test failure cases? The parser only logs an error when
         # it can't parse something. Maybe it should throw exceptions?
+
+
+class GradeMatrixTest(unittest.TestCase):
+    '''Tests that grading a ScoreMatrix matches grading each grade sheet'''
+
+    def setUp(self):
+        self.grader = graders.grader_from_conf([
+            {'type': "Homework", 'min_count': 4, 'drop_count': 2, 'short_label': "HW", 'weight': 0.25},
+            {'type': "Lab", 'min_count': 2, 'drop_count': 1, 'weight': 0.25, 'show_only_average': True},
+            {'type': "Quiz", 'min_count': 3, 'drop_count': 0, 'weight': 0.2, 'hide_average': True},
+            {'type': "Midterm", 'name': "Midterm Exam", 'short_label': "Midterm", 'weight': 0.1},
+            {'type': "Final", 'min_count': 1, 'drop_count': 0, 'weight': 0.2},
+        ])
+        rand = random.Random(7)
+        self.grade_sheets = []
+        for __ in range(50):
+            self.grade_sheets.append({
+                'Homework': [Score(rand.choice([0, 1, 2, 3]), 3, True, 'hw{}'.format(index)) for index in range(3)],
+                'Lab': [Score(rand.random() * 10, 10.0, True, 'lab{}'.format(index)) for index in range(5)],
+                'Midterm': [Score(rand.randint(0, 7), 7, True, "Midterm Exam")],
+                'Final': [Score(rand.randint(0, 20), 20, True, "Final Exam")],
+            })
+
+    def assert_matches(self, grader, grade_sheets):
+        '''Asserts grader grades grade_sheets' ScoreMatrix exactly as each grade sheet'''
+        batch = grader.grade_matrix(ScoreMatrix.from_grade_sheets(grade_sheets))
+        for row, grade_sheet in enumerate(grade_sheets):
+            graded = grader.grade(grade_sheet)
+            self.assertEqual(batch['percent'][row], graded['percent'])
+            self.assertEqual(len(batch['section_breakdown']), len(graded['section_breakdown']))
+            for batch_section, section in zip(batch['section_breakdown'], graded['section_breakdown']):
+                self.assertEqual(batch_section['percent'][row], section['percent'])
+                self.assertEqual(batch_section['label'], section['label'])
+                self.assertEqual(batch_section['category'], section['category'])
+                self.assertEqual(bool(batch_section.get('dropped', [False] * len(grade_sheets))[row]),
+                                 'mark' in section)
+            self.assertEqual(
+                [batch_section['percent'][row] for batch_section in batch.get('grade_breakdown', [])],
+                [section['percent'] for section in graded.get('grade_breakdown', [])]
+            )
+
+    def test_matches_grade(self):
+        self.assert_matches(self.grader, self.grade_sheets)
+        self.assert_matches(self.grader, [GraderTest.test_gradesheet])
+        for subgrader, __, __ in self.grader.sections:
+            self.assert_matches(subgrader, self.grade_sheets)
+
+    def test_ties(self):
+        # equal scores are dropped last one first
+        grade_sheets = [{'Homework': [Score(1, 2, True, 'hw{}'.format(index)) for index in range(5)]}]
+        self.assert_matches(graders.AssignmentFormatGrader("Homework", 5, 2), grade_sheets)
+
+    def test_empty(self):
+        batch = self.grader.grade_matrix(ScoreMatrix.from_grade_sheets([]))
+        self.assertEqual(len(batch['percent']), 0)
+        self.assert_matches(self.grader, [GraderTest.empty_gradesheet])
+
+    def test_mismatched_sections(self):
+        with self.assertRaises(ValueError):
+            ScoreMatrix.from_grade_sheets([
+                {'Homework': [Score(1, 2, True, 'hw1')]},
+                {'Homework': [Score(1, 2, True, 'hw2')]},
+            ])
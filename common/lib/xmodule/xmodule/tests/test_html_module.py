@@ -38,3 +38,10 @@ class HtmlModuleSubstitutionTestCase(unittest.TestCase):
         module = HtmlModule(self.descriptor, module_system, field_data, Mock())
         self.assertEqual(module.get_html(), sample_xml)
 
+
+    def test_user_independent_views(self):
+        module_system = get_test_system()
+        module = HtmlModule(self.descriptor, module_system, DictFieldData({'data': '<p>Hi</p>'}), Mock())
+        self.assertEqual(module.user_independent_views, ('student_view',))
+        module = HtmlModule(self.descriptor, module_system, DictFieldData({'data': '<p>%%USER_ID%%</p>'}), Mock())
+        self.assertEqual(module.user_independent_views, ())
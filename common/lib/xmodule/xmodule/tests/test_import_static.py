@@ -39,3 +39,16 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+    def test_asset_processor(self):
+        """
+        Test that an asset_processor replaces generating thumbnails during the import
+        """
+        course_dir = DATA_DIR / "tilde"
+        course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
+        content_store = Mock()
+        asset_processor = Mock()
+        import_static_content(course_dir, content_store, course_id, asset_processor=asset_processor)
+        self.assertFalse(content_store.generate_thumbnail.called)
+        saved_keys = [call[0][0].location for call in content_store.save.call_args_list]
+        self.assertEqual([call[0][0] for call in asset_processor.call_args_list], saved_keys)
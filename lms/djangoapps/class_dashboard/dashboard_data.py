@@ -4,8 +4,9 @@ Computes the data to display on the Instructor Dashboard
 from util.json_request import JsonResponse
 import json
 
+from class_dashboard import rollups
+from class_dashboard.models import ProblemGradeCount, SequentialOpenCount
 from courseware import models
-from django.db.models import Count
 from django.utils.translation import ugettext as _
 
 from xmodule.modulestore.django import modulestore
@@ -31,36 +32,33 @@ def get_problem_grade_distribution(course_id):
         attempting the problem
     """
 
-    # Aggregate query on studentmodule table for grade data for all problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
-    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
+    # Rolled up grade data for all problems in course
+    rollups.ensure_rolled_up(course_id)
+    db_query = ProblemGradeCount.objects.filter(course_id=course_id, count__gt=0)
 
     prob_grade_distrib = {}
     total_student_count = {}
 
     # Loop through resultset building data for each problem
     for row in db_query:
-        curr_problem = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
+        curr_problem = row.module_state_key.map_into_course(course_id)
 
         # Build set of grade distributions for each problem that has student responses
         if curr_problem in prob_grade_distrib:
-            prob_grade_distrib[curr_problem]['grade_distrib'].append((row['grade'], row['count_grade']))
+            prob_grade_distrib[curr_problem]['grade_distrib'].append((row.grade, row.count))
 
-            if (prob_grade_distrib[curr_problem]['max_grade'] != row['max_grade']) and \
-                    (prob_grade_distrib[curr_problem]['max_grade'] < row['max_grade']):
-                prob_grade_distrib[curr_problem]['max_grade'] = row['max_grade']
+            if (prob_grade_distrib[curr_problem]['max_grade'] != row.max_grade) and \
+                    (prob_grade_distrib[curr_problem]['max_grade'] < row.max_grade):
+                prob_grade_distrib[curr_problem]['max_grade'] = row.max_grade
 
         else:
             prob_grade_distrib[curr_problem] = {
-                'max_grade': row['max_grade'],
-                'grade_distrib': [(row['grade'], row['count_grade'])]
+                'max_grade': row.max_grade,
+                'grade_distrib': [(row.grade, row.count)]
             }
 
         # Build set of total students attempting each problem
-        total_student_count[curr_problem] = total_student_count.get(curr_problem, 0) + row['count_grade']
+        total_student_count[curr_problem] = total_student_count.get(curr_problem, 0) + row.count
 
     return prob_grade_distrib, total_student_count
 
@@ -74,17 +72,15 @@ def get_sequential_open_distrib(course_id):
     Outputs a dict mapping the 'module_id' to the number of students that have opened that subsection/sequential.
     """
 
-    # Aggregate query on studentmodule table for "opening a subsection" data
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        module_type__exact="sequential",
-    ).values('module_state_key').annotate(count_sequential=Count('module_state_key'))
+    # Rolled up "opening a subsection" data
+    rollups.ensure_rolled_up(course_id)
+    db_query = SequentialOpenCount.objects.filter(course_id=course_id, count__gt=0)
 
     # Build set of "opened" data for each subsection that has "opened" data
     sequential_open_distrib = {}
     for row in db_query:
-        row_loc = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
-        sequential_open_distrib[row_loc] = row['count_sequential']
+        row_loc = row.module_state_key.map_into_course(course_id)
+        sequential_open_distrib[row_loc] = row.count
 
     return sequential_open_distrib
 
@@ -104,23 +100,19 @@ def get_problem_set_grade_distrib(course_id, problem_set):
       'grade_distrib' - array of tuples (`grade`,`count`) ordered by `grade`
     """
 
-    # Aggregate query on studentmodule table for grade data for set of problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
+    # Rolled up grade data for set of problems in course
+    rollups.ensure_rolled_up(course_id)
+    db_query = ProblemGradeCount.objects.filter(
+        course_id=course_id,
         module_state_key__in=problem_set,
-    ).values(
-        'module_state_key',
-        'grade',
-        'max_grade',
-    ).annotate(count_grade=Count('grade')).order_by('module_state_key', 'grade')
+        count__gt=0,
+    ).order_by('module_state_key', 'grade')
 
     prob_grade_distrib = {}
 
     # Loop through resultset building data for each problem
     for row in db_query:
-        row_loc = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
+        row_loc = row.module_state_key.map_into_course(course_id)
         if row_loc not in prob_grade_distrib:
             prob_grade_distrib[row_loc] = {
                 'max_grade': 0,
@@ -128,10 +120,10 @@ def get_problem_set_grade_distrib(course_id, problem_set):
             }
 
         curr_grade_distrib = prob_grade_distrib[row_loc]
-        curr_grade_distrib['grade_distrib'].append((row['grade'], row['count_grade']))
+        curr_grade_distrib['grade_distrib'].append((row.grade, row.count))
 
-        if curr_grade_distrib['max_grade'] < row['max_grade']:
-            curr_grade_distrib['max_grade'] = row['max_grade']
+        if curr_grade_distrib['max_grade'] < row.max_grade:
+            curr_grade_distrib['max_grade'] = row.max_grade
 
     return prob_grade_distrib
 
@@ -0,0 +1,57 @@
+"""
+A Django command that rebuilds the class dashboard's rollups of the given courses (or all courses) from
+their StudentModules, e.g., ahead of their first display or, to correct their drift, periodically from
+cron:
+
+    0 3 * * * ./manage.py lms --settings=aws rebuild_class_dashboard_rollups --all
+
+See class_dashboard.rollups.
+"""
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from class_dashboard import rollups
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from xmodule.modulestore.django import modulestore
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the class dashboard's rollups of courses
+    """
+    help = dedent(__doc__).strip()
+    args = '<course_id course_id ...>'
+    option_list = BaseCommand.option_list + (
+        make_option('--all',
+                    action='store_true',
+                    default=False,
+                    help='Rebuild the rollups of all courses'),
+    )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            course_keys = [course.id for course in modulestore().get_courses()]
+        elif args:
+            course_keys = [self._course_key(course_id) for course_id in args]
+        else:
+            raise CommandError('Give the course ids to rebuild or --all')
+
+        for course_key in course_keys:
+            rollup_log = rollups.rebuild(course_key)
+            self.stdout.write(u"Rebuilt {} in {}s\n".format(course_key, rollup_log.seconds))
+
+    def _course_key(self, course_id):
+        """
+        Parse course_id
+        """
+        try:
+            return CourseKey.from_string(course_id)
+        except InvalidKeyError:
+            try:
+                return SlashSeparatedCourseKey.from_deprecated_string(course_id)
+            except InvalidKeyError:
+                raise CommandError(u"Invalid course id {}".format(course_id))
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'ProblemGradeCount'
+        db.create_table('class_dashboard_problemgradecount', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('module_state_key', self.gf('django.db.models.fields.CharField')(max_length=255, db_column='module_id')),
+            ('grade', self.gf('django.db.models.fields.FloatField')()),
+            ('max_grade', self.gf('django.db.models.fields.FloatField')(null=True, blank=True)),
+            ('count', self.gf('django.db.models.fields.IntegerField')(default=0)),
+        ))
+        db.send_create_signal('class_dashboard', ['ProblemGradeCount'])
+
+        # Adding unique constraint on 'ProblemGradeCount', fields ['course_id', 'module_state_key', 'grade', 'max_grade']
+        db.create_unique('class_dashboard_problemgradecount', ['course_id', 'module_id', 'grade', 'max_grade'])
+
+        # Adding model 'SequentialOpenCount'
+        db.create_table('class_dashboard_sequentialopencount', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('module_state_key', self.gf('django.db.models.fields.CharField')(max_length=255, db_column='module_id')),
+            ('count', self.gf('django.db.models.fields.IntegerField')(default=0)),
+        ))
+        db.send_create_signal('class_dashboard', ['SequentialOpenCount'])
+
+        # Adding unique constraint on 'SequentialOpenCount', fields ['course_id', 'module_state_key']
+        db.create_unique('class_dashboard_sequentialopencount', ['course_id', 'module_id'])
+
+        # Adding model 'RollupLog'
+        db.create_table('class_dashboard_rolluplog', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('django.db.models.fields.CharField')(max_length=255, db_index=True)),
+            ('created', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, null=True, db_index=True, blank=True)),
+            ('seconds', self.gf('django.db.models.fields.IntegerField')(default=0)),
+        ))
+        db.send_create_signal('class_dashboard', ['RollupLog'])
+
+
+    def backwards(self, orm):
+        # Removing unique constraint on 'SequentialOpenCount', fields ['course_id', 'module_state_key']
+        db.delete_unique('class_dashboard_sequentialopencount', ['course_id', 'module_id'])
+
+        # Removing unique constraint on 'ProblemGradeCount', fields ['course_id', 'module_state_key', 'grade', 'max_grade']
+        db.delete_unique('class_dashboard_problemgradecount', ['course_id', 'module_id', 'grade', 'max_grade'])
+
+        # Deleting model 'ProblemGradeCount'
+        db.delete_table('class_dashboard_problemgradecount')
+
+        # Deleting model 'SequentialOpenCount'
+        db.delete_table('class_dashboard_sequentialopencount')
+
+        # Deleting model 'RollupLog'
+        db.delete_table('class_dashboard_rolluplog')
+
+
+    models = {
+        'class_dashboard.problemgradecount': {
+            'Meta': {'unique_together': "(('course_id', 'module_state_key', 'grade', 'max_grade'),)", 'object_name': 'ProblemGradeCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {'default': '0'}),
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'grade': ('django.db.models.fields.FloatField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'max_grade': ('django.db.models.fields.FloatField', [], {'null': 'True', 'blank': 'True'}),
+            'module_state_key': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_column': "'module_id'"})
+        },
+        'class_dashboard.rolluplog': {
+            'Meta': {'ordering': "['-created']", 'object_name': 'RollupLog'},
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'null': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'seconds': ('django.db.models.fields.IntegerField', [], {'default': '0'})
+        },
+        'class_dashboard.sequentialopencount': {
+            'Meta': {'unique_together': "(('course_id', 'module_state_key'),)", 'object_name': 'SequentialOpenCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {'default': '0'}),
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'module_state_key': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_column': "'module_id'"})
+        }
+    }
+
+    complete_apps = ['class_dashboard']
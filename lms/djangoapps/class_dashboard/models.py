@@ -0,0 +1,97 @@
+"""
+Rollups of the StudentModule aggregates the class dashboard displays (see class_dashboard.rollups).
+
+The rollups are kept up to date as StudentModules are saved and deleted (see
+courseware.models.keep_student_module_counts) when the class dashboard is installed: this module is
+imported (e.g., by the legacy instructor dashboard) whether it is or not.
+"""
+from django.conf import settings
+from django.db import models
+from django.db.models import F
+
+from courseware.models import CountsRebuildLog, keep_student_module_counts
+from xmodule_django.models import CourseKeyField, LocationKeyField
+
+
+class ProblemGradeCount(models.Model):
+    """
+    How many students have a grade (out of max_grade) on a problem
+    """
+    course_id = CourseKeyField(max_length=255)
+    module_state_key = LocationKeyField(max_length=255, db_column='module_id')
+    grade = models.FloatField()
+    max_grade = models.FloatField(null=True, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('course_id', 'module_state_key', 'grade', 'max_grade'),)
+
+
+class SequentialOpenCount(models.Model):
+    """
+    How many students have opened a subsection
+    """
+    course_id = CourseKeyField(max_length=255)
+    module_state_key = LocationKeyField(max_length=255, db_column='module_id')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('course_id', 'module_state_key'),)
+
+
+class RollupLog(CountsRebuildLog):
+    """
+    Log of when a course's rollups were rebuilt from its StudentModules. A course's rollups are only
+    complete (i.e., count StudentModules saved before they were kept) once they have been.
+    """
+
+
+def _rolled_up(student_module):
+    """
+    The (rollup model, lookup) under which student_module is counted or None if it isn't
+    """
+    if student_module.module_type == 'problem' and student_module.grade is not None:
+        return (ProblemGradeCount, (
+            ('course_id', student_module.course_id),
+            ('module_state_key', student_module.module_state_key),
+            ('grade', student_module.grade),
+            ('max_grade', student_module.max_grade),
+        ))
+    if student_module.module_type == 'sequential':
+        return (SequentialOpenCount, (
+            ('course_id', student_module.course_id),
+            ('module_state_key', student_module.module_state_key),
+        ))
+    return None
+
+
+def _add(rolled_up, amount):
+    """
+    Add amount (which may be negative) to the count of a _rolled_up
+    """
+    if rolled_up is None:
+        return
+    model, lookup = rolled_up
+    lookup = dict(lookup)
+    if amount > 0:
+        model.objects.get_or_create(**lookup)
+    model.objects.filter(**lookup).update(count=F('count') + amount)
+
+
+def _move_rollup_count(rolled_up, rolling_up):
+    """
+    Move a StudentModule's count from how it was _rolled_up to how it's rolling up
+    """
+    _add(rolled_up, -1)
+    _add(rolling_up, 1)
+
+
+def rollups_kept():
+    """
+    Whether the rollups are kept: the class dashboard (and so its tables) is installed
+    """
+    return 'class_dashboard' in settings.INSTALLED_APPS
+
+
+if rollups_kept():
+    keep_student_module_counts('_rolled_up', _rolled_up, _move_rollup_count)
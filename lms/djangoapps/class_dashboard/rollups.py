@@ -0,0 +1,83 @@
+"""
+Rebuild the class dashboard's rollups (see class_dashboard.models) from a course's StudentModules.
+
+The dashboard reads only the rollups. They're kept up to date as StudentModules are saved (see
+class_dashboard.models); so, a course is only rebuilt here when it's first displayed. They drift,
+though, when the same StudentModule is saved concurrently or while a rebuild is aggregating; so,
+rebuild all courses periodically with the rebuild_class_dashboard_rollups command, e.g., nightly
+from cron:
+
+    0 3 * * * ./manage.py lms --settings=aws rebuild_class_dashboard_rollups --all
+"""
+import time
+
+from django.db import transaction
+from django.db.models import Count
+
+from class_dashboard.models import ProblemGradeCount, RollupLog, SequentialOpenCount
+from courseware.models import StudentModule
+
+# how many rollup rows rebuild writes per query
+REBUILD_BATCH_SIZE = 100
+
+
+def rebuild(course_id):
+    """
+    Replace the course's rollups with its StudentModules' aggregates and log the rebuild. Returns the
+    RollupLog.
+    """
+    start = time.time()
+
+    problem_grades = StudentModule.objects.filter(
+        course_id__exact=course_id,
+        grade__isnull=False,
+        module_type__exact="problem",
+    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
+    problem_grade_counts = [
+        ProblemGradeCount(
+            course_id=course_id,
+            module_state_key=course_id.make_usage_key_from_deprecated_string(row['module_state_key']),
+            grade=row['grade'],
+            max_grade=row['max_grade'],
+            count=row['count_grade'],
+        )
+        for row in problem_grades
+    ]
+
+    sequential_opens = StudentModule.objects.filter(
+        course_id__exact=course_id,
+        module_type__exact="sequential",
+    ).values('module_state_key').annotate(count_sequential=Count('module_state_key'))
+    sequential_open_counts = [
+        SequentialOpenCount(
+            course_id=course_id,
+            module_state_key=course_id.make_usage_key_from_deprecated_string(row['module_state_key']),
+            count=row['count_sequential'],
+        )
+        for row in sequential_opens
+    ]
+
+    with transaction.commit_on_success():
+        rollups = ((ProblemGradeCount, problem_grade_counts), (SequentialOpenCount, sequential_open_counts))
+        for model, counts in rollups:
+            model.objects.filter(course_id=course_id).delete()
+            for index in range(0, len(counts), REBUILD_BATCH_SIZE):
+                model.objects.bulk_create(counts[index:index + REBUILD_BATCH_SIZE])
+        return RollupLog.objects.create(course_id=course_id, seconds=int(time.time() - start))
+
+
+def last_rebuilt(course_id):
+    """
+    When the course's rollups were last rebuilt (None if they never were)
+    """
+    return RollupLog.last_rebuilt(course_id)
+
+
+def ensure_rolled_up(course_id):
+    """
+    Rebuild the course's rollups if they never were. Returns when they were last rebuilt.
+    """
+    rebuilt = last_rebuilt(course_id)
+    if rebuilt is None:
+        rebuilt = rebuild(course_id).created
+    return rebuilt
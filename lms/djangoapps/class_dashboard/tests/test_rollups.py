@@ -0,0 +1,106 @@
+"""
+Tests for the class dashboard's rollups (class_dashboard/models.py and class_dashboard/rollups.py)
+"""
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from courseware.tests.factories import StudentModuleFactory
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from class_dashboard import rollups
+from class_dashboard.models import ProblemGradeCount, RollupLog, SequentialOpenCount, rollups_kept
+
+
+class TestRollups(TestCase):
+    """
+    Tests that the rollups kept as StudentModules are saved match those rebuilt from them
+    """
+
+    def setUp(self):
+        self.course_id = SlashSeparatedCourseKey("MITx", "999", "Robot_Super_Course")
+        self.problem = self.course_id.make_usage_key('problem', 'problem')
+        self.sequential = self.course_id.make_usage_key('sequential', 'sequential')
+
+    def student_module(self, **kwargs):
+        """
+        Create a StudentModule in the course (of the problem unless another module is given)
+        """
+        kwargs.setdefault('course_id', self.course_id)
+        kwargs.setdefault('module_state_key', self.problem)
+        return StudentModuleFactory.create(**kwargs)
+
+    def rolled_up(self):
+        """
+        The course's non-zero rollups as comparable sets
+        """
+        problem_grades = set(
+            (row.module_state_key, row.grade, row.max_grade, row.count)
+            for row in ProblemGradeCount.objects.filter(course_id=self.course_id, count__gt=0)
+        )
+        sequential_opens = set(
+            (row.module_state_key, row.count)
+            for row in SequentialOpenCount.objects.filter(course_id=self.course_id, count__gt=0)
+        )
+        return problem_grades, sequential_opens
+
+    def assert_rollups_match(self):
+        """
+        Assert that the kept rollups are those a rebuild computes
+        """
+        kept = self.rolled_up()
+        rollups.rebuild(self.course_id)
+        self.assertEqual(kept, self.rolled_up())
+
+    def test_rebuild(self):
+        for grade in (0, 1, 1):
+            self.student_module(grade=grade, max_grade=1)
+        self.student_module()  # not graded, so not counted
+        self.student_module(module_type='sequential', module_state_key=self.sequential)
+        ProblemGradeCount.objects.all().delete()
+        SequentialOpenCount.objects.all().delete()
+
+        rollups.rebuild(self.course_id)
+        self.assertEqual(
+            self.rolled_up(),
+            (set([(self.problem, 0, 1, 1), (self.problem, 1, 1, 2)]), set([(self.sequential, 1)]))
+        )
+
+    def test_kept_as_saved(self):
+        graded = [self.student_module(grade=grade, max_grade=1) for grade in (0, 0, 1)]
+        ungraded = self.student_module()
+        opened = [self.student_module(module_type='sequential', module_state_key=self.sequential) for __ in range(2)]
+        self.assert_rollups_match()
+
+        graded[0].grade = 1
+        graded[0].save()
+        ungraded.grade = 0
+        ungraded.max_grade = 1
+        ungraded.save()
+        self.assert_rollups_match()
+
+        graded[1].delete()
+        opened[0].delete()
+        self.assert_rollups_match()
+
+    def test_ensure_rolled_up(self):
+        self.assertIsNone(rollups.last_rebuilt(self.course_id))
+        rebuilt = rollups.ensure_rolled_up(self.course_id)
+        self.assertIsNotNone(rebuilt)
+        self.assertEqual(rebuilt, rollups.ensure_rolled_up(self.course_id))
+        self.assertEqual(RollupLog.objects.filter(course_id=self.course_id).count(), 1)
+
+    def test_rebuild_command(self):
+        self.student_module(grade=1, max_grade=1)
+        ProblemGradeCount.objects.all().delete()
+
+        call_command('rebuild_class_dashboard_rollups', self.course_id.to_deprecated_string())
+        self.assertEqual(self.rolled_up(), (set([(self.problem, 1, 1, 1)]), set()))
+        self.assertEqual(rollups.last_rebuilt(self.course_id), RollupLog.objects.latest().created)
+
+    def test_kept_only_when_installed(self):
+        self.assertTrue(rollups_kept())
+        installed_apps = tuple(app for app in settings.INSTALLED_APPS if app != 'class_dashboard')
+        with override_settings(INSTALLED_APPS=installed_apps):
+            self.assertFalse(rollups_kept())
@@ -19,15 +19,69 @@ from courseware.masquerade import is_masquerading_as_student
 from django.utils.timezone import UTC
 from student.roles import (
     GlobalStaff, CourseStaffRole, CourseInstructorRole,
-    OrgStaffRole, OrgInstructorRole, CourseBetaTesterRole
+    OrgStaffRole, OrgInstructorRole, CourseBetaTesterRole, RoleCache
 )
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
 from opaque_keys.edx.keys import CourseKey, UsageKey
 DEBUG_ACCESS = False
 
+# The actions whose decisions depend only on the user's roles and the object (not e.g. enrollment which
+# can change mid request) and so may be memoized for the rest of the request
+MEMOIZED_ACTIONS = ('load', 'staff', 'instructor')
+
 log = logging.getLogger(__name__)
 
 
+class DescriptorAccessSnapshot(object):
+    """
+    The fields of a descriptor which its access checks read. has_access accepts one in place of
+    the descriptor so callers which cache what they computed from a course (e.g., outlines) can
+    still check each user's access to its blocks without loading them again.
+    """
+    def __init__(self, location, visible_to_staff_only=False, start=None, days_early_for_beta=None, detached=False):
+        self.location = location
+        self.visible_to_staff_only = visible_to_staff_only
+        self.start = start
+        self.days_early_for_beta = days_early_for_beta
+        self._class_tags = set(['detached']) if detached else set()
+
+    @classmethod
+    def from_descriptor(cls, descriptor):
+        """
+        Snapshot descriptor's access fields
+        """
+        return cls(
+            descriptor.location,
+            visible_to_staff_only=descriptor.visible_to_staff_only,
+            start=descriptor.start,
+            days_early_for_beta=descriptor.days_early_for_beta,
+            detached='detached' in descriptor._class_tags,  # pylint: disable=protected-access
+        )
+
+    def to_json(self):
+        """
+        A picklable, json-able dict from which from_json recreates this snapshot
+        """
+        return {
+            'location': unicode(self.location),
+            'visible_to_staff_only': self.visible_to_staff_only,
+            'start': self.start,
+            'days_early_for_beta': self.days_early_for_beta,
+            'detached': 'detached' in self._class_tags,
+        }
+
+    @classmethod
+    def from_json(cls, json_data):
+        """
+        Recreate the snapshot which to_json returned json_data for
+        """
+        json_data = dict(json_data)
+        return cls(UsageKey.from_string(json_data.pop('location')), **json_data)
+
+    def __repr__(self):
+        return u"DescriptorAccessSnapshot({})".format(self.location)
+
+
 def debug(*args, **kwargs):
     # to avoid overly verbose output, this is off by default
     if DEBUG_ACCESS:
@@ -62,11 +116,44 @@ def has_access(user, action, obj, course_key=None):
 
     Returns a bool.  It is up to the caller to actually deny access in a way
     that makes sense in context.
+
+    Decisions for MEMOIZED_ACTIONS are memoized per user for the rest of the request (or celery task) on the
+    user's RoleCache which gets invalidated whenever the user's roles change.
     """
     # Just in case user is passed in as None, make them anonymous
     if not user:
         user = AnonymousUser()
 
+    if action not in MEMOIZED_ACTIONS or not user.is_authenticated():
+        return _has_access(user, action, obj, course_key)
+
+    decision_key = (action, _access_cache_key(obj), course_key, is_masquerading_as_student(user))
+    access_decisions = RoleCache.for_user(user).access_decisions
+    if decision_key not in access_decisions:
+        access_decisions[decision_key] = _has_access(user, action, obj, course_key)
+    return access_decisions[decision_key]
+
+
+def _access_cache_key(obj):
+    """
+    Identify obj for memoizing access decisions about it. Modules and their descriptors share a key as
+    access to a module is access to its descriptor.
+    """
+    if isinstance(obj, XModule):
+        obj = obj.descriptor
+    if isinstance(obj, CourseDescriptor):
+        return ('course', obj.location)
+    if isinstance(obj, ErrorDescriptor):
+        return ('error', obj.location)
+    if isinstance(obj, (XBlock, DescriptorAccessSnapshot)):
+        return ('block', obj.location)
+    return (obj.__class__.__name__, obj)
+
+
+def _has_access(user, action, obj, course_key):
+    """
+    Compute the has_access decision without memoization
+    """
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
     if isinstance(obj, CourseDescriptor):
@@ -79,7 +166,7 @@ def has_access(user, action, obj, course_key=None):
         return _has_access_xmodule(user, action, obj, course_key)
 
     # NOTE: any descriptor access checkers need to go above this
-    if isinstance(obj, XBlock):
+    if isinstance(obj, (XBlock, DescriptorAccessSnapshot)):
         return _has_access_descriptor(user, action, obj, course_key)
 
     if isinstance(obj, CourseKey):
@@ -373,7 +460,7 @@ def _dispatch(table, action, user, obj):
         debug("%s user %s, object %s, action %s",
               'ALLOWED' if result else 'DENIED',
               user,
-              obj.location.to_deprecated_string() if isinstance(obj, XBlock) else str(obj),
+              obj.location.to_deprecated_string() if isinstance(obj, (XBlock, DescriptorAccessSnapshot)) else str(obj),
               action)
         return result
 
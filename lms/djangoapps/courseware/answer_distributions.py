@@ -0,0 +1,128 @@
+"""
+Serve a course's answer distributions (see grades.answer_distributions) from precomputed counts.
+
+AnswerDistributionCount keeps, per problem part and answer, how many submitted problem StudentModules
+have that answer. The counts move as StudentModules are saved (see the receivers in courseware.models);
+so, once :func:`rebuild` has counted the answers which were submitted before, :func:`get_answer_distributions`
+serves them without reading any StudentModules. The counts drift, though, when the same StudentModule is
+saved concurrently or while a rebuild reads the StudentModules; so, they're rebuilt again once they're
+older than REBUILD_INTERVAL (see :func:`needs_rebuild`).
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from courseware.models import AnswerDistributionCount, AnswerDistributionLog, StudentModule
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
+from opaque_keys import InvalidKeyError
+
+log = logging.getLogger(__name__)
+
+# how many StudentModules rebuild reads (and counts it writes) per query
+REBUILD_BATCH_SIZE = 1000
+
+# how long a course's counts may drift before they should be rebuilt
+REBUILD_INTERVAL = timedelta(days=1)
+
+
+def _submitted_problems(course_key):
+    """
+    Yield the course's submitted problem StudentModules reading them REBUILD_BATCH_SIZE at a time in id
+    order so that neither the database nor the process holds them all at once
+    """
+    last_id = 0
+    while True:
+        batch = list(
+            StudentModule.all_submitted_problems_read_only(course_key).filter(id__gt=last_id).order_by('id')[
+                :REBUILD_BATCH_SIZE
+            ]
+        )
+        if not batch:
+            return
+        for student_module in batch:
+            yield student_module
+        last_id = batch[-1].id
+
+
+def rebuild(course_key, progress=None):
+    """
+    Recount the course's AnswerDistributionCounts from its StudentModules and log the rebuild.
+    progress (optional) is called with the number of StudentModules counted so far after each batch.
+
+    Returns the number of StudentModules counted.
+    """
+    start = time.time()
+    counts = defaultdict(int)
+    answers = {}
+    modules = 0
+    for student_module in _submitted_problems(course_key):
+        for part_id, answer in AnswerDistributionCount.submitted_answers(student_module.state).iteritems():
+            key = (student_module.module_state_key, part_id, AnswerDistributionCount.hash_answer(answer))
+            counts[key] += 1
+            answers[key] = answer
+        modules += 1
+        if progress is not None and modules % REBUILD_BATCH_SIZE == 0:
+            progress(modules)
+
+    answer_counts = [
+        AnswerDistributionCount(
+            course_id=course_key, module_state_key=module_state_key, part_id=part_id, answer_hash=answer_hash,
+            answer=answers[(module_state_key, part_id, answer_hash)], count=count,
+        )
+        for (module_state_key, part_id, answer_hash), count in counts.iteritems()
+    ]
+    with transaction.commit_on_success():
+        AnswerDistributionCount.objects.filter(course_id=course_key).delete()
+        for index in range(0, len(answer_counts), REBUILD_BATCH_SIZE):
+            AnswerDistributionCount.objects.bulk_create(answer_counts[index:index + REBUILD_BATCH_SIZE])
+        AnswerDistributionLog.objects.create(course_id=course_key, seconds=int(time.time() - start), nmodules=modules)
+    return modules
+
+
+def needs_rebuild(course_key):
+    """
+    Whether the course's counts have never been rebuilt or not within REBUILD_INTERVAL
+    """
+    rebuilt = AnswerDistributionLog.last_rebuilt(course_key)
+    return rebuilt is None or rebuilt < timezone.now() - REBUILD_INTERVAL
+
+
+def get_answer_distributions(course_key):
+    """
+    Return the course's answer distributions in the form of grades.answer_distributions from its
+    AnswerDistributionCounts or None if they've never been rebuilt (and so don't count all answers).
+    """
+    if not AnswerDistributionLog.objects.filter(course_id=course_key).exists():
+        return None
+
+    store = modulestore()
+    # read all of the course's problems at once rather than one at a time as their answers come up
+    problem_info = {
+        problem.location: (problem.url_name, problem.display_name_with_default)
+        for problem in store.get_items(course_key, qualifiers={'category': 'problem'})
+    }
+
+    answer_counts = defaultdict(lambda: defaultdict(int))
+    for answer_count in AnswerDistributionCount.objects.filter(course_id=course_key, count__gt=0):
+        usage_key = answer_count.module_state_key.map_into_course(course_key)
+        if usage_key not in problem_info:
+            try:
+                problem = store.get_item(usage_key)
+                problem_info[usage_key] = (problem.url_name, problem.display_name_with_default)
+            except (ItemNotFoundError, InvalidKeyError):
+                # e.g., the problem was deleted after students answered it
+                log.warning(
+                    u"Answer Distribution: Item %s in course %s not found; its answers are omitted",
+                    answer_count.module_state_key, course_key
+                )
+                problem_info[usage_key] = None
+        if problem_info[usage_key] is None:
+            continue
+        url, display_name = problem_info[usage_key]
+        answer_counts[(url, display_name, answer_count.part_id)][answer_count.answer] = answer_count.count
+    return answer_counts
@@ -0,0 +1,265 @@
+"""
+Repeatable timings of the courseware's hot paths on synthetic courses.
+
+:func:`run_benchmarks` builds a synthetic course of the given size in each modulestore, populates
+StudentModules for a synthetic student body, and times grading, FieldDataCache construction, the
+table of contents, modulestore reads, problem checks, static asset serving, and the course grader on
+the whole student body's grade sheets (one at a time and as a ScoreMatrix). The results are a
+json-able dict which :func:`compare_results` checks against a previous run's.
+
+The benchmarks write to the configured databases; so, run them through the benchmark_courseware
+management command (or ``paver run_benchmarks``) which sets up and tears down scratch databases.
+"""
+import json
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test.client import Client, RequestFactory
+
+from courseware import grades
+from courseware.model_data import FieldDataCache
+from courseware.models import StudentModule
+from courseware.module_render import toc_for_course
+from lms.lib.xblock.runtime import quote_slashes
+from request_cache.middleware import RequestCache
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.graders import Score, ScoreMatrix
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+# the stores benchmarked by name
+STORE_TYPES = {
+    'mongo': ModuleStoreEnum.Type.mongo,
+    'split': ModuleStoreEnum.Type.split,
+}
+
+# the size of the synthetic course and student body
+DEFAULT_CONFIG = {
+    'chapters': 4,
+    'sequentials': 4,
+    'verticals': 3,
+    'problems': 2,
+    'students': 100,
+    'iterations': 5,
+}
+
+PROBLEM_DATA = (
+    '<problem><stringresponse answer="benchmark">'
+    '<textline size="20"/>'
+    '</stringresponse></problem>'
+)
+
+ASSET_NAME = 'benchmark.txt'
+ASSET_SIZE = 64 * 1024
+
+
+def time_calls(function, iterations):
+    """
+    Call function iterations times each as if in its own request. Returns the first (cold) call's time
+    and the min, median, and max times in milliseconds.
+    """
+    times = []
+    for __ in range(iterations):
+        RequestCache().clear_request_cache()
+        start = time.time()
+        function()
+        times.append((time.time() - start) * 1000)
+    RequestCache().clear_request_cache()
+    ordered = sorted(times)
+    return {
+        'iterations': iterations,
+        'first_ms': round(times[0], 2),
+        'min_ms': round(ordered[0], 2),
+        'median_ms': round(ordered[len(ordered) // 2], 2),
+        'max_ms': round(ordered[-1], 2),
+    }
+
+
+def compare_results(baseline, results, tolerance):
+    """
+    Return [(benchmark, baseline median, median)] of the benchmarks in both baseline and results whose
+    median time in results is more than tolerance (a fraction) slower than in baseline.
+    """
+    regressions = []
+    for name, timing in sorted(results['benchmarks'].iteritems()):
+        baseline_timing = baseline['benchmarks'].get(name)
+        if baseline_timing is None:
+            continue
+        if timing['median_ms'] > baseline_timing['median_ms'] * (1 + tolerance):
+            regressions.append((name, baseline_timing['median_ms'], timing['median_ms']))
+    return regressions
+
+
+class SyntheticCourse(object):
+    """
+    A generated course of chapters of graded sequentials of verticals of problems in one store
+    """
+    def __init__(self, store_type, config):
+        self.store_type = store_type
+        self.config = config
+        self.problems = []
+        self.course = None
+        self.asset_url = None
+
+    def create(self):
+        """
+        Create the course, its blocks, and a static asset
+        """
+        store = modulestore()
+        self.course = CourseFactory.create(
+            org='benchmark', course=self.store_type, run='run', default_store=STORE_TYPES[self.store_type],
+        )
+        with store.bulk_operations(self.course.id):
+            for __ in range(self.config['chapters']):
+                chapter = ItemFactory.create(parent_location=self.course.location, category='chapter')
+                for __ in range(self.config['sequentials']):
+                    sequential = ItemFactory.create(
+                        parent_location=chapter.location, category='sequential',
+                        metadata={'graded': True, 'format': 'Homework'},
+                    )
+                    for __ in range(self.config['verticals']):
+                        vertical = ItemFactory.create(parent_location=sequential.location, category='vertical')
+                        for __ in range(self.config['problems']):
+                            self.problems.append(ItemFactory.create(
+                                parent_location=vertical.location, category='problem', data=PROBLEM_DATA,
+                            ))
+        self.course = store.get_course(self.course.id, depth=None)
+
+        content = StaticContent(
+            StaticContent.compute_location(self.course.id, ASSET_NAME), ASSET_NAME, 'text/plain', 'x' * ASSET_SIZE
+        )
+        contentstore().save(content)
+        self.asset_url = StaticContent.serialize_asset_key_with_slash(content.location)
+
+    def populate_students(self, student):
+        """
+        Create the synthetic student body's StudentModules and student's (who'll be timed)
+        """
+        User.objects.bulk_create([
+            User(username='bench_{}_{}'.format(self.store_type, index), email='bench_{}@example.com'.format(index))
+            for index in range(self.config['students'])
+        ])
+        students = list(User.objects.filter(username__startswith='bench_{}_'.format(self.store_type)))
+        students.append(student)
+        state = json.dumps({'attempts': 1, 'done': True})
+        StudentModule.objects.bulk_create([
+            StudentModule(
+                student=user, course_id=self.course.id, module_state_key=problem.location, module_type='problem',
+                state=state, grade=1, max_grade=1,
+            )
+            for user in students
+            for problem in self.problems
+        ])
+
+
+def _grade_sheets(course, students):
+    """
+    Random grade sheets of course's graded sections for students students
+    """
+    rand = random.Random(0)
+    return [
+        {
+            section_format: [
+                Score(rand.randint(0, 10), 10, True, section['section_descriptor'].display_name_with_default)
+                for section in sections
+            ]
+            for section_format, sections in course.grading_context['graded_sections'].iteritems()
+        }
+        for __ in range(students)
+    ]
+
+
+def _summarize_grade_sheets(course, grade_sheets):
+    """
+    Grade each grade sheet as grades.grade does once it has the student's grade sheet
+    """
+    for grade_sheet in grade_sheets:
+        grade_summary = course.grader.grade(grade_sheet)
+        percent = round(grade_summary['percent'] * 100 + 0.05) / 100
+        grades.grade_for_percentage(course.grade_cutoffs, percent)
+
+
+def _benchmark_course(synthetic, student, iterations):
+    """
+    Time the hot paths on synthetic as student. Returns {benchmark name: timing}.
+    """
+    store = modulestore()
+    course = synthetic.course
+    request = RequestFactory().get('/')
+    request.user = student
+    chapter = course.get_children()[0]
+    section = chapter.get_children()[0]
+    problem = synthetic.problems[0]
+
+    client = Client()
+    client.login(username=student.username, password='test')
+    check_url = reverse('xblock_handler', kwargs={
+        'course_id': course.id.to_deprecated_string(),
+        'usage_id': quote_slashes(problem.location.to_deprecated_string()),
+        'handler': 'xmodule_handler',
+        'suffix': 'problem_check',
+    })
+    answer = {'input_{}_2_1'.format(problem.location.html_id()): 'benchmark'}
+
+    def check_problem():
+        """
+        Submit an answer through the full request stack
+        """
+        response = client.post(check_url, answer)
+        assert response.status_code == 200, response.status_code
+
+    def serve_asset():
+        """
+        Fetch the static asset through the full request stack
+        """
+        response = client.get(synthetic.asset_url)
+        assert response.status_code == 200, response.status_code
+
+    grade_sheets = _grade_sheets(course, synthetic.config['students'])
+
+    benchmarks = {
+        'get_course': lambda: store.get_course(course.id, depth=None),
+        'get_item': lambda: store.get_item(problem.location),
+        'field_data_cache': lambda: FieldDataCache.cache_for_descriptor_descendents(course.id, student, course),
+        'toc_for_course': lambda: toc_for_course(
+            student, request, course, chapter.url_name, section.url_name,
+            FieldDataCache.cache_for_descriptor_descendents(course.id, student, course, depth=2),
+        ),
+        'grade': lambda: grades.grade(student, request, course),
+        'grader': lambda: _summarize_grade_sheets(course, grade_sheets),
+        'grader_batch': lambda: grades.grade_score_matrix(course, ScoreMatrix.from_grade_sheets(grade_sheets)),
+        'problem_check': check_problem,
+        'static_asset': serve_asset,
+    }
+    return {name: time_calls(function, iterations) for name, function in benchmarks.iteritems()}
+
+
+def run_benchmarks(config=None, store_types=None, log=None):
+    """
+    Build a synthetic course in each of store_types (names in STORE_TYPES, default all) sized by config
+    (see DEFAULT_CONFIG) and time the hot paths on it. log (optional) is called with progress messages.
+
+    Returns {'config': config, 'benchmarks': {'<store>.<benchmark>': timing}}
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    log = log or (lambda message: None)
+    results = {'config': config, 'benchmarks': {}}
+    for store_type in store_types or sorted(STORE_TYPES):
+        log(u"Creating a synthetic {} course".format(store_type))
+        synthetic = SyntheticCourse(store_type, config)
+        synthetic.create()
+        student = UserFactory.create(username='bench_student_{}'.format(store_type))
+        CourseEnrollment.enroll(student, synthetic.course.id)
+        log(u"Populating {} students' state".format(config['students']))
+        synthetic.populate_students(student)
+
+        log(u"Timing the {} course".format(store_type))
+        for name, timing in _benchmark_course(synthetic, student, config['iterations']).iteritems():
+            results['benchmarks']['{}.{}'.format(store_type, name)] = timing
+    return results
@@ -74,6 +74,22 @@ def get_course_by_id(course_key, depth=0):
         raise Http404("Course not found.")
 
 
+def get_course_version(course):
+    """
+    Return a token which changes whenever course changes (e.g., on each publish or import), for keying
+    caches of values computed from the course, or None if the course's store can't tell, in which case
+    such values shouldn't be cached.
+
+    The lms doesn't mix in EditInfoMixin and old mongo doesn't update subtree_edited_on within bulk
+    operations; so, ask the runtime for the store's version. Xml courses don't change while the process
+    runs.
+    """
+    if modulestore().get_modulestore_type(course.id) == ModuleStoreEnum.Type.xml:
+        return u"xml"
+    get_version = getattr(course.runtime, 'get_course_version', None)
+    return get_version(course) if get_version is not None else None
+
+
 class UserNotEnrolled(Http404):
     def __init__(self, course_key):
         super(UserNotEnrolled, self).__init__()
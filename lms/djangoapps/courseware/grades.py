@@ -5,16 +5,22 @@ import json
 import random
 import logging
 
+import numpy
+
 from contextlib import contextmanager
+from itertools import islice
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.test.client import RequestFactory
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
+from courseware.access import has_access
 from courseware.model_data import FieldDataCache
 from student.models import anonymous_id_for_user
+from user_api import user_service
 from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
@@ -27,6 +33,77 @@ from opaque_keys import InvalidKeyError
 
 log = logging.getLogger("edx.courseware")
 
+# How many students' course tags (their partition groups) iterate_grades_for reads at once
+STUDENT_TAGS_BATCH_SIZE = 100
+
+
+class MaxScoresCache(object):
+    """
+    An index of the unweighted max score of each scorable block of a course version.
+
+    Any problem which has not yet recorded a score for a user is worth the same number of points
+    for every user; so, once any user's grading instantiates a problem to learn its max score, no
+    other user's grading needs to until the course changes. The index is keyed by the course's
+    version (see courses.get_course_version) which every publish and import changes.
+    """
+    # how long to keep the index of a course version
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    def __init__(self, cache_prefix):
+        self.cache_prefix = cache_prefix
+        self._max_scores = {}
+        self._updates = {}
+
+    @classmethod
+    def create_for_course(cls, course):
+        """
+        Create the MaxScoresCache for the current version of course. If the version is unknown, the
+        index isn't shared (it only lasts as long as the MaxScoresCache).
+        """
+        version = courses.get_course_version(course)
+        cache_prefix = u"max_scores.{}.{}".format(course.id, version) if version is not None else None
+        return cls(cache_prefix)
+
+    def fetch_from_remote(self, locations):
+        """
+        Load the max scores of locations from the remote cache in one round trip
+        """
+        if self.cache_prefix is None:
+            return
+        remote_keys = {self._remote_cache_key(location): location for location in locations}
+        for remote_key, max_score in cache.get_many(remote_keys.keys()).iteritems():
+            self._max_scores[remote_keys[remote_key]] = max_score
+
+    def push_to_remote(self):
+        """
+        Store the max scores computed since fetch_from_remote in the remote cache
+        """
+        if self._updates and self.cache_prefix is not None:
+            cache.set_many(
+                {self._remote_cache_key(location): max_score for location, max_score in self._updates.iteritems()},
+                self.CACHE_TIMEOUT
+            )
+        self._updates = {}
+
+    def get(self, location):
+        """
+        Return the max score of location or None if it isn't known
+        """
+        return self._max_scores.get(location)
+
+    def set(self, location, max_score):
+        """
+        Record the max score of location to push_to_remote later
+        """
+        self._max_scores[location] = max_score
+        self._updates[location] = max_score
+
+    def _remote_cache_key(self, location):
+        """
+        The key in the remote cache for location's max score
+        """
+        return u"{}.{}".format(self.cache_prefix, location)
+
 
 def yield_dynamic_descriptor_descendents(descriptor, module_creator):
     """
@@ -181,6 +258,11 @@ def _grade(student, request, course, keep_raw_scores):
         course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
     )
 
+    max_scores_cache = MaxScoresCache.create_for_course(course)
+    max_scores_cache.fetch_from_remote(
+        [descriptor.location for descriptor in grading_context['all_descriptors'] if descriptor.has_score]
+    )
+
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
     # passed to the grader
@@ -231,7 +313,8 @@ def _grade(student, request, course, keep_raw_scores):
                 for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
 
                     (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
+                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores,
+                        max_scores_cache=max_scores_cache
                     )
                     if correct is None and total is None:
                         continue
@@ -264,6 +347,8 @@ def _grade(student, request, course, keep_raw_scores):
 
         totaled_scores[section_format] = format_scores
 
+    max_scores_cache.push_to_remote()
+
     grade_summary = course.grader.grade(totaled_scores, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
 
     # We round the grade here, to make sure that the grade is an whole percentage and
@@ -301,6 +386,42 @@ def grade_for_percentage(grade_cutoffs, percentage):
     return letter_grade
 
 
+def round_percents(percents):
+    """
+    Round an array of final percents to whole percentages as _grade rounds each student's (with halves
+    rounded away from zero as round does rather than to even as numpy.round does)
+    """
+    scaled = percents * 100 + 0.05
+    magnitude = numpy.abs(scaled)
+    rounded = numpy.floor(magnitude)
+    rounded += (magnitude - rounded) >= 0.5
+    return numpy.copysign(rounded, scaled) / 100
+
+
+def grades_for_percentages(grade_cutoffs, percentages):
+    """
+    Returns an array of the letter grade (or None) of each of an array of percentages as grade_for_percentage
+    would.
+    """
+    letter_grades = numpy.empty(len(percentages), dtype=object)
+    # from the lowest cutoff up so each percentage ends with the highest grade it reaches
+    descending_grades = sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True)
+    for possible_grade in reversed(descending_grades):
+        letter_grades[percentages >= grade_cutoffs[possible_grade]] = possible_grade
+    return letter_grades
+
+
+def grade_score_matrix(course, scores):
+    """
+    Grade the students of a graders.ScoreMatrix of course's graded sections at once. Returns the output of
+    course's grader's grade_matrix augmented with the rounded percents and the letter grades (see _grade).
+    """
+    grade_summary = course.grader.grade_matrix(scores)
+    grade_summary['percent'] = round_percents(grade_summary['percent'])
+    grade_summary['grade'] = grades_for_percentages(course.grade_cutoffs, grade_summary['percent'])
+    return grade_summary
+
+
 @transaction.commit_manually
 def progress_summary(student, request, course):
     """
@@ -347,6 +468,10 @@ def _progress_summary(student, request, course):
             return None
 
     submissions_scores = sub_api.get_scores(course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id))
+    max_scores_cache = MaxScoresCache.create_for_course(course)
+    max_scores_cache.fetch_from_remote(
+        [descriptor.location for descriptor in field_data_cache.descriptors if descriptor.has_score]
+    )
 
     chapters = []
     # Don't include chapters that aren't displayable (e.g. due to error)
@@ -371,7 +496,8 @@ def _progress_summary(student, request, course):
                 for module_descriptor in yield_dynamic_descriptor_descendents(section_module, module_creator):
                     course_id = course.id
                     (correct, total) = get_score(
-                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores,
+                        max_scores_cache=max_scores_cache
                     )
                     if correct is None and total is None:
                         continue
@@ -400,10 +526,12 @@ def _progress_summary(student, request, course):
             'sections': sections
         })
 
+    max_scores_cache.push_to_remote()
+
     return chapters
 
 
-def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None):
+def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None, max_scores_cache=None):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
     e.g. (5,7) if you got 5 out of 7 points.
@@ -417,6 +545,8 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
            Can return None if user doesn't have access, or if something else went wrong.
     scores_cache: A dict of location names to (earned, possible) point tuples.
            If an entry is found in this cache, it takes precedence.
+    max_scores_cache: A MaxScoresCache of the course. If the user hasn't been graded on the problem yet,
+           its max score comes from here rather than from instantiating the problem.
     """
     scores_cache = scores_cache or {}
 
@@ -456,20 +586,28 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         correct = student_module.grade if student_module.grade is not None else 0
         total = student_module.max_grade
     else:
-        # If the problem was not in the cache, or hasn't been graded yet,
-        # we need to instantiate the problem.
-        # Otherwise, the max score (cached in student_module) won't be available
-        problem = module_creator(problem_descriptor)
-        if problem is None:
-            return (None, None)
-
         correct = 0.0
-        total = problem.max_score()
-
-        # Problem may be an error module (if something in the problem builder failed)
-        # In which case total might be None
-        if total is None:
-            return (None, None)
+        total = max_scores_cache.get(problem_descriptor.location) if max_scores_cache else None
+        if total is not None:
+            # module_creator would have returned None if the user can't load the problem
+            if not has_access(user, 'load', problem_descriptor, course_id):
+                return (None, None)
+        else:
+            # If the problem was not in the cache, or hasn't been graded yet,
+            # we need to instantiate the problem.
+            # Otherwise, the max score (cached in student_module) won't be available
+            problem = module_creator(problem_descriptor)
+            if problem is None:
+                return (None, None)
+
+            total = problem.max_score()
+
+            # Problem may be an error module (if something in the problem builder failed)
+            # In which case total might be None
+            if total is None:
+                return (None, None)
+            if max_scores_cache:
+                max_scores_cache.set(problem_descriptor.location, total)
 
     # Now we re-weight the problem, if specified
     weight = problem_descriptor.weight
@@ -521,7 +659,7 @@ def iterate_grades_for(course_id, students):
     # grading that student.
     request = RequestFactory().get('/')
 
-    for student in students:
+    for student in _with_course_tags(course, students):
         with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course_id)]):
             try:
                 request.user = student
@@ -543,3 +681,23 @@ def iterate_grades_for(course_id, students):
                     exc.message
                 )
                 yield student, {}, exc.message
+
+
+def _with_course_tags(course, students):
+    """
+    Yield the students reading the course tags of each batch of them in one query (rather than one query per
+    student per partition) if the course has user partitions. Each batch's tags are forgotten once it's graded.
+    """
+    students = iter(students)
+    if not course.user_partitions:
+        for student in students:
+            yield student
+        return
+    while True:
+        batch = list(islice(students, STUDENT_TAGS_BATCH_SIZE))
+        if not batch:
+            return
+        user_service.get_course_tags_for_users(batch, course.id)
+        for student in batch:
+            yield student
+        user_service.forget_course_tags(batch, course.id)
@@ -0,0 +1,116 @@
+"""
+A Django command that times the courseware's hot paths on synthetic courses and writes the timings as json.
+
+It creates a test sql database and points the modulestores and contentstore at scratch mongo
+databases, which it drops afterwards; still, run it with test settings, e.g.,
+
+    ./manage.py lms --settings=test benchmark_courseware --output=benchmarks.json --compare=baseline.json
+
+See courseware.benchmarks.
+"""
+import copy
+import json
+from optparse import make_option
+from textwrap import dedent
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from courseware.benchmarks import DEFAULT_CONFIG, STORE_TYPES, compare_results, run_benchmarks
+from xmodule.contentstore.django import _CONTENTSTORE, contentstore
+from xmodule.modulestore.django import clear_existing_modulestores
+from xmodule.modulestore.modulestore_settings import update_module_store_settings
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+
+def scratch_store_settings():
+    """
+    Return copies of the MODULESTORE and CONTENTSTORE settings whose mongo databases are new and
+    uniquely named so that the benchmarks (and dropping their databases) can't touch any real data
+    """
+    db_name = 'benchmark_courseware_{}'.format(uuid4().hex)
+    module_store_setting = copy.deepcopy(settings.MODULESTORE)
+    try:
+        update_module_store_settings(module_store_setting, doc_store_settings={'db': db_name})
+    except KeyError:
+        raise CommandError('The benchmarks need a MixedModuleStore MODULESTORE setting (e.g., the test settings)')
+    content_store_setting = copy.deepcopy(settings.CONTENTSTORE)
+    content_store_setting['DOC_STORE_CONFIG']['db'] = '{}_content'.format(db_name)
+    return module_store_setting, content_store_setting
+
+
+class Command(BaseCommand):
+    """
+    Time the courseware's hot paths on synthetic courses
+    """
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + tuple(
+        make_option('--{}'.format(name), action='store', type='int', default=default,
+                    help='Number of {} (default {})'.format(name, default))
+        for name, default in sorted(DEFAULT_CONFIG.iteritems())
+    ) + (
+        make_option('--store',
+                    action='append',
+                    choices=sorted(STORE_TYPES),
+                    help='A modulestore to benchmark (default all)'),
+        make_option('--output',
+                    action='store',
+                    help='The file to write the json results to (default stdout)'),
+        make_option('--compare',
+                    action='store',
+                    help='The json results of a previous run to check for regressions against'),
+        make_option('--tolerance',
+                    action='store',
+                    type='float',
+                    default=0.2,
+                    help='How much slower (as a fraction) a benchmark may be than in --compare\'s run'),
+    )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        config = {name: options[name] for name in DEFAULT_CONFIG}
+        results = self._run(config, options['store'])
+
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output + '\n')
+
+        if baseline is not None:
+            regressions = compare_results(baseline, results, options['tolerance'])
+            for name, baseline_ms, median_ms in regressions:
+                self.stderr.write('{}: {}ms -> {}ms\n'.format(name, baseline_ms, median_ms))
+            if regressions:
+                raise CommandError('{} benchmarks regressed by more than {:.0%}'.format(
+                    len(regressions), options['tolerance']
+                ))
+
+    def _run(self, config, store_types):
+        """
+        Run the benchmarks in fresh test databases
+        """
+        module_store_setting, content_store_setting = scratch_store_settings()
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            with override_settings(MODULESTORE=module_store_setting, CONTENTSTORE=content_store_setting):
+                clear_existing_modulestores()
+                _CONTENTSTORE.clear()
+                try:
+                    return run_benchmarks(config, store_types, log=lambda message: self.stderr.write(message + '\n'))
+                finally:
+                    contentstore()._drop_database()  # pylint: disable=protected-access
+                    ModuleStoreTestCase.drop_mongo_collections()
+                    clear_existing_modulestores()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
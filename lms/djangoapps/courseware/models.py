@@ -12,10 +12,14 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import hashlib
+import json
+
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 
 from xmodule_django.models import CourseKeyField, LocationKeyField
@@ -259,3 +263,164 @@ class OfflineComputedGradeLog(models.Model):
 
     def __unicode__(self):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
+
+
+class CountsRebuildLog(models.Model):
+    """
+    Log of when a course's counts kept from its StudentModules (see keep_student_module_counts) were
+    rebuilt from scratch
+    """
+    class Meta:
+        abstract = True
+        ordering = ["-created"]
+        get_latest_by = "created"
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    created = models.DateTimeField(auto_now_add=True, null=True, db_index=True)
+    seconds = models.IntegerField(default=0)  	# seconds elapsed for computation
+
+    def __unicode__(self):
+        return "[%s] %s: %s" % (
+            self.__class__.__name__, self.course_id.to_deprecated_string(), self.created  # pylint: disable=no-member
+        )
+
+    @classmethod
+    def last_rebuilt(cls, course_id):
+        """
+        When the course's counts were last rebuilt (None if they never were)
+        """
+        rebuilds = cls.objects.filter(course_id=course_id).order_by('-created')[:1]
+        return rebuilds[0].created if rebuilds else None
+
+
+def keep_student_module_counts(name, counted, move):
+    """
+    Keep counts of StudentModules up to date as they're saved and deleted.
+
+    counted(student_module) returns what of a StudentModule is counted (None if nothing). It's
+    remembered (as the attribute name) as each StudentModule is read so that saving it only calls
+    move(old, new) (each a result of counted; None for nothing) when that changes.
+
+    The counts drift if the same StudentModule is saved concurrently (each save moves it from what
+    was read); so, rebuild them from the StudentModules periodically.
+    """
+    def remember(sender, instance, **kwargs):  # pylint: disable=unused-argument
+        """
+        Remember what of the StudentModule is counted as it's read
+        """
+        setattr(instance, name, counted(instance))
+
+    def update(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+        """
+        Move the saved StudentModule's counts if it's counted differently
+        """
+        old = None if created else getattr(instance, name, None)
+        new = counted(instance)
+        if old != new:
+            move(old, new)
+            setattr(instance, name, new)
+
+    def remove(sender, instance, **kwargs):  # pylint: disable=unused-argument
+        """
+        Remove the deleted StudentModule from the counts
+        """
+        move(getattr(instance, name, None), None)
+
+    post_init.connect(remember, sender=StudentModule, weak=False, dispatch_uid=name + '.remember')
+    post_save.connect(update, sender=StudentModule, weak=False, dispatch_uid=name + '.update')
+    post_delete.connect(remove, sender=StudentModule, weak=False, dispatch_uid=name + '.remove')
+
+
+class AnswerDistributionCount(models.Model):
+    """
+    The number of submitted problem StudentModules whose answer to a problem part is answer: the
+    tallies of grades.answer_distributions kept as a table. The counts are updated as StudentModules
+    are saved and deleted, and rebuilt from scratch by courseware.answer_distributions.rebuild.
+    """
+    course_id = CourseKeyField(max_length=255)
+    module_state_key = LocationKeyField(max_length=255, db_column='module_id')
+    part_id = models.CharField(max_length=255)
+    # answers may be too long to index; so, they're unique by their hash
+    answer_hash = models.CharField(max_length=40)
+    answer = models.TextField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('course_id', 'module_state_key', 'part_id', 'answer_hash'),)
+
+    @staticmethod
+    def hash_answer(answer):
+        """
+        The answer_hash of answer
+        """
+        return hashlib.sha1(answer.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def submitted_answers(state):
+        """
+        Return {problem part id: unicode answer} of a problem StudentModule's state (empty if the state
+        is missing or can't be parsed)
+        """
+        try:
+            raw_answers = json.loads(state).get('student_answers') if state else None
+        except (ValueError, AttributeError):
+            return {}
+        # as grades.answer_distributions, whatever the answers are (numbers, None, etc.) count as unicode
+        return {part_id: unicode(raw_answer) for part_id, raw_answer in (raw_answers or {}).iteritems()}
+
+    @classmethod
+    def add(cls, course_id, module_state_key, answers, amount):
+        """
+        Add amount (which may be negative) to the counts of answers ({part id: answer}) to
+        module_state_key's parts
+        """
+        for part_id, answer in answers.iteritems():
+            lookup = {
+                'course_id': course_id,
+                'module_state_key': module_state_key,
+                'part_id': part_id,
+                'answer_hash': cls.hash_answer(answer),
+            }
+            if amount > 0:
+                cls.objects.get_or_create(defaults={'answer': answer}, **lookup)
+            cls.objects.filter(**lookup).update(count=F('count') + amount)
+
+
+class AnswerDistributionLog(CountsRebuildLog):
+    """
+    Log of when a course's AnswerDistributionCounts were rebuilt. A course's counts are only complete
+    (i.e., include answers submitted before they were kept) once they have been.
+    """
+    nmodules = models.IntegerField(default=0)  	# StudentModules counted
+
+
+def _counted_answers(student_module):
+    """
+    The (course_id, module_state_key, state) of student_module whose answers AnswerDistributionCount counts
+    or None if it doesn't count them (see StudentModule.all_submitted_problems_read_only)
+    """
+    if student_module.module_type != 'problem' or student_module.grade is None:
+        return None
+    return (student_module.course_id, student_module.module_state_key, student_module.state)
+
+
+def _move_answer_counts(counted, counting):
+    """
+    Update AnswerDistributionCount from a StudentModule's counted answers to its counting ones (each
+    the result of _counted_answers)
+    """
+    old_answers = AnswerDistributionCount.submitted_answers(counted[2]) if counted else {}
+    new_answers = AnswerDistributionCount.submitted_answers(counting[2]) if counting else {}
+    if counted and counting and counted[:2] == counting[:2]:
+        # the same problem: only count the answers which changed
+        for part_id, answer in new_answers.items():
+            if old_answers.get(part_id) == answer:
+                del old_answers[part_id]
+                del new_answers[part_id]
+    if counted:
+        AnswerDistributionCount.add(counted[0], counted[1], old_answers, -1)
+    if counting:
+        AnswerDistributionCount.add(counting[0], counting[1], new_answers, 1)
+
+
+keep_student_module_counts('_counted_answers', _counted_answers, _move_answer_counts)
@@ -17,15 +17,19 @@ from django.core.urlresolvers import reverse
 from django.http import Http404, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from capa.xqueue_interface import XQueueInterface
-from courseware.access import has_access, get_user_role
+from capa.xqueue_interface import XQueueInterface, AsyncXQueueInterface
+from courseware.access import has_access, get_user_role, DescriptorAccessSnapshot
 from courseware.masquerade import setup_masquerade
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
+from courseware.models import StudentModule
+from courseware.xqueue_scores import ScoreUpdate, apply_score_updates
 from lms.lib.xblock.field_data import LmsFieldData
+from lms.lib.xblock.fragment_cache import BlockFragmentCache
 from lms.lib.xblock.runtime import LmsModuleSystem, unquote_slashes, quote_slashes
 from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from psychometrics.psychoanalyze import make_psychometrics_data_update_handler
+from request_cache.middleware import RequestCache
 from student.models import anonymous_id_for_user, user_by_anonymous_id
 from xblock.core import XBlock
 from xblock.fields import Scope
@@ -34,6 +38,8 @@ from xblock.exceptions import NoSuchHandlerError
 from xblock.django.request import django_to_webob_request, webob_to_django_response
 from xmodule.error_module import ErrorDescriptor, NonStaffErrorDescriptor
 from xmodule.exceptions import NotFoundError, ProcessingError
+from xmodule.fields import Date
+from opaque_keys.edx.keys import UsageKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore, ModuleI18nService
@@ -62,7 +68,13 @@ if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
 else:
     REQUESTS_AUTH = None
 
-XQUEUE_INTERFACE = XQueueInterface(
+# submit to xqueue from background threads rather than in the problem check request
+if settings.FEATURES.get('ENABLE_ASYNC_XQUEUE_SUBMISSIONS'):
+    XQUEUE_INTERFACE_CLASS = AsyncXQueueInterface
+else:
+    XQUEUE_INTERFACE_CLASS = XQueueInterface
+
+XQUEUE_INTERFACE = XQUEUE_INTERFACE_CLASS(
     settings.XQUEUE_INTERFACE['url'],
     settings.XQUEUE_INTERFACE['django_auth'],
     REQUESTS_AUTH,
@@ -72,6 +84,18 @@ XQUEUE_INTERFACE = XQueueInterface(
 # Some brave person should make the variable names consistently someday, but the code's
 # coupled enough that it's kind of tricky--you've been warned!
 
+# The categories whose display items depend on the user; so, courses with them at the chapter or section
+# level can't share a toc outline
+TOC_USER_DEPENDENT_CATEGORIES = ('abtest',)
+# what's cached in place of the toc outline of courses whose outlines depend on the user
+TOC_USER_DEPENDENT = 'user_dependent'
+# how long to keep a course version's toc outline
+TOC_OUTLINE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# The RequestCache namespace of the counts of runtimes built (see get_runtime_build_counts)
+RUNTIME_COUNTS_NAMESPACE = u"courseware.module_render.runtime_counts"
+
+
 class LmsModuleRenderError(Exception):
     """
     An exception class for exceptions thrown by module_render that don't fit well elsewhere
@@ -79,6 +103,81 @@ class LmsModuleRenderError(Exception):
     pass
 
 
+def get_runtime_build_counts():
+    """
+    Return a dict of how many module systems ('module_systems') and how many sets of shared runtime
+    parts ('shared_runtime_parts') the current request has built.
+    """
+    counts = RequestCache.get_request_cache().data.get(RUNTIME_COUNTS_NAMESPACE, {})
+    return {
+        'module_systems': counts.get('module_systems', 0),
+        'shared_runtime_parts': counts.get('shared_runtime_parts', 0),
+    }
+
+
+def _increment_runtime_build_count(name):
+    """
+    Count building one more of name in this request
+    """
+    counts = RequestCache.get_request_cache().data.setdefault(RUNTIME_COUNTS_NAMESPACE, {})
+    counts[name] = counts.get(name, 0) + 1
+
+
+class SharedRuntimeParts(object):
+    """
+    The parts of the module system of each of a user's blocks in a course which don't depend on the block.
+
+    They're built once per FieldDataCache (so, typically once per user, course, and request) and shared by
+    every module system get_module_system_for_user builds with that FieldDataCache.
+    """
+    def __init__(self, user, field_data_cache, course_id, request_token, wrap_xmodule_display):
+        self.student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
+        self.jump_to_id_base_url = reverse(
+            'jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}
+        )
+
+        self.wrap_xblock = None
+        if wrap_xmodule_display is True:
+            self.wrap_xblock = partial(
+                wrap_xblock,
+                'LmsRuntime',
+                extra_data={'course-id': course_id.to_deprecated_string()},
+                usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string()),
+                request_token=request_token,
+            )
+        self.replace_course_urls_wrapper = partial(replace_course_urls, course_id)
+        self.replace_jump_to_id_urls_wrapper = partial(replace_jump_to_id_urls, course_id, self.jump_to_id_base_url)
+
+        self.replace_course_urls = partial(static_replace.replace_course_urls, course_key=course_id)
+        self.replace_jump_to_id_urls = partial(
+            static_replace.replace_jump_to_id_urls,
+            course_id=course_id,
+            jump_to_id_base_url=self.jump_to_id_base_url
+        )
+        self.can_execute_unsafe_code = lambda: can_execute_unsafe_code(course_id)
+        self.get_python_lib_zip = lambda: get_python_lib_zip(contentstore, course_id)
+        self.get_user_role = lambda: get_user_role(user, course_id)
+        self.i18n_service = ModuleI18nService()
+        self.user_is_admin = has_access(user, u'staff', 'global')
+
+    @classmethod
+    def for_field_data_cache(cls, user, field_data_cache, course_id, request_token, wrap_xmodule_display):
+        """
+        Return the SharedRuntimeParts for these arguments, building them only the first time for
+        field_data_cache.
+        """
+        # pylint: disable=protected-access
+        if not hasattr(field_data_cache, '_shared_runtime_parts'):
+            field_data_cache._shared_runtime_parts = {}
+        key = (user.id, course_id, request_token, wrap_xmodule_display)
+        if key not in field_data_cache._shared_runtime_parts:
+            field_data_cache._shared_runtime_parts[key] = cls(
+                user, field_data_cache, course_id, request_token, wrap_xmodule_display
+            )
+            _increment_runtime_build_count('shared_runtime_parts')
+        return field_data_cache._shared_runtime_parts[key]
+
+
 def make_track_function(request):
     '''
     Make a tracking function that logs what happened.
@@ -91,7 +190,7 @@ def make_track_function(request):
     return function
 
 
-def toc_for_course(user, request, course, active_chapter, active_section, field_data_cache):
+def toc_for_course(user, request, course, active_chapter, active_section, field_data_cache=None):
     '''
     Create a table of contents from the module store
 
@@ -112,41 +211,168 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
     NOTE: assumes that if we got this far, user has access to course.  Returns
     None if this is not the case.
 
-    field_data_cache must include data from the course module and 2 levels of its descendents
+    The toc is built from the course version's cached outline (see _course_toc_outline) by
+    filtering out what the user can't load and adding the user's due date extensions. Only
+    courses whose outlines depend on the user (e.g., ab tests) instantiate the course's modules,
+    using field_data_cache which must then include data from the course module and 2 levels of its
+    descendents (it's created if not given).
     '''
 
     with modulestore().bulk_operations(course.id):
-        course_module = get_module_for_descriptor(user, request, course, field_data_cache, course.id)
-        if course_module is None:
+        if not has_access(user, 'load', course, course.id):
             return None
 
+        outline = _course_toc_outline(course)
+        if outline is None:
+            if field_data_cache is None:
+                field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course.id, user, course, depth=2)
+            return _toc_for_course_modules(
+                user, request, course, active_chapter, active_section, field_data_cache
+            )
+
+        extended_due_dates = _get_extended_due_dates(user, course.id, outline)
         chapters = list()
-        for chapter in course_module.get_display_items():
-            if chapter.hide_from_toc:
+        for chapter in outline:
+            if not has_access(user, 'load', DescriptorAccessSnapshot.from_json(chapter['access']), course.id):
                 continue
 
             sections = list()
-            for section in chapter.get_display_items():
-
-                active = (chapter.url_name == active_chapter and
-                          section.url_name == active_section)
-
-                if not section.hide_from_toc:
-                    sections.append({'display_name': section.display_name_with_default,
-                                     'url_name': section.url_name,
-                                     'format': section.format if section.format is not None else '',
-                                     'due': get_extended_due_date(section),
-                                     'active': active,
-                                     'graded': section.graded,
-                                     })
-
-            chapters.append({'display_name': chapter.display_name_with_default,
-                             'url_name': chapter.url_name,
+            for section in chapter['sections']:
+                if not has_access(user, 'load', DescriptorAccessSnapshot.from_json(section['access']), course.id):
+                    continue
+                sections.append({
+                    'display_name': section['display_name'],
+                    'url_name': section['url_name'],
+                    'format': section['format'],
+                    'due': get_extended_due_date({
+                        'due': section['due'],
+                        'extended_due': extended_due_dates.get(section['access']['location']),
+                    }),
+                    'active': chapter['url_name'] == active_chapter and section['url_name'] == active_section,
+                    'graded': section['graded'],
+                })
+
+            chapters.append({'display_name': chapter['display_name'],
+                             'url_name': chapter['url_name'],
                              'sections': sections,
-                             'active': chapter.url_name == active_chapter})
+                             'active': chapter['url_name'] == active_chapter})
         return chapters
 
 
+def _course_toc_outline(course):
+    """
+    Return the user independent outline of course's chapters and sections from which toc_for_course
+    builds each user's toc or None if it depends on the user.
+
+    The outline of each course version is cached. It omits the chapters and sections hidden from the
+    toc and snapshots the access fields of the rest (see DescriptorAccessSnapshot).
+    """
+    from courseware.courses import get_course_version  # courseware.courses imports this module
+
+    version = get_course_version(course)
+    cache_key = None
+    if version is not None:
+        cache_key = u"courseware.toc_outline.{}.{}".format(course.id, version)
+        outline = cache.get(cache_key)
+        if outline is not None:
+            return None if outline == TOC_USER_DEPENDENT else outline
+
+    outline = []
+    for chapter in course.get_children():
+        if chapter.category in TOC_USER_DEPENDENT_CATEGORIES:
+            outline = None
+            break
+        if chapter.hide_from_toc:
+            continue
+        sections = []
+        for section in chapter.get_children():
+            if section.category in TOC_USER_DEPENDENT_CATEGORIES:
+                outline = None
+                break
+            if section.hide_from_toc:
+                continue
+            sections.append({
+                'display_name': section.display_name_with_default,
+                'url_name': section.url_name,
+                'format': section.format if section.format is not None else '',
+                'due': section.due,
+                'graded': section.graded,
+                'access': DescriptorAccessSnapshot.from_descriptor(section).to_json(),
+            })
+        if outline is None:
+            break
+        outline.append({
+            'display_name': chapter.display_name_with_default,
+            'url_name': chapter.url_name,
+            'sections': sections,
+            'access': DescriptorAccessSnapshot.from_descriptor(chapter).to_json(),
+        })
+
+    if cache_key is not None:
+        cache.set(cache_key, TOC_USER_DEPENDENT if outline is None else outline, TOC_OUTLINE_CACHE_TIMEOUT)
+    return outline
+
+
+def _get_extended_due_dates(user, course_id, outline):
+    """
+    Return a dict of the user's due date extensions by the unicode location of the outline's sections
+    """
+    locations = {
+        UsageKey.from_string(section['access']['location']): section['access']['location']
+        for chapter in outline for section in chapter['sections'] if section['due'] is not None
+    }
+    if not locations or not user.is_authenticated():
+        return {}
+
+    extended_due_dates = {}
+    student_modules = StudentModule.objects.filter(
+        student_id=user.id,
+        course_id=course_id,
+        module_state_key__in=locations.keys(),
+    )
+    for student_module in student_modules:
+        extended_due = json.loads(student_module.state or '{}').get('extended_due')
+        location = locations.get(student_module.module_state_key.map_into_course(course_id))
+        if extended_due and location is not None:
+            extended_due_dates[location] = Date().from_json(extended_due)
+    return extended_due_dates
+
+
+def _toc_for_course_modules(user, request, course, active_chapter, active_section, field_data_cache):
+    """
+    Build the toc from the course's modules as bound to the user. See toc_for_course.
+    """
+    course_module = get_module_for_descriptor(user, request, course, field_data_cache, course.id)
+    if course_module is None:
+        return None
+
+    chapters = list()
+    for chapter in course_module.get_display_items():
+        if chapter.hide_from_toc:
+            continue
+
+        sections = list()
+        for section in chapter.get_display_items():
+
+            active = (chapter.url_name == active_chapter and
+                      section.url_name == active_section)
+
+            if not section.hide_from_toc:
+                sections.append({'display_name': section.display_name_with_default,
+                                 'url_name': section.url_name,
+                                 'format': section.format if section.format is not None else '',
+                                 'due': get_extended_due_date(section),
+                                 'active': active,
+                                 'graded': section.graded,
+                                 })
+
+        chapters.append({'display_name': chapter.display_name_with_default,
+                         'url_name': chapter.url_name,
+                         'sections': sections,
+                         'active': chapter.url_name == active_chapter})
+    return chapters
+
+
 def get_module(user, request, usage_key, field_data_cache,
                position=None, log_if_not_found=True, wrap_xmodule_display=True,
                grade_bucket_type=None, depth=0,
@@ -268,7 +494,11 @@ def get_module_system_for_user(user, field_data_cache,
     Returns:
         (LmsModuleSystem, KvsFieldData):  (module system, student_data) bound to, primarily, the user and descriptor
     """
-    student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
+    shared_parts = SharedRuntimeParts.for_field_data_cache(
+        user, field_data_cache, course_id, request_token, wrap_xmodule_display
+    )
+    _increment_runtime_build_count('module_systems')
+    student_data = shared_parts.student_data
 
     def make_xqueue_callback(dispatch='score_update'):
         # Fully qualified callback URL for external queueing system
@@ -436,25 +666,17 @@ def get_module_system_for_user(user, field_data_cache,
 
     # Build a list of wrapping functions that will be applied in order
     # to the Fragment content coming out of the xblocks that are about to be rendered.
+    # The content wrappers depend only on the course; so, their output may be cached (see
+    # LmsModuleSystem). The block wrappers follow them and may depend on the user and request.
+    content_wrappers = []
     block_wrappers = []
 
-    # Wrap the output display in a single div to allow for the XModule
-    # javascript to be bound correctly
-    if wrap_xmodule_display is True:
-        block_wrappers.append(partial(
-            wrap_xblock,
-            'LmsRuntime',
-            extra_data={'course-id': course_id.to_deprecated_string()},
-            usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string()),
-            request_token=request_token,
-        ))
-
     # TODO (cpennington): When modules are shared between courses, the static
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
     # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
+    content_wrappers.append(partial(
         replace_static_urls,
         getattr(descriptor, 'data_dir', None),
         course_id=course_id,
@@ -463,18 +685,24 @@ def get_module_system_for_user(user, field_data_cache,
 
     # Allow URLs of the form '/course/' refer to the root of multicourse directory
     #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
+    content_wrappers.append(shared_parts.replace_course_urls_wrapper)
 
     # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
     # is an improvement over the /course/... format for studio authored courses,
     # because it is agnostic to course-hierarchy.
     # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
     # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
-    ))
+    content_wrappers.append(shared_parts.replace_jump_to_id_urls_wrapper)
+
+    # Wrap the output display in a single div to allow for the XModule
+    # javascript to be bound correctly
+    if shared_parts.wrap_xblock is not None:
+        block_wrappers.append(shared_parts.wrap_xblock)
+
+    # cache the output of the content wrappers for user independent views
+    fragment_cache = None
+    if settings.FEATURES.get('ENABLE_BLOCK_FRAGMENT_CACHE'):
+        fragment_cache = BlockFragmentCache(course_id, static_asset_path or descriptor.static_asset_path)
 
     if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
         if has_access(user, 'staff', descriptor, course_id):
@@ -515,15 +743,8 @@ def get_module_system_for_user(user, field_data_cache,
             course_id=course_id,
             static_asset_path=static_asset_path or descriptor.static_asset_path,
         ),
-        replace_course_urls=partial(
-            static_replace.replace_course_urls,
-            course_key=course_id
-        ),
-        replace_jump_to_id_urls=partial(
-            static_replace.replace_jump_to_id_urls,
-            course_id=course_id,
-            jump_to_id_base_url=reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''})
-        ),
+        replace_course_urls=shared_parts.replace_course_urls,
+        replace_jump_to_id_urls=shared_parts.replace_jump_to_id_urls,
         node_path=settings.NODE_PATH,
         publish=publish,
         anonymous_student_id=anonymous_student_id,
@@ -531,17 +752,19 @@ def get_module_system_for_user(user, field_data_cache,
         open_ended_grading_interface=open_ended_grading_interface,
         s3_interface=s3_interface,
         cache=cache,
-        can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
-        get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
+        can_execute_unsafe_code=shared_parts.can_execute_unsafe_code,
+        get_python_lib_zip=shared_parts.get_python_lib_zip,
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
         mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
+        content_wrappers=content_wrappers,
         wrappers=block_wrappers,
+        fragment_cache=fragment_cache,
         get_real_user=user_by_anonymous_id,
         services={
-            'i18n': ModuleI18nService(),
+            'i18n': shared_parts.i18n_service,
             'fs': xblock.reference.plugins.FSService(),
         },
-        get_user_role=lambda: get_user_role(user, course_id),
+        get_user_role=shared_parts.get_user_role,
         descriptor_runtime=descriptor.runtime,
         rebind_noauth_module_to_user=rebind_noauth_module_to_user,
         user_location=user_location,
@@ -563,7 +786,7 @@ def get_module_system_for_user(user, field_data_cache,
         )
 
     system.set(u'user_is_staff', has_access(user, u'staff', descriptor.location, course_id))
-    system.set(u'user_is_admin', has_access(user, u'staff', 'global'))
+    system.set(u'user_is_admin', shared_parts.user_is_admin)
 
     # make an ErrorDescriptor -- assuming that the descriptor's system is ok
     if has_access(user, u'staff', descriptor.location, course_id):
@@ -635,6 +858,21 @@ def find_target_student_module(request, user_id, course_id, mod_id):
     return instance
 
 
+def _apply_score_update_directly(userid, course_id, mod_id, header, data):
+    """
+    Apply an xqueue score update to its StudentModule without binding the problem if possible (see
+    courseware.xqueue_scores). Returns whether it was applied.
+    """
+    try:
+        course_key = SlashSeparatedCourseKey.from_deprecated_string(unicode(course_id))
+        usage_key = course_key.make_usage_key_from_deprecated_string(unicode(mod_id))
+        user_id = int(userid)
+    except (InvalidKeyError, ValueError):
+        return False
+    update = ScoreUpdate(user_id, course_key, usage_key, header['lms_key'], data['xqueue_body'])
+    return not apply_score_updates([update])
+
+
 @csrf_exempt
 def xqueue_callback(request, course_id, userid, mod_id, dispatch):
     '''
@@ -653,6 +891,11 @@ def xqueue_callback(request, course_id, userid, mod_id, dispatch):
     if not isinstance(header, dict) or 'lms_key' not in header:
         raise Http404
 
+    # Score updates only change the problem's state and grade; so, try applying them directly rather
+    # than rebuilding the problem
+    if dispatch == 'score_update' and _apply_score_update_directly(userid, course_id, mod_id, header, data):
+        return HttpResponse("")
+
     instance = find_target_student_module(request, userid, course_id, mod_id)
 
     # Transfer 'queuekey' from xqueue response header to the data.
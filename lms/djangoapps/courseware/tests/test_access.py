@@ -8,6 +8,7 @@ from django.test import TestCase
 from django.test.utils import override_settings
 
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
+from student.roles import CourseStaffRole
 from student.tests.factories import AnonymousUserFactory, CourseEnrollmentAllowedFactory
 from courseware.tests.tests import TEST_DATA_MIXED_MODULESTORE
 import pytz
@@ -200,6 +201,17 @@ class AccessTestCase(TestCase):
         )
         self.assertFalse(access._has_access_course_desc(user, 'enroll', course))
 
+    def test_has_access_memoized(self):
+        course_key = self.course.course_key
+        self.assertFalse(access.has_access(self.student, 'staff', course_key))
+        with self.assertNumQueries(0):
+            self.assertFalse(access.has_access(self.student, 'staff', course_key))
+            self.assertFalse(access.has_access(self.student, 'staff', self.course, course_key))
+
+        # granting a role invalidates the memoized decisions
+        CourseStaffRole(course_key).add_users(self.student)
+        self.assertTrue(access.has_access(self.student, 'staff', course_key))
+
     def test__user_passed_as_none(self):
         """Ensure has_access handles a user being passed as null"""
         access.has_access(None, 'staff', 'global', None)
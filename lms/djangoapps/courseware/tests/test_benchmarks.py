@@ -0,0 +1,72 @@
+"""
+Tests for the courseware benchmarks
+"""
+from django.conf import settings
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from courseware.benchmarks import compare_results, run_benchmarks, time_calls
+from courseware.management.commands.benchmark_courseware import scratch_store_settings
+from courseware.tests.modulestore_config import TEST_DATA_MIXED_MODULESTORE
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+
+class TestCompareResults(TestCase):
+    """
+    Test timing and comparing runs
+    """
+    def test_time_calls(self):
+        calls = []
+        timing = time_calls(lambda: calls.append(1), 3)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(timing['iterations'], 3)
+        self.assertLessEqual(timing['min_ms'], timing['median_ms'])
+        self.assertLessEqual(timing['median_ms'], timing['max_ms'])
+
+    def test_regressions(self):
+        baseline = {'benchmarks': {'mongo.grade': {'median_ms': 100}, 'split.grade': {'median_ms': 100}}}
+        results = {'benchmarks': {
+            'mongo.grade': {'median_ms': 110},
+            'split.grade': {'median_ms': 130},
+            'split.toc_for_course': {'median_ms': 500},
+        }}
+        self.assertEqual(compare_results(baseline, results, 0.2), [('split.grade', 100, 130)])
+        self.assertEqual(compare_results(baseline, results, 0.5), [])
+
+
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class TestRunBenchmarks(ModuleStoreTestCase):
+    """
+    Smoke test the benchmarks on a tiny course
+    """
+    def test_run(self):
+        config = {'chapters': 1, 'sequentials': 1, 'verticals': 1, 'problems': 1, 'students': 2, 'iterations': 1}
+        results = run_benchmarks(config, ['mongo', 'split'])
+        self.assertEqual(results['config'], config)
+        for store in ('mongo', 'split'):
+            for name in ('get_course', 'get_item', 'field_data_cache', 'toc_for_course', 'grade', 'grader',
+                         'grader_batch', 'problem_check', 'static_asset'):
+                self.assertIn('{}.{}'.format(store, name), results['benchmarks'])
+
+
+class TestScratchStoreSettings(TestCase):
+    """
+    Test that the benchmark command doesn't point the stores at the configured mongo databases
+    """
+    def test_scratch_databases(self):
+        module_store_setting, content_store_setting = scratch_store_settings()
+        configured_dbs = set(
+            store['DOC_STORE_CONFIG']['db'] for store in settings.MODULESTORE['default']['OPTIONS']['stores']
+            if 'DOC_STORE_CONFIG' in store
+        )
+        configured_dbs.add(settings.CONTENTSTORE['DOC_STORE_CONFIG']['db'])
+        scratch_dbs = set(
+            store['DOC_STORE_CONFIG']['db'] for store in module_store_setting['default']['OPTIONS']['stores']
+            if 'DOC_STORE_CONFIG' in store
+        )
+        scratch_dbs.add(content_store_setting['DOC_STORE_CONFIG']['db'])
+        self.assertFalse(configured_dbs & scratch_dbs)
+
+        # each run gets its own
+        other_module_store_setting, __ = scratch_store_settings()
+        self.assertNotEqual(module_store_setting, other_module_store_setting)
@@ -2,6 +2,7 @@
 """
 Tests for course access
 """
+import ddt
 import mock
 
 from django.test.utils import override_settings
@@ -9,13 +10,13 @@ from student.tests.factories import UserFactory
 import xmodule.modulestore.django as store_django
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.tests.xml import factories as xml
 from xmodule.tests.xml import XModuleXmlImportTest
 
 from courseware.courses import (
     get_course_by_id, get_cms_course_link, course_image_url,
-    get_course_info_section, get_course_about_section, get_cms_block_link
+    get_course_info_section, get_course_about_section, get_cms_block_link, get_course_version
 )
 from courseware.tests.helpers import get_request_for_user
 from courseware.tests.tests import TEST_DATA_MONGO_MODULESTORE, TEST_DATA_MIXED_MODULESTORE
@@ -45,6 +46,33 @@ class CoursesTest(ModuleStoreTestCase):
         self.assertEqual(cms_url, get_cms_block_link(self.course, 'course'))
 
 
+@ddt.ddt
+@override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
+class CourseVersionTest(ModuleStoreTestCase):
+    """Test that the course version changes whenever the course is published."""
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_changes_on_publish(self, default_store):
+        with self.store.default_store(default_store):
+            course = CourseFactory.create()
+            chapter = ItemFactory.create(parent_location=course.location, category='chapter')
+        version = get_course_version(self.store.get_course(course.id))
+        self.assertIsNotNone(version)
+        self.assertEqual(version, get_course_version(self.store.get_course(course.id)))
+
+        # old mongo doesn't update the course's subtree_edited_on within bulk operations
+        with self.store.bulk_operations(course.id):
+            with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course.id):
+                chapter.display_name = u"Changed"
+                self.store.update_item(chapter, self.user.id)
+            self.store.publish(chapter.location, self.user.id)
+        self.assertNotEqual(version, get_course_version(self.store.get_course(course.id)))
+
+    def test_xml(self):
+        course = self.store.get_course(SlashSeparatedCourseKey('edX', 'toy', '2012_Fall'))
+        self.assertIsNotNone(get_course_version(course))
+
+
 class ModuleStoreBranchSettingTest(ModuleStoreTestCase):
     """Test methods related to the modulestore branch setting."""
     @mock.patch(
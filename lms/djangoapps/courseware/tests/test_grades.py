@@ -1,9 +1,12 @@
 """
 Test grade calculation.
 """
+import numpy
+from django.core.cache import cache
 from django.http import Http404
+from django.test import TestCase
 from django.test.utils import override_settings
-from mock import patch
+from mock import MagicMock, patch
 
 from courseware.tests.modulestore_config import TEST_DATA_MIXED_MODULESTORE
 from student.tests.factories import UserFactory
@@ -11,7 +14,10 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
-from courseware.grades import grade, iterate_grades_for
+from courseware.grades import (
+    grade, iterate_grades_for, get_score, MaxScoresCache, grade_for_percentage, grades_for_percentages,
+    round_percents
+)
 
 
 def _grade_with_errors(student, request, course, keep_raw_scores=False):
@@ -121,3 +127,92 @@ class TestGradeIteration(ModuleStoreTestCase):
                 students_to_errors[student] = err_msg
 
         return students_to_gradesets, students_to_errors
+
+
+class TestMaxScoresCache(TestCase):
+    """
+    Test that max scores are shared via the cache rather than computed by instantiating problems.
+    """
+    def setUp(self):
+        self.course_key = SlashSeparatedCourseKey('edX', 'max_scores', '2014')
+        self.location = self.course_key.make_usage_key('problem', 'p1')
+        self.student = UserFactory.create()
+        self.descriptor = MagicMock(location=self.location, always_recalculate_grades=False, has_score=True, weight=None)
+        self.addCleanup(cache.clear)
+
+    def test_round_trip(self):
+        max_scores_cache = MaxScoresCache(u"max_scores.test")
+        max_scores_cache.set(self.location, 5)
+        max_scores_cache.push_to_remote()
+
+        fetched = MaxScoresCache(u"max_scores.test")
+        self.assertIsNone(fetched.get(self.location))
+        fetched.fetch_from_remote([self.location])
+        self.assertEqual(fetched.get(self.location), 5)
+
+        # a different course version doesn't see it
+        other_version = MaxScoresCache(u"max_scores.other")
+        other_version.fetch_from_remote([self.location])
+        self.assertIsNone(other_version.get(self.location))
+
+    def test_unknown_version(self):
+        max_scores_cache = MaxScoresCache(None)
+        max_scores_cache.set(self.location, 5)
+        max_scores_cache.push_to_remote()
+        self.assertEqual(max_scores_cache.get(self.location), 5)
+
+        fetched = MaxScoresCache(None)
+        fetched.fetch_from_remote([self.location])
+        self.assertIsNone(fetched.get(self.location))
+
+    def test_get_score_uses_cache(self):
+        max_scores_cache = MaxScoresCache(u"max_scores.test")
+        module_creator = MagicMock()
+        module_creator.return_value.max_score.return_value = 3
+        self.assertEqual(
+            get_score(self.course_key, self.student, self.descriptor, module_creator, max_scores_cache=max_scores_cache),
+            (0, 3)
+        )
+        self.assertEqual(module_creator.call_count, 1)
+
+        with patch('courseware.grades.has_access', return_value=True):
+            self.assertEqual(
+                get_score(
+                    self.course_key, self.student, self.descriptor, module_creator, max_scores_cache=max_scores_cache
+                ),
+                (0, 3)
+            )
+        self.assertEqual(module_creator.call_count, 1)
+
+    def test_get_score_checks_access(self):
+        max_scores_cache = MaxScoresCache(u"max_scores.test")
+        max_scores_cache.set(self.location, 3)
+        module_creator = MagicMock()
+        with patch('courseware.grades.has_access', return_value=False):
+            self.assertEqual(
+                get_score(
+                    self.course_key, self.student, self.descriptor, module_creator, max_scores_cache=max_scores_cache
+                ),
+                (None, None)
+            )
+        self.assertFalse(module_creator.called)
+
+
+class TestBatchGradeSummary(TestCase):
+    """
+    Test that the array versions of _grade's rounding and letter grading match it
+    """
+    def test_round_percents(self):
+        percents = [0.0, 0.1245, 0.0045, 0.505, 0.5949, 0.9999, 1.2] + [index / 1000.0 for index in range(1000)]
+        self.assertEqual(
+            list(round_percents(numpy.array(percents))),
+            [round(percent * 100 + 0.05) / 100 for percent in percents]
+        )
+
+    def test_grades_for_percentages(self):
+        cutoffs = {'A': 0.9, 'B': 0.8, 'Pass': 0.5, 'Also Pass': 0.5}
+        percents = [0.0, 0.49, 0.5, 0.79, 0.8, 0.85, 0.9, 1.0]
+        self.assertEqual(
+            list(grades_for_percentages(cutoffs, numpy.array(percents))),
+            [grade_for_percentage(cutoffs, percent) for percent in percents]
+        )
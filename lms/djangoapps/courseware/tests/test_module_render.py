@@ -2,7 +2,9 @@
 Test for lms courseware app, module render unit
 """
 import ddt
+from datetime import datetime
 from functools import partial
+from pytz import UTC
 from mock import MagicMock, patch, Mock
 import json
 
@@ -14,9 +16,11 @@ from django.test.utils import override_settings
 from django.contrib.auth.models import AnonymousUser
 
 from capa.tests.response_xml_factory import OptionResponseXMLFactory
+from capa.xqueue_interface import XQueueInterface
 from xblock.field_data import FieldData
 from xblock.runtime import Runtime
 from xblock.fields import ScopeIds
+from xmodule.fields import Date
 from xmodule.lti_module import LTIDescriptor
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -99,6 +103,25 @@ class ModuleRenderTestCase(ModuleStoreTestCase, LoginEnrollmentTestCase):
         # note if the URL mapping changes then this assertion will break
         self.assertIn('/courses/' + self.course_key.to_deprecated_string() + '/jump_to_id/vertical_test', html)
 
+    def test_shared_runtime_parts(self):
+        """
+        Modules bound with the same FieldDataCache share the block independent parts of their runtimes
+        """
+        mock_request = MagicMock()
+        mock_request.user = self.mock_user
+        course = get_course_with_access(self.mock_user, 'load', self.course_key)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course_key, self.mock_user, course, depth=2)
+        before = render.get_runtime_build_counts()
+
+        for location in (self.location, self.course_key.make_usage_key('html', 'toyjumpto')):
+            module = render.get_module(self.mock_user, mock_request, location, field_data_cache)
+            self.assertIsNotNone(module)
+
+        after = render.get_runtime_build_counts()
+        self.assertEqual(after['module_systems'] - before['module_systems'], 2)
+        self.assertEqual(after['shared_runtime_parts'] - before['shared_runtime_parts'], 1)
+
     def test_xqueue_callback_success(self):
         """
         Test for happy-path xqueue_callback
@@ -139,6 +162,11 @@ class ModuleRenderTestCase(ModuleStoreTestCase, LoginEnrollmentTestCase):
                 request = self.request_factory.post(self.callback_url, data)
                 render.xqueue_callback(request, self.course_key, self.mock_user.id, self.mock_module.id, self.dispatch)
 
+    def test_xqueue_submissions_synchronous_by_default(self):
+        # background submissions are lost if the process exits before they're sent; so, they're opt in
+        self.assertFalse(settings.FEATURES['ENABLE_ASYNC_XQUEUE_SUBMISSIONS'])
+        self.assertIs(type(render.XQUEUE_INTERFACE), XQueueInterface)
+
     def test_get_score_bucket(self):
         self.assertEquals(render.get_score_bucket(0, 10), 'incorrect')
         self.assertEquals(render.get_score_bucket(1, 10), 'partial')
@@ -409,6 +437,85 @@ class TestTOC(ModuleStoreTestCase):
                 self.assertIn(toc_section, actual)
 
 
+    def test_toc_from_outline(self):
+        course = CourseFactory.create(start=datetime(2014, 1, 1, tzinfo=UTC))
+        chapter = ItemFactory.create(parent_location=course.location, category='chapter', display_name='Chapter')
+        public = ItemFactory.create(
+            parent_location=chapter.location, category='sequential', display_name='Public',
+            metadata={'due': datetime(2014, 10, 1, tzinfo=UTC)},
+        )
+        ItemFactory.create(
+            parent_location=chapter.location, category='sequential', display_name='Staff Only',
+            metadata={'visible_to_staff_only': True},
+        )
+        course = self.store.get_course(course.id, depth=2)
+        request = RequestFactory().get('/')
+        request.user = UserFactory()
+        extended_due = datetime(2014, 10, 8, tzinfo=UTC)
+        StudentModuleFactory(
+            student=request.user, course_id=course.id, module_state_key=public.location, module_type='sequential',
+            state=json.dumps({'extended_due': Date().to_json(extended_due)}),
+        )
+
+        # the toc doesn't instantiate any modules
+        with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+            toc = render.toc_for_course(request.user, request, course, chapter.url_name, public.url_name)
+        self.assertFalse(mock_get_module.called)
+        self.assertEqual(
+            toc[0]['sections'],
+            [{'display_name': 'Public', 'url_name': public.url_name, 'format': '', 'due': extended_due,
+              'active': True, 'graded': False}]
+        )
+
+        # staff see the staff only section in the same (cached) outline
+        toc = render.toc_for_course(GlobalStaffFactory(), request, course, chapter.url_name, None)
+        self.assertEqual([section['display_name'] for section in toc[0]['sections']], ['Public', 'Staff Only'])
+
+    def test_toc_without_chapters(self):
+        course = self.store.get_course(CourseFactory.create().id, depth=2)
+        request = RequestFactory().get('/')
+        request.user = UserFactory()
+        for __ in range(2):
+            # an empty outline isn't mistaken for a user dependent one when it's cached
+            with patch('courseware.module_render._toc_for_course_modules') as mock_toc_for_modules:
+                self.assertEqual(render.toc_for_course(request.user, request, course, None, None), [])
+            self.assertFalse(mock_toc_for_modules.called)
+
+    @patch('courseware.module_render.TOC_USER_DEPENDENT_CATEGORIES', ('sequential',))
+    def test_toc_user_dependent(self):
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent_location=course.location, category='chapter', display_name='Chapter')
+        section = ItemFactory.create(parent_location=chapter.location, category='sequential', display_name='Section')
+        course = self.store.get_course(course.id, depth=2)
+        request = RequestFactory().get('/')
+        request.user = UserFactory()
+        for __ in range(2):
+            with patch('courseware.module_render._toc_for_course_modules') as mock_toc_for_modules:
+                render.toc_for_course(request.user, request, course, None, None)
+            # the modules are instantiated using a field data cache which includes the sections
+            field_data_cache = mock_toc_for_modules.call_args[0][-1]
+            self.assertIn(section.location, [descriptor.location for descriptor in field_data_cache.descriptors])
+
+    def test_toc_after_publish_in_bulk_operation(self):
+        with self.store.default_store(ModuleStoreEnum.Type.mongo):
+            course = CourseFactory.create()
+            chapter = ItemFactory.create(parent_location=course.location, category='chapter', display_name='Chapter')
+            section = ItemFactory.create(parent_location=chapter.location, category='sequential', display_name='Old')
+        request = RequestFactory().get('/')
+        request.user = UserFactory()
+        toc = render.toc_for_course(request.user, request, self.store.get_course(course.id, depth=2), None, None)
+        self.assertEqual(toc[0]['sections'][0]['display_name'], 'Old')
+
+        # old mongo doesn't update the course's subtree_edited_on within bulk operations
+        with self.store.bulk_operations(course.id):
+            with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course.id):
+                section.display_name = 'New'
+                self.store.update_item(section, self.user.id)
+            self.store.publish(section.location, self.user.id)
+        toc = render.toc_for_course(request.user, request, self.store.get_course(course.id, depth=2), None, None)
+        self.assertEqual(toc[0]['sections'][0]['display_name'], 'New')
+
+
 @override_settings(MODULESTORE=TEST_DATA_MIXED_MODULESTORE)
 class TestHtmlModifiers(ModuleStoreTestCase):
     """
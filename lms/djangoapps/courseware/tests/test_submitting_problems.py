@@ -5,6 +5,7 @@ Integration tests for submitting problem responses and getting grades.
 # text processing dependencies
 import json
 import os
+from datetime import timedelta
 from textwrap import dedent
 
 from mock import patch
@@ -14,10 +15,11 @@ from django.contrib.auth.models import User
 from django.test.client import RequestFactory
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
+from django.utils import timezone
 
 # Need access to internal func to put users in the right group
-from courseware import grades
-from courseware.models import StudentModule
+from courseware import answer_distributions, grades
+from courseware.models import AnswerDistributionLog, StudentModule
 
 #import factories and parent testcase modules
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -1053,6 +1055,84 @@ class TestAnswerDistributions(TestSubmittingProblems):
                 }
             )
 
+    def student_module(self, problem_name):
+        """
+        The StudentModule of our user's submission to problem_name
+        """
+        return next(
+            student_module
+            for student_module in StudentModule.objects.filter(course_id=self.course.id, student=self.student_user)
+            if student_module.module_state_key.name == problem_name
+        )
+
+    def assert_counts_match(self):
+        """
+        Asserts the precomputed answer distributions are the ones computed from the StudentModules
+        """
+        self.assertEqual(
+            answer_distributions.get_answer_distributions(self.course.id),
+            grades.answer_distributions(self.course.id)
+        )
+
+    def test_precomputed_not_rebuilt(self):
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.assertIsNone(answer_distributions.get_answer_distributions(self.course.id))
+
+        self.assertEqual(answer_distributions.rebuild(self.course.id), 1)
+        self.assert_counts_match()
+
+    def test_needs_rebuild(self):
+        self.assertTrue(answer_distributions.needs_rebuild(self.course.id))
+        answer_distributions.rebuild(self.course.id)
+        self.assertFalse(answer_distributions.needs_rebuild(self.course.id))
+        AnswerDistributionLog.objects.filter(course_id=self.course.id).update(
+            created=timezone.now() - answer_distributions.REBUILD_INTERVAL - timedelta(minutes=1)
+        )
+        self.assertTrue(answer_distributions.needs_rebuild(self.course.id))
+
+    def test_precomputed_kept_up_to_date(self):
+        answer_distributions.rebuild(self.course.id)
+        self.assert_counts_match()
+
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        self.assert_counts_match()
+
+        # another student's submissions (as test_multiple_students)
+        user2 = UserFactory.create()
+        for problem in StudentModule.objects.filter(course_id=self.course.id, student=self.student_user):
+            problem.student_id = user2.id
+            problem.save()
+        self.submit_question_answer('p1', {'2_1': u'Incorrect'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        self.assert_counts_match()
+
+        # changed answers move counts
+        self.submit_question_answer('p1', {'2_1': u'ⓤⓝⓘⓒⓞⓓⓔ'})
+        self.assert_counts_match()
+
+        student_module = self.student_module('p1')
+        for new_state in ('invalid json!', None, '{"student_answers": {}}'):
+            student_module.state = new_state
+            student_module.save()
+            self.assert_counts_match()
+
+        # missing content (as test_missing_content)
+        student_module = self.student_module('p2')
+        student_module.module_state_key = student_module.module_state_key.replace(
+            name=student_module.module_state_key.name + "_fake"
+        )
+        student_module.save()
+        self.assert_counts_match()
+
+        StudentModule.objects.filter(course_id=self.course.id, student=user2).delete()
+        self.assert_counts_match()
+
+        # a rebuild counts the same
+        counts = answer_distributions.get_answer_distributions(self.course.id)
+        answer_distributions.rebuild(self.course.id)
+        self.assertEqual(answer_distributions.get_answer_distributions(self.course.id), counts)
+
 
 class TestConditionalContent(TestSubmittingProblems):
     """
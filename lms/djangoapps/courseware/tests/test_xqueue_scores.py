@@ -0,0 +1,73 @@
+"""
+Tests for applying xqueue score updates directly to StudentModules
+"""
+import json
+
+from django.test import TestCase
+from mock import patch
+
+from capa.responsetypes import CodeResponse
+from courseware.models import StudentModule
+from courseware.tests.factories import StudentModuleFactory
+from courseware.xqueue_scores import ScoreUpdate, apply_score_updates
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+
+class ApplyScoreUpdatesTest(TestCase):
+    """
+    Test apply_score_updates
+    """
+    def setUp(self):
+        self.course_key = SlashSeparatedCourseKey("MITx", "999", "Robot_Super_Course")
+        self.usage_key = self.course_key.make_usage_key('problem', 'code')
+        queued = {'key': 'secret', 'time': '20140101000000'}
+        self.state = {
+            'student_answers': {'1_2_1': 'print 1', '1_3_1': 'print 2'},
+            'correct_map': {
+                '1_2_1': {'correctness': 'incomplete', 'npoints': None, 'msg': '3', 'hint': '', 'hintmode': None,
+                          'queuestate': queued},
+                '1_3_1': {'correctness': 'correct', 'npoints': None, 'msg': '', 'hint': '', 'hintmode': None,
+                          'queuestate': None},
+            },
+        }
+        self.student_module = StudentModuleFactory.create(
+            course_id=self.course_key, module_state_key=self.usage_key, state=json.dumps(self.state),
+            grade=1, max_grade=3,
+        )
+
+    def _update(self, queuekey='secret', score_msg=None):
+        """
+        A ScoreUpdate for the student module
+        """
+        if score_msg is None:
+            score_msg = json.dumps({'correct': True, 'score': 2, 'msg': '<p>Good&nbsp;job</p>'})
+        return ScoreUpdate(self.student_module.student_id, self.course_key, self.usage_key, queuekey, score_msg)
+
+    def test_applied(self):
+        self.assertEqual(apply_score_updates([self._update()]), [])
+        student_module = StudentModule.objects.get(id=self.student_module.id)
+        correct_map = json.loads(student_module.state)['correct_map']
+        self.assertEqual(correct_map['1_2_1']['npoints'], 2)
+        self.assertEqual(correct_map['1_2_1']['correctness'], 'correct')
+        self.assertEqual(correct_map['1_2_1']['msg'], '<p>Good&#160;job</p>')
+        self.assertIsNone(correct_map['1_2_1']['queuestate'])
+        self.assertEqual(student_module.grade, 3)
+
+    def test_wrong_queuekey(self):
+        # left to the problem (which ignores it) rather than saved or counted
+        update = self._update(queuekey='stale')
+        with patch.object(CodeResponse, 'record_score_metrics') as mock_record_score_metrics:
+            self.assertEqual(apply_score_updates([update]), [update])
+        self.assertFalse(mock_record_score_metrics.called)
+        student_module = StudentModule.objects.get(id=self.student_module.id)
+        self.assertEqual(student_module.modified, self.student_module.modified)
+        self.assertEqual(json.loads(student_module.state)['correct_map']['1_2_1']['correctness'], 'incomplete')
+
+    def test_not_applied(self):
+        invalid = self._update(score_msg='not json')
+        missing = self._update()._replace(usage_key=self.course_key.make_usage_key('problem', 'missing'))
+        self.assertEqual(apply_score_updates([invalid, missing]), [invalid, missing])
+
+        StudentModule.objects.filter(id=self.student_module.id).update(max_grade=None)
+        update = self._update()
+        self.assertEqual(apply_score_updates([update]), [update])
@@ -311,8 +311,10 @@ def _index_bulk_op(request, user, course_key, chapter, section, position):
     masq = setup_masquerade(request, staff_access)
 
     try:
+        # only the course's and chapters' state (their positions) is needed here; the accordion comes
+        # from the course's cached toc outline or, if that depends on the user, from its own deeper cache
         field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            course_key, user, course, depth=2)
+            course_key, user, course, depth=1)
 
         course_module = get_module_for_descriptor(user, request, course, field_data_cache, course_key)
         if course_module is None:
@@ -324,7 +326,7 @@ def _index_bulk_op(request, user, course_key, chapter, section, position):
 
         context = {
             'csrf': csrf(request)['csrf_token'],
-            'accordion': render_accordion(request, course, chapter, section, field_data_cache),
+            'accordion': render_accordion(request, course, chapter, section, None),
             'COURSE_TITLE': course.display_name_with_default,
             'course': course,
             'init': '',
@@ -0,0 +1,107 @@
+"""
+Apply xqueue graders' score updates to problems' StudentModule state without rebuilding the problems.
+
+An external grader's reply only changes the correct map entry of the answer it graded (the one whose
+queuestate has the reply's queuekey) and, from the correct map, the problem's grade. So, rather than
+binding the problem and its FieldDataCache per reply, :func:`apply_score_updates` reads the replies'
+StudentModules in one query and updates their state and grades in place. The updates it can't apply
+that way (e.g., the reply isn't valid or the problem has never been graded and so has no max grade) are
+returned for the caller to apply through the problem (see module_render.xqueue_callback).
+"""
+import json
+import logging
+from collections import namedtuple, OrderedDict
+from operator import or_
+
+import dogstats_wrapper as dog_stats_api
+from django.db import transaction
+from django.db.models import Q
+
+from capa.capa_problem import LoncapaProblem
+from capa.correctmap import CorrectMap
+from capa.responsetypes import CodeResponse
+from courseware.models import StudentModule
+
+log = logging.getLogger(__name__)
+
+# An xqueue grader's reply for a user's problem
+ScoreUpdate = namedtuple('ScoreUpdate', 'user_id course_key usage_key queuekey score_msg')
+
+
+@transaction.commit_on_success
+def apply_score_updates(updates):
+    """
+    Apply the ScoreUpdates which can be applied directly to their StudentModules. Each StudentModule is read
+    (locked until the updates are committed) and saved once however many of the updates are for it.
+
+    Returns the updates which weren't applied (in their original order).
+    """
+    if not updates:
+        return []
+
+    by_module = OrderedDict()
+    for update in updates:
+        by_module.setdefault((update.user_id, update.usage_key), []).append(update)
+
+    student_modules = {
+        (student_module.student_id, student_module.module_state_key.map_into_course(student_module.course_id)):
+        student_module
+        for student_module in StudentModule.objects.select_for_update().filter(reduce(or_, [
+            Q(student_id=user_id, course_id=module_updates[0].course_key, module_state_key=usage_key)
+            for (user_id, usage_key), module_updates in by_module.iteritems()
+        ]))
+    }
+
+    not_applied = []
+    for key, module_updates in by_module.iteritems():
+        student_module = student_modules.get(key)
+        # apply all or none of a module's updates so that they're applied in order
+        if student_module is None or not _apply_to_student_module(student_module, module_updates):
+            not_applied.extend(module_updates)
+    return [update for update in updates if update in not_applied]
+
+
+def _apply_to_student_module(student_module, updates):
+    """
+    Apply updates to student_module's correct map and grade and save it. Returns whether it could: if any
+    update isn't valid or no answer is waiting for it, none are applied.
+    """
+    if student_module.module_type != 'problem' or student_module.max_grade is None:
+        return False
+    state = json.loads(student_module.state or '{}')
+    correct_map = CorrectMap()
+    correct_map.set_dict(state.get('correct_map') or {})
+
+    replies = []
+    for update in updates:
+        (valid_score_msg, correct, points, msg) = CodeResponse.parse_score_msg(update.score_msg)
+        if not valid_score_msg:
+            return False
+        replies.append((update.queuekey, correct, points, msg))
+
+    for queuekey, correct, points, msg in replies:
+        # as CodeResponse.update_score: only the answer waiting for this reply is updated
+        updated = [
+            answer_id for answer_id in correct_map.keys()
+            if CodeResponse.set_score(correct_map, answer_id, queuekey, correct, points, msg)
+        ]
+        if not updated:
+            return False
+
+    for __, correct, points, __ in replies:
+        CodeResponse.record_score_metrics(correct, points)
+    state['correct_map'] = correct_map.get_dict()
+    student_module.state = json.dumps(state)
+    student_module.grade = LoncapaProblem.score_from_correct_map(correct_map, state.get('student_answers'))
+    student_module.save()
+
+    # pylint: disable=cyclic-import
+    from courseware.module_render import get_score_bucket
+    dog_stats_api.increment("lms.courseware.question_answered", tags=[
+        u"org:{}".format(student_module.course_id.org),
+        u"course:{}".format(student_module.course_id),
+        u"score_bucket:{0}".format(get_score_bucket(student_module.grade, student_module.max_grade)),
+        u"type:xqueue",
+    ])
+    log.debug(u"Applied %d xqueue score updates to %s directly", len(replies), student_module.module_state_key)
+    return True
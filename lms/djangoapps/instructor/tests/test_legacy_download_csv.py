@@ -9,6 +9,7 @@ Notes for running by hand:
 """
 
 from django.test.utils import override_settings
+from mock import patch
 
 # Need access to internal func to put users in the right group
 from django.contrib.auth.models import User
@@ -71,3 +72,11 @@ class TestInstructorDashboardGradeDownloadCSV(ModuleStoreTestCase, LoginEnrollme
 '''
 
         self.assertEqual(body, expected_body, msg)
+
+    def test_download_answer_distributions_not_counted(self):
+        url = reverse('instructor_dashboard_legacy', kwargs={'course_id': self.toy.id.to_deprecated_string()})
+        with patch('instructor.views.legacy.submit_rebuild_answer_distributions') as mock_submit:
+            response = self.client.post(url, {'action': 'Download CSV of answer distributions'})
+        self.assertTrue(mock_submit.called)
+        self.assertNotEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('The answer distributions are being computed', response.content)
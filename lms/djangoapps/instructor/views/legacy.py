@@ -40,7 +40,7 @@ from lms.lib.xblock.runtime import quote_slashes
 from submissions import api as sub_api  # installed from the edx-submissions repository
 
 from bulk_email.models import CourseEmail, CourseAuthorization
-from courseware import grades
+from courseware import answer_distributions
 from courseware.access import has_access
 from courseware.courses import get_course_with_access, get_cms_course_link
 from student.roles import (
@@ -59,8 +59,10 @@ from instructor_task.api import (
     submit_rescore_problem_for_all_students,
     submit_rescore_problem_for_student,
     submit_reset_problem_attempts_for_all_students,
-    submit_bulk_course_email
+    submit_bulk_course_email,
+    submit_rebuild_answer_distributions
 )
+from instructor_task.api_helper import AlreadyRunningError
 from instructor_task.views import get_task_completion_info
 from edxmako.shortcuts import render_to_response, render_to_string
 from class_dashboard import dashboard_data
@@ -252,7 +254,10 @@ def instructor_dashboard(request, course_id):
 
     elif 'Download CSV of answer distributions' in action:
         track.views.server_track(request, "dump-answer-dist-csv", {}, page="idashboard")
-        return return_csv('answer_dist_{0}.csv'.format(course_key.to_deprecated_string()), get_answers_distribution(request, course_key))
+        answers_distribution = get_answers_distribution(request, course_key)
+        if answers_distribution is not None:
+            return return_csv('answer_dist_{0}.csv'.format(course_key.to_deprecated_string()), answers_distribution)
+        msg += _("The answer distributions are being computed. Please try again in a few minutes.")
 
     elif 'Dump description of graded assignments configuration' in action:
         # what is "graded assignments configuration"?
@@ -1723,10 +1728,20 @@ def get_answers_distribution(request, course_key):
     Return a dict with two keys:
     'header': a header row
     'data': a list of rows
+
+    or None if the course's answers have never been counted. Either then or if the counts are due to be
+    rebuilt, a background task to count them is submitted (unless one already is running).
     """
     course = get_course_with_access(request.user, 'staff', course_key)
 
-    dist = grades.answer_distributions(course.id)
+    dist = answer_distributions.get_answer_distributions(course.id)
+    if dist is None or answer_distributions.needs_rebuild(course.id):
+        try:
+            submit_rebuild_answer_distributions(request, course.id)
+        except AlreadyRunningError:
+            pass
+    if dist is None:
+        return None
 
     d = {}
     d['header'] = ['url_name', 'display name', 'answer id', 'answer', 'count']
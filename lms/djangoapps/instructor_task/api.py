@@ -18,7 +18,8 @@ from instructor_task.tasks import (rescore_problem,
                                    delete_problem_state,
                                    send_bulk_course_email,
                                    calculate_grades_csv,
-                                   calculate_students_features_csv)
+                                   calculate_students_features_csv,
+                                   rebuild_answer_distributions)
 
 from instructor_task.api_helper import (check_arguments_for_rescoring,
                                         encode_problem_and_student_input,
@@ -233,3 +234,17 @@ def submit_calculate_students_features_csv(request, course_key, features):
     task_key = ""
 
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_rebuild_answer_distributions(request, course_key):
+    """
+    Submits a task to recount the course's answer distributions.
+
+    Raises AlreadyRunningError if they're already being recounted.
+    """
+    task_type = 'rebuild_answer_distributions'
+    task_class = rebuild_answer_distributions
+    task_input = {}
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
@@ -31,7 +31,8 @@ from instructor_task.tasks_helper import (
     reset_attempts_module_state,
     delete_problem_module_state,
     upload_grades_csv,
-    upload_students_csv
+    upload_students_csv,
+    rebuild_answer_distribution_counts
 )
 from bulk_email.tasks import perform_delegate_email_batches
 
@@ -153,3 +154,14 @@ def calculate_students_features_csv(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('generated')
     task_fn = partial(upload_students_csv, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=E1102
+def rebuild_answer_distributions(entry_id, xmodule_instance_args):
+    """
+    Recount a course's answer distributions from its StudentModules.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('counted')
+    task_fn = partial(rebuild_answer_distribution_counts, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
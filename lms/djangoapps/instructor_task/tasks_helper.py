@@ -19,6 +19,7 @@ from pytz import UTC
 from xmodule.modulestore.django import modulestore
 from track.views import task_track
 
+from courseware import answer_distributions
 from courseware.grades import iterate_grades_for
 from courseware.models import StudentModule
 from courseware.model_data import FieldDataCache
@@ -624,3 +625,25 @@ def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input
     upload_csv_to_report_store(rows, 'student_profile_info', course_id, start_date)
 
     return task_progress.update_task_state(extra_meta=current_step)
+
+
+def rebuild_answer_distribution_counts(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    """
+    For a given `course_id`, recount the answer distributions of all of its
+    submitted problems so that they can be served without reading StudentModules.
+    """
+    start_time = time()
+    total = StudentModule.all_submitted_problems_read_only(course_id).count()
+    task_progress = TaskProgress(action_name, total, start_time)
+    current_step = {'step': 'Counting answers'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    def progress(counted):
+        """
+        Update the task status as each batch of StudentModules is counted
+        """
+        task_progress.attempted = task_progress.succeeded = counted
+        task_progress.update_task_state(extra_meta=current_step)
+
+    progress(answer_distributions.rebuild(course_id, progress))
+    return task_progress.update_task_state(extra_meta=current_step)
@@ -16,6 +16,7 @@ from instructor_task.api import (
     submit_delete_problem_state_for_all_students,
     submit_bulk_course_email,
     submit_calculate_students_features_csv,
+    submit_rebuild_answer_distributions,
 )
 
 from instructor_task.api_helper import AlreadyRunningError
@@ -202,3 +203,10 @@ class InstructorTaskCourseSubmitTest(InstructorTaskCourseTestCase):
             features=[]
         )
         self._test_resubmission(api_call)
+
+    def test_submit_rebuild_answer_distributions(self):
+        api_call = lambda: submit_rebuild_answer_distributions(
+            self.create_task_request(self.instructor),
+            self.course.id
+        )
+        self._test_resubmission(api_call)
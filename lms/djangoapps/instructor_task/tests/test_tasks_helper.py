@@ -4,6 +4,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 Tests that CSV grade report generation works with unicode emails.
 
 """
+import json
 import os
 import shutil
 
@@ -16,10 +17,14 @@ from django.test.testcases import TestCase
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
+from courseware.models import AnswerDistributionCount, AnswerDistributionLog
+from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
 
 from instructor_task.models import ReportStore
-from instructor_task.tasks_helper import upload_grades_csv, upload_students_csv
+from instructor_task.tasks_helper import (
+    rebuild_answer_distribution_counts, upload_grades_csv, upload_students_csv
+)
 
 
 class TestReport(ModuleStoreTestCase):
@@ -118,3 +123,31 @@ class TestStudentReport(TestReport):
         #This assertion simply confirms that the generation completed with no errors
         num_students = len(students)
         self.assertDictContainsSubset({'attempted': num_students, 'succeeded': num_students, 'failed': 0}, result)
+
+
+class TestRebuildAnswerDistributions(ModuleStoreTestCase):
+    """
+    Tests that recounting a course's answer distributions works.
+    """
+    def setUp(self):
+        self.course = CourseFactory.create()
+        self.problem_key = self.course.id.make_usage_key('problem', 'p1')
+
+    def test_success(self):
+        for answer in ('a', 'a', 'b'):
+            StudentModuleFactory.create(
+                course_id=self.course.id, module_state_key=self.problem_key, grade=1, max_grade=1,
+                state=json.dumps({'student_answers': {'p1_2_1': answer}}),
+            )
+        # the counts kept as they were saved are replaced
+        AnswerDistributionCount.objects.filter(course_id=self.course.id).delete()
+
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            result = rebuild_answer_distribution_counts(None, None, self.course.id, {}, 'counted')
+
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0, 'total': 3}, result)
+        self.assertEqual(
+            dict(AnswerDistributionCount.objects.filter(course_id=self.course.id).values_list('answer', 'count')),
+            {'a': 2, 'b': 1}
+        )
+        self.assertTrue(AnswerDistributionLog.objects.filter(course_id=self.course.id).exists())
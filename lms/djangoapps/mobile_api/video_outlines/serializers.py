@@ -1,9 +1,9 @@
 """
 Serializer for video outline
 """
-from rest_framework.reverse import reverse
+from django.core.urlresolvers import reverse
 
-from courseware.access import has_access
+from courseware.access import has_access, DescriptorAccessSnapshot
 
 from edxval.api import (
     get_video_info_for_course_and_profile, ValInternalError
@@ -13,13 +13,16 @@ from edxval.api import (
 class BlockOutline(object):
     """
     Serializes course videos, pulling data from VAL and the video modules.
+
+    The outline is the same for every user and request: its urls are host relative and each entry
+    carries a snapshot of its block's access fields under "access". Use :func:`outline_for_user` to
+    filter it to what a user may load and to make its urls absolute for a request.
     """
-    def __init__(self, course_id, start_block, categories_to_outliner, request):
+    def __init__(self, course_id, start_block, categories_to_outliner):
         """Create a BlockOutline using `start_block` as a starting point."""
         self.start_block = start_block
         self.categories_to_outliner = categories_to_outliner
         self.course_id = course_id
-        self.request = request  # needed for making full URLS
         self.local_cache = {}
         try:
             self.local_cache['course_videos'] = get_video_info_for_course_and_profile(
@@ -29,82 +32,79 @@ class BlockOutline(object):
             self.local_cache['course_videos'] = {}
 
     def __iter__(self):
-        child_to_parent = {}
-        stack = [self.start_block]
-
-        # path should be optional
-        def path(block):
-            """path for block"""
-            block_path = []
-            while block in child_to_parent:
-                block = child_to_parent[block]
-                if block is not self.start_block:
-                    block_path.append({
-                        'name': block.display_name,
-                        'category': block.category,
-                    })
-            return reversed(block_path)
-
-        def find_urls(block):
-            """section and unit urls for block"""
-            block_path = []
-            while block in child_to_parent:
-                block = child_to_parent[block]
-                block_path.append(block)
-
-            course, chapter, section, unit = list(reversed(block_path))[:4]
-            position = 1
-            unit_name = unit.url_name
-            for block in section.children:
-                if block.name == unit_name:
-                    break
-                position += 1
+        # each position of a unit in its section by the unit's name so sections aren't rescanned per video
+        unit_positions = {}
+
+        def find_urls(ancestors):
+            """section and unit urls for a block with the given ancestors"""
+            course, chapter, section, unit = ancestors[:4]
+            if section.location not in unit_positions:
+                unit_positions[section.location] = {}
+                # the first child of a name wins as it did when scanning
+                for position, child in reversed(list(enumerate(section.children, 1))):
+                    unit_positions[section.location][child.name] = position
+            position = unit_positions[section.location].get(unit.url_name, len(section.children) + 1)
 
             kwargs = dict(
                 course_id=course.id.to_deprecated_string(),
                 chapter=chapter.url_name,
                 section=section.url_name
             )
-            section_url = reverse(
-                "courseware_section",
-                kwargs=kwargs,
-                request=self.request,
-            )
+            section_url = reverse("courseware_section", kwargs=kwargs)
             kwargs['position'] = position
-            unit_url = reverse(
-                "courseware_position",
-                kwargs=kwargs,
-                request=self.request,
-            )
+            unit_url = reverse("courseware_position", kwargs=kwargs)
             return unit_url, section_url
 
-        user = self.request.user
-
+        # (block, its ancestors starting at start_block)
+        stack = [(self.start_block, ())]
         while stack:
-            curr_block = stack.pop()
+            curr_block, ancestors = stack.pop()
 
             if curr_block.category in self.categories_to_outliner:
-                if not has_access(user, 'load', curr_block, course_key=self.course_id):
-                    continue
-
                 summary_fn = self.categories_to_outliner[curr_block.category]
-                block_path = list(path(curr_block))
-                unit_url, section_url = find_urls(curr_block)
+                block_path = [
+                    {'name': block.display_name, 'category': block.category}
+                    for block in ancestors[1:]
+                ]
+                unit_url, section_url = find_urls(ancestors)
                 yield {
                     "path": block_path,
                     "named_path": [b["name"] for b in block_path[:-1]],
                     "unit_url": unit_url,
                     "section_url": section_url,
-                    "summary": summary_fn(self.course_id, curr_block, self.request, self.local_cache)
+                    "summary": summary_fn(self.course_id, curr_block, self.local_cache),
+                    "access": DescriptorAccessSnapshot.from_descriptor(curr_block).to_json(),
                 }
 
             if curr_block.has_children:
+                child_ancestors = ancestors + (curr_block,)
                 for block in reversed(curr_block.get_children()):
-                    stack.append(block)
-                    child_to_parent[block] = curr_block
+                    stack.append((block, child_ancestors))
 
 
-def video_summary(course, course_id, video_descriptor, request, local_cache):
+def outline_for_user(outline, user, course_id, request):
+    """
+    The entries of outline (from :class:`BlockOutline`) which user may load with absolute urls for request
+    """
+    user_outline = []
+    for entry in outline:
+        if not has_access(user, 'load', DescriptorAccessSnapshot.from_json(entry['access']), course_key=course_id):
+            continue
+        summary = dict(entry['summary'])
+        summary['transcripts'] = {
+            lang: request.build_absolute_uri(url) for lang, url in summary['transcripts'].iteritems()
+        }
+        user_outline.append({
+            "path": entry["path"],
+            "named_path": entry["named_path"],
+            "unit_url": request.build_absolute_uri(entry["unit_url"]),
+            "section_url": request.build_absolute_uri(entry["section_url"]),
+            "summary": summary,
+        })
+    return user_outline
+
+
+def video_summary(course, course_id, video_descriptor, local_cache):
     """
     returns summary dict for the given video module
     """
@@ -133,7 +133,6 @@ def video_summary(course, course_id, video_descriptor, request, local_cache):
                 'block_id': video_descriptor.scope_ids.usage_id.block_id,
                 'lang': lang
             },
-            request=request,
         )
         for lang in transcript_langs
     }
@@ -11,6 +11,7 @@ from django.test.utils import override_settings
 from django.conf import settings
 from rest_framework.test import APITestCase
 from edxval import api
+from mock import patch
 from uuid import uuid4
 import copy
 
@@ -175,3 +176,70 @@ class TestVideoOutline(ModuleStoreTestCase, APITestCase):
         url = reverse('video-transcripts-detail', kwargs=kwargs)
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
+
+    def test_etag(self):
+        url = reverse('video-summary-list', kwargs={'course_id': unicode(self.course.id)})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # changing the course changes the outline's version
+        ItemFactory.create(
+            parent_location=self.other_unit.location,
+            category="video",
+            display_name=u"test video omega 2 \u03a9",
+            html5_sources=[self.html5_video_url]
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)  # pylint: disable=E1103
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changed_with_encodings(self):
+        # VAL's encodings change without the course changing
+        url = reverse('video-summary-list', kwargs={'course_id': unicode(self.course.id)})
+        outline = [{'summary': {'id': 'video', 'size': 1}}]
+        with patch('mobile_api.video_outlines.views.outline_for_user', return_value=outline):
+            etag = self.client.get(url)['ETag']
+        outline = [{'summary': {'id': 'video', 'size': 2}}]
+        with patch('mobile_api.video_outlines.views.outline_for_user', return_value=outline):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changed_in_bulk_operation(self):
+        url = reverse('video-summary-list', kwargs={'course_id': unicode(self.course.id)})
+        etag = self.client.get(url)['ETag']
+
+        # old mongo doesn't update the course's subtree_edited_on within bulk operations (e.g., imports)
+        with self.store.bulk_operations(self.course.id):
+            ItemFactory.create(
+                parent_location=self.other_unit.location,
+                category="video",
+                display_name=u"test video omega 2 \u03a9",
+                html5_sources=[self.html5_video_url]
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_outline_filtered_per_user(self):
+        ItemFactory.create(
+            parent_location=self.unit.location,
+            category="video",
+            edx_video_id=self.edx_video_id,
+            display_name=u"test draft video omega \u03a9",
+            visible_to_staff_only=True,
+        )
+        url = reverse('video-summary-list', kwargs={'course_id': unicode(self.course.id)})
+        response = self.client.get(url)
+        self.assertEqual(len(response.data), 1)  # pylint: disable=E1103
+
+        # the cached outline still has the staff only video for staff
+        staff = UserFactory.create(is_staff=True)
+        self.client.login(username=staff.username, password='test')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data), 2)  # pylint: disable=E1103
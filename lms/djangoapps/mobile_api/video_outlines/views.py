@@ -6,11 +6,14 @@ only displayed at the course level. This is because it makes it a lot easier to
 optimize and reason about, and it avoids having to tackle the bigger problem of
 general XBlock representation in this rather specialized formatting.
 """
+import hashlib
+import json
 from functools import partial
 
+from django.core.cache import cache
 from django.http import Http404, HttpResponse
 
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.authentication import OAuth2Authentication, SessionAuthentication
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
@@ -18,10 +21,14 @@ from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import BlockUsageLocator
 
 from courseware.access import has_access
+from courseware.courses import get_course_version
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import modulestore
 
-from .serializers import BlockOutline, video_summary
+from .serializers import BlockOutline, outline_for_user, video_summary
+
+# how long to keep a course version's video outline; VAL's encodings can change w/o the course changing
+VIDEO_OUTLINE_CACHE_TIMEOUT = 60 * 60
 
 
 class VideoSummaryList(generics.ListAPIView):
@@ -76,23 +83,44 @@ class VideoSummaryList(generics.ListAPIView):
                 * id: The unique identifier for the video.
 
                 * size: The size of the video file
+
+    **Caching**
+
+        The response has an ETag. Send it back in an If-None-Match header
+        to get a 304 with no body if the outline hasn't changed.
     """
     authentication_classes = (OAuth2Authentication, SessionAuthentication)
     permission_classes = (permissions.IsAuthenticated,)
 
     def list(self, request, *args, **kwargs):
         course_id = CourseKey.from_string(kwargs['course_id'])
-        course = get_mobile_course(course_id, request.user)
-
-        video_outline = list(
-            BlockOutline(
-                course_id,
-                course,
-                {"video": partial(video_summary, course)},
-                request,
+        # the outline is cached per course version; so, don't load the whole course unless it's not
+        course = get_mobile_course(course_id, request.user, depth=0)
+        cache_key = _video_outline_cache_key(course)
+        outline = cache.get(cache_key) if cache_key is not None else None
+        if outline is None:
+            course = modulestore().get_course(course_id, depth=None)
+            outline = list(
+                BlockOutline(
+                    course_id,
+                    course,
+                    {"video": partial(video_summary, course)},
+                )
             )
-        )
-        return Response(video_outline)
+            if cache_key is not None:
+                cache.set(cache_key, outline, VIDEO_OUTLINE_CACHE_TIMEOUT)
+
+        video_outline = outline_for_user(outline, request.user, course_id, request)
+        # the response itself (not the course version: VAL's encodings change without it) determines the ETag
+        etag = '"{}"'.format(hashlib.md5(
+            json.dumps(video_outline, sort_keys=True, default=unicode)
+        ).hexdigest())
+        if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(video_outline)
+        response['ETag'] = etag
+        return response
 
 
 class VideoTranscripts(generics.RetrieveAPIView):
@@ -133,12 +161,23 @@ class VideoTranscripts(generics.RetrieveAPIView):
         return response
 
 
-def get_mobile_course(course_id, user):
+def _video_outline_cache_key(course):
+    """
+    The cache key of the video outline of course's current version (None if the version is unknown, in
+    which case the outline can't be cached)
+    """
+    version = get_course_version(course)
+    if version is None:
+        return None
+    return u"mobile_api.video_outline.{}.{}".format(course.id, version)
+
+
+def get_mobile_course(course_id, user, depth=None):
     """
     Return only a CourseDescriptor if the course is mobile-ready or if the
     requesting user is a staff member.
     """
-    course = modulestore().get_course(course_id, depth=None)
+    course = modulestore().get_course(course_id, depth=depth)
     if course.mobile_available or has_access(user, 'staff', course):
         return course
 
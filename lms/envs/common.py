@@ -65,6 +65,17 @@ FEATURES = {
     'DISPLAY_DEBUG_INFO_TO_STAFF': True,
     'DISPLAY_HISTOGRAMS_TO_STAFF': False,  # For large courses this slows down courseware access for staff.
 
+    # Cache the rendered html of blocks whose views are the same for every user (e.g., html, static tabs, and
+    # course info) keyed by the block's version. See lms.lib.xblock.fragment_cache.
+    'ENABLE_BLOCK_FRAGMENT_CACHE': True,
+
+    # Profile a sample of requests (see REQUEST_PROFILER and request_profiler.middleware)
+    'ENABLE_REQUEST_PROFILER': False,
+
+    # Send CodeResponse submissions to xqueue from background threads (see capa.xqueue_interface).
+    # Submissions still queued in memory when a process exits are lost.
+    'ENABLE_ASYNC_XQUEUE_SUBMISSIONS': False,
+
     'REROUTE_ACTIVATION_EMAIL': False,  # nonempty string = address for all activation emails
     'DEBUG_LEVEL': 0,  # 0 = lowest level, least verbose, 255 = max level, most verbose
 
@@ -822,6 +833,22 @@ ZENDESK_API_KEY = None
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
 
+##### Request profiler (see FEATURES['ENABLE_REQUEST_PROFILER']) #####
+REQUEST_PROFILER = {
+    # the fraction of requests to profile; global staff can always ask for a panel with ?profile
+    'SAMPLE_RATE': 0,
+    'PANEL_PARAMETER': 'profile',
+    'COUNTERS': {
+        'runtime': 'courseware.module_render.get_runtime_build_counts',
+        'fragment_cache': 'lms.lib.xblock.fragment_cache.get_fragment_cache_stats',
+    },
+    # the comment client's modules each import perform_request by name
+    'FUNCTION_HOOKS': tuple(
+        ('lms.lib.comment_client.{}'.format(module), 'perform_request', 'comment_service')
+        for module in ('utils', 'comment', 'models', 'thread', 'user')
+    ),
+}
+
 ##### shoppingcart Payment #####
 PAYMENT_SUPPORT_EMAIL = 'payment@example.com'
 
@@ -898,6 +925,8 @@ TEMPLATE_LOADERS = (
 
 MIDDLEWARE_CLASSES = (
     'request_cache.middleware.RequestCache',
+    # must follow RequestCache which clears the profile's request cache
+    'request_profiler.middleware.RequestProfilerMiddleware',
     'microsite_configuration.middleware.MicrositeMiddleware',
     'django_comment_client.middleware.AjaxExceptionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -301,6 +301,7 @@ FEATURES['ENABLE_SHOPPING_CART'] = True
 
 ### This enables the Metrics tab for the Instructor dashboard ###########
 FEATURES['CLASS_DASHBOARD'] = True
+INSTALLED_APPS += ('class_dashboard',)
 
 ### This settings is for the course registration code length ############
 REGISTRATION_CODE_LENGTH = 8
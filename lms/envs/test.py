@@ -307,6 +307,7 @@ PASSWORD_HASHERS = (
 
 ### This enables the Metrics tab for the Instructor dashboard ###########
 FEATURES['CLASS_DASHBOARD'] = True
+INSTALLED_APPS += ('class_dashboard',)
 
 ################### Make tests quieter
 
@@ -0,0 +1,111 @@
+"""
+A cache of the rendered fragments of blocks whose views don't depend on the user or the request.
+
+A block declares which of its views are user independent by listing them in its
+``user_independent_views`` attribute. The cached fragment is the view's output after the course
+level url rewriting (static, /course/, and jump_to_id urls) but before the per request wrapping
+(e.g., the xblock wrapper div which carries the request token). Entries are keyed by the block's
+usage key and edited on time, the view, the language, and the static url configuration; so, any
+edit to the block makes a new entry. Blocks whose runtime doesn't record edits (e.g., xml courses)
+aren't cached.
+"""
+import hashlib
+
+import dogstats_wrapper as dog_stats_api
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from request_cache.middleware import RequestCache
+
+# The RequestCache namespace of the hit and miss counts (see get_fragment_cache_stats)
+FRAGMENT_CACHE_STATS_NAMESPACE = u"lms.xblock.fragment_cache.stats"
+
+
+def get_fragment_cache_stats():
+    """
+    Return a dict of the current request's fragment cache 'hits' and 'misses' and the 'bytes_saved'
+    (the size of the content served from the cache rather than rendered)
+    """
+    stats = RequestCache.get_request_cache().data.get(FRAGMENT_CACHE_STATS_NAMESPACE, {})
+    return {
+        'hits': stats.get('hits', 0),
+        'misses': stats.get('misses', 0),
+        'bytes_saved': stats.get('bytes_saved', 0),
+    }
+
+
+def _record(name, amount=1):
+    """
+    Add amount to the current request's count of name
+    """
+    stats = RequestCache.get_request_cache().data.setdefault(FRAGMENT_CACHE_STATS_NAMESPACE, {})
+    stats[name] = stats.get(name, 0) + amount
+
+
+class BlockFragmentCache(object):
+    """
+    Gets and sets the cached fragments of the user independent views of a course's blocks
+    """
+    # how long to keep a fragment; edits make new keys, so this only bounds the space used
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    def __init__(self, course_id, static_asset_path=''):
+        """
+        Args:
+            course_id (CourseKey): the course whose url rewriting the fragments had
+            static_asset_path (str): the static asset path the fragments' static urls were rewritten with
+        """
+        self.course_id = course_id
+        self.static_asset_path = static_asset_path
+
+    def cache_key(self, block, view_name):
+        """
+        The cache key of block's view_name fragment or None if it can't be cached
+        """
+        if view_name not in getattr(block, 'user_independent_views', ()):
+            return None
+        # XModules are rendered as themselves but their edit info is on their descriptors
+        descriptor = getattr(block, 'descriptor', block)
+        get_edited_on = getattr(descriptor.runtime, 'get_edited_on', None)
+        edited_on = get_edited_on(descriptor) if get_edited_on else None
+        if edited_on is None:
+            return None
+        key = u"|".join([
+            unicode(block.location),
+            view_name,
+            edited_on.isoformat(),
+            get_language() or u'',
+            unicode(self.course_id),
+            self.static_asset_path or u'',
+            getattr(descriptor, 'data_dir', None) or u'',
+            settings.STATIC_URL or u'',
+        ])
+        return u"fragment_cache.{}".format(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+    def get(self, block, view_name):
+        """
+        Return the cached fragment for block's view_name or None
+        """
+        key = self.cache_key(block, view_name)
+        if key is None:
+            return None
+        fragment = cache.get(key)
+        tags = [u'block_type:{}'.format(block.scope_ids.block_type)]
+        if fragment is None:
+            _record('misses')
+            dog_stats_api.increment('lms.fragment_cache.miss', tags=tags)
+        else:
+            _record('hits')
+            _record('bytes_saved', len(fragment.content))
+            dog_stats_api.increment('lms.fragment_cache.hit', tags=tags)
+            dog_stats_api.histogram('lms.fragment_cache.bytes_saved', len(fragment.content), tags=tags)
+        return fragment
+
+    def set(self, block, view_name, fragment):
+        """
+        Cache fragment as block's view_name if the view is cacheable
+        """
+        key = self.cache_key(block, view_name)
+        if key is not None:
+            cache.set(key, fragment, self.CACHE_TIMEOUT)
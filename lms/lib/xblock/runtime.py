@@ -148,11 +148,14 @@ class UserTagsService(object):
 
     def __init__(self, runtime):
         self.runtime = runtime
+        self._real_user = None
 
     def _get_current_user(self):
         """Returns the real, not anonymized, current user."""
-        real_user = self.runtime.get_real_user(self.runtime.anonymous_student_id)
-        return real_user
+        # the runtime is bound to one user; so, only look them up once
+        if self._real_user is None:
+            self._real_user = self.runtime.get_real_user(self.runtime.anonymous_student_id)
+        return self._real_user
 
     def get_tag(self, scope, key):
         """
@@ -185,8 +188,14 @@ class UserTagsService(object):
 class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract-method
     """
     ModuleSystem specialized to the LMS
+
+    Its ``content_wrappers`` are applied to each fragment before the ``wrappers``. They must depend only
+    on the course (e.g., url rewriting) so that, with a ``fragment_cache``, the fragments of user
+    independent views are cached after them and reused without rendering or rewriting again.
     """
-    def __init__(self, **kwargs):
+    def __init__(self, content_wrappers=None, fragment_cache=None, **kwargs):
+        self.content_wrappers = content_wrappers or []
+        self.fragment_cache = fragment_cache
         services = kwargs.setdefault('services', {})
         services['user_tags'] = UserTagsService(self)
         services['partitions'] = LmsPartitionService(
@@ -197,6 +206,26 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
         services['fs'] = xblock.reference.plugins.FSService()
         super(LmsModuleSystem, self).__init__(**kwargs)
 
+    def render(self, block, view_name, context=None):
+        """
+        Render block's view_name from the fragment cache if it's there
+        """
+        if self.fragment_cache is not None:
+            fragment = self.fragment_cache.get(block, view_name)
+            if fragment is not None:
+                return super(LmsModuleSystem, self).wrap_child(block, view_name, fragment, context)
+        return super(LmsModuleSystem, self).render(block, view_name, context)
+
+    def wrap_child(self, block, view, frag, context):
+        """
+        Apply the content_wrappers, cache the result if the view is cacheable, and then apply the wrappers
+        """
+        for wrapper in self.content_wrappers:
+            frag = wrapper(block, view, frag, context)
+        if self.fragment_cache is not None:
+            self.fragment_cache.set(block, view, frag)
+        return super(LmsModuleSystem, self).wrap_child(block, view, frag, context)
+
     # backward compatibility fix for callers not knowing this is a ModuleSystem v DescriptorSystem
     @property
     def resources_fs(self):
@@ -9,7 +9,9 @@ from mock import Mock
 from unittest import TestCase
 from urlparse import urlparse
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from xblock.fragment import Fragment
 from lms.lib.xblock.runtime import quote_slashes, unquote_slashes, LmsModuleSystem
+from request_cache.middleware import RequestCache
 
 TEST_STRINGS = [
     '',
@@ -103,10 +105,53 @@ class TestHandlerUrl(TestCase):
         self.assertIsNone(parsed_fq_url.hostname)
 
 
+class TestFragmentCache(TestCase):
+    """Test rendering through the LMS runtime's fragment cache"""
+
+    def setUp(self):
+        self.block = Mock()
+        self.block.student_view.return_value = Fragment(u'content')
+        self.content_wrapper = Mock(
+            side_effect=lambda block, view, frag, context: Fragment(frag.content + u' rewritten')
+        )
+        self.wrapper = Mock(
+            side_effect=lambda block, view, frag, context: Fragment(u'<div>' + frag.content + u'</div>')
+        )
+        self.fragment_cache = Mock()
+        self.runtime = LmsModuleSystem(
+            static_url='/static',
+            track_function=Mock(),
+            get_module=Mock(),
+            render_template=Mock(),
+            replace_urls=str,
+            course_id=SlashSeparatedCourseKey("org", "course", "run"),
+            descriptor_runtime=Mock(),
+            content_wrappers=[self.content_wrapper],
+            wrappers=[self.wrapper],
+            fragment_cache=self.fragment_cache,
+        )
+
+    def test_miss(self):
+        self.fragment_cache.get.return_value = None
+        fragment = self.runtime.render(self.block, 'student_view')
+        self.assertEqual(fragment.content, u'<div>content rewritten</div>')
+        cached = self.fragment_cache.set.call_args[0][2]
+        self.assertEqual(cached.content, u'content rewritten')
+
+    def test_hit(self):
+        self.fragment_cache.get.return_value = Fragment(u'cached')
+        fragment = self.runtime.render(self.block, 'student_view')
+        self.assertEqual(fragment.content, u'<div>cached</div>')
+        self.assertFalse(self.block.student_view.called)
+        self.assertFalse(self.content_wrapper.called)
+        self.assertFalse(self.fragment_cache.set.called)
+
+
 class TestUserServiceAPI(TestCase):
     """Test the user service interface"""
 
     def setUp(self):
+        RequestCache().clear_request_cache()
         self.course_id = SlashSeparatedCourseKey("org", "course", "run")
 
         self.user = User(username='runtime_robot', email='runtime_robot@edx.org', password='test', first_name='Robot')
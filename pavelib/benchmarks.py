@@ -0,0 +1,40 @@
+"""
+Courseware performance benchmarks
+"""
+from paver.easy import sh, task, cmdopts, needs
+from .utils.cmd import django_cmd
+from .utils.envs import Env
+
+BENCHMARK_REPORT_DIR = Env.REPORT_DIR / "benchmarks"
+
+__test__ = False  # do not collect
+
+
+@task
+@needs('pavelib.prereqs.install_prereqs')
+@cmdopts([
+    ("settings=", "s", "Django settings (default test)"),
+    ("output=", "o", "File to write the json results to (default reports/benchmarks/courseware.json)"),
+    ("compare=", "c", "Json results of a previous run to fail on regressions against"),
+    ("tolerance=", "t", "How much slower (as a fraction) a benchmark may be than in the compared run"),
+    ("store=", None, "Only benchmark this modulestore (mongo or split)"),
+    ("students=", None, "Number of synthetic students"),
+    ("iterations=", "i", "Number of times to time each hot path"),
+])
+def run_benchmarks(options):
+    """
+    Time the courseware's hot paths on synthetic courses
+    """
+    settings = getattr(options, 'settings', 'test')
+    output = getattr(options, 'output', None)
+    if output is None:
+        BENCHMARK_REPORT_DIR.makedirs_p()
+        output = BENCHMARK_REPORT_DIR / "courseware.json"
+
+    args = ['benchmark_courseware', '--traceback', '--output={}'.format(output)]
+    for option in ('compare', 'tolerance', 'store', 'students', 'iterations'):
+        value = getattr(options, option, None)
+        if value is not None:
+            args.append('--{}={}'.format(option, value))
+
+    sh(django_cmd('lms', settings, *args))